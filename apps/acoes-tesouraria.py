@@ -1,7 +1,7 @@
 import locale
 import os
 import smtplib
-from datetime import date, timedelta
+from datetime import date
 from email import encoders
 from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
@@ -15,111 +15,22 @@ from reportlab.lib.pagesizes import A4
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
-from streamlit.connections import SQLConnection
+
+from gefid import catalogo, dimensoes, identidades, retratos, telemetria
 
 locale.setlocale(locale.LC_ALL, "pt_BR.UTF-8")
 
-engine: SQLConnection = st.connection(name="DB2", type=SQLConnection)
-
-
-@st.cache_data(show_spinner="**:material/hourglass: Preparando a listagem da empresa, aguarde...**")
-def load_client() -> dict[str, int]:
-    load: pd.DataFrame = engine.query(
-        sql="""
-            SELECT t1.CD_CLI_EMT AS MCI, STRIP(t2.NOM) AS NOM
-            FROM DB2AEB.PRM_EMP t1 INNER JOIN DB2MCI.CLIENTE t2 ON t2.COD = t1.CD_CLI_EMT
-            WHERE t1.DT_ECR_CTR IS NULL
-            ORDER BY STRIP(t2.NOM)
-        """,
-        show_spinner=False,
-        ttl=0
-    )
-    return {k: v for k, v in zip(load["nom"].to_list(), load["mci"].to_list())}
-
-
-def load_empresa(_mci: int, _data_ant: date, _data_atual: date) -> pd.DataFrame:
-    return engine.query(
-        sql="""
-            SELECT
-                t5.CD_CLI_ACNT AS MCI,
-                STRIP(CASE
-                    WHEN t5.CD_CLI_ACNT < 1000000000 THEN t6.NOM
-                    ELSE t8.NM_INVR
-                END)  AS INVESTIDOR,
-                CASE
-                    WHEN t5.CD_CLI_ACNT < 1000000000 THEN
-                        CASE
-                            WHEN t6.COD_TIPO = 2 THEN LPAD(CAST(t6.COD_CPF_CGC AS BIGINT), 14, '0')
-                            ELSE LPAD(CAST(t6.COD_CPF_CGC AS BIGINT), 11, '0')
-                        END
-                    ELSE
-                        CASE
-                            WHEN t6.COD_TIPO = 2 THEN LPAD(CAST(t8.NR_CPF_CNPJ_INVR AS BIGINT), 14, '0')
-                            ELSE LPAD(CAST(t8.NR_CPF_CNPJ_INVR AS BIGINT), 14, '0')
-                        END
-                END AS CPF_CNPJ,
-                t5.DATA AS DATA,
-                t5.CD_TIP_TIT AS COD_TITULO,
-                CONCAT(STRIP(t7.SG_TIP_TIT), STRIP(t7.CD_CLS_TIP_TIT)) AS SIGLA,
-                CAST(t5.QUANTIDADE AS BIGINT) AS QUANTIDADE,
-                CASE
-                    WHEN t5.CD_CLI_CSTD = 903485186 THEN 'ESCRITURAL'
-                    ELSE 'CUSTÓDIA'
-                END AS CUSTODIANTE
-            FROM (
-                SELECT
-                    CD_CLI_EMT,
-                    CD_TIP_TIT,
-                    CD_CLI_ACNT,
-                    CD_CLI_CSTD,
-                    DATA,
-                    QUANTIDADE
-                FROM (
-                    SELECT
-                        t1.CD_CLI_EMT,
-                        t1.CD_TIP_TIT,
-                        t1.CD_CLI_ACNT,
-                        t1.CD_CLI_CSTD,
-                        t1.DT_MVTC AS DATA,
-                        t1.QT_TIT_ATU AS QUANTIDADE
-                    FROM
-                        DB2AEB.MVTC_DIAR_PSC t1
-                    WHERE
-                        t1.CD_CLI_EMT = :mci AND
-                        t1.CD_CLI_ACNT = :mci
-                    UNION ALL
-                    SELECT
-                        t1.CD_CLI_EMT,
-                        t1.CD_TIP_TIT,
-                        t1.CD_CLI_ACNT,
-                        t1.CD_CLI_CSTD,
-                        t1.DT_PSC - 1 DAY AS DATA,
-                        t1.QT_TIT_INC_MM AS QUANTIDADE
-                    FROM
-                        DB2AEB.PSC_TIT_MVTD t1
-                    WHERE
-                        t1.CD_CLI_EMT = :mci AND
-                        t1.CD_CLI_ACNT = :mci
-                )
-            ) t5
-            LEFT JOIN DB2MCI.CLIENTE t6
-                ON t6.COD = t5.CD_CLI_ACNT
-            LEFT JOIN DB2AEB.TIP_TIT t7
-                ON t7.CD_TIP_TIT = t5.CD_TIP_TIT
-            LEFT JOIN DB2AEB.VCL_ACNT_BLS t8
-                ON t8.CD_CLI_ACNT = t5.CD_CLI_ACNT
-            WHERE
-                data BETWEEN :data_ant AND :data_atual
-            ORDER BY
-                CAST(t5.CD_CLI_ACNT AS INTEGER),
-                data DESC
-        """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(mci=_mci, data_ant=_data_ant, data_atual=_data_atual)
-    )
 
 
+def load_empresa(_mci: int, _data_atual: date) -> pd.DataFrame:
+    load: pd.DataFrame = retratos.posicoes(_mci, _data_atual)
+    load = retratos.colunas(load[load["cd_cli_acnt"].eq(_mci)], "mci", "data", "cod_titulo", "sigla", "quantidade",
+                            "custodiante")
+
+    load = identidades.enriquecer(load, "investidor", "cpf_cnpj")
+
+    return dimensoes.rotular(load, sigla="sigla")
+
 @st.dialog("Despachar E-mail")
 def send_mail() -> None:
     st.text_input("**Para:**", key="to_addr", help="Mais e-mails, coloca a vírgula", icon=":material/mail:")
@@ -163,7 +74,7 @@ def send_mail() -> None:
 
         msg.attach(part)
 
-        with smtplib.SMTP("smtp.bb.com.br") as server:
+        with telemetria.SMTP_SEGUNDOS.medir(pagina="acoes-tesouraria"), smtplib.SMTP("smtp.bb.com.br") as server:
             server.set_debuglevel(1)
             try:
                 server.sendmail(
@@ -194,7 +105,7 @@ with open("static/arquivos/protocolador/protocolador.txt") as f:
 st.markdown(f"Protocolo: **{date.today().year}** / DIEST: **{last_protocol}**")
 
 with st.columns(2)[0]:
-    kv: dict[str, int] = load_client()
+    kv: dict[str, int] = catalogo.clientes()
 
     st.selectbox(label="**Empresa:**", options=kv.keys(), key="empresa")
 
@@ -209,11 +120,7 @@ col2.button("**Preparar E-mail**", key="open_mail", type="primary", icon=":mater
 
 if st.session_state["montar"]:
     with st.spinner("**:material/hourglass: Preparando os dados para a declaração, aguarde...**", show_time=True):
-        data_ant: date = (st.session_state["data"].replace(day=1) - timedelta(days=1)).replace(day=28)
-
-        office: pd.DataFrame = load_empresa(mci, data_ant, st.session_state["data"])
-        office["pk"] = office.apply(lambda x: f"{x['mci']}-{x['cod_titulo']}-{x['custodiante']}", axis=1)
-        office = office.groupby(["pk"]).first()
+        office: pd.DataFrame = load_empresa(mci, st.session_state["data"])
         office = office[office["quantidade"].ne(0)]
 
         if office.empty:
@@ -268,7 +175,9 @@ if st.session_state["montar"]:
             cnv.drawString(40, 30, "Telefone: (21) 3808-3715")
             cnv.drawString(40, 15, "Ouvidoria BB - 0800 729 5678")
 
-            cnv.save()
+            # o canvas só acumula os comandos de desenho; o PDF é montado e gravado no save()
+            with telemetria.PDF_SEGUNDOS.medir(pagina="acoes-tesouraria"):
+                cnv.save()
 
             st.toast("###### Declaração de Ações em Tesouraria gerada com sucesso! Pode clicar Despachar E-mail",
                      icon=":material/check_circle:")
@@ -0,0 +1,71 @@
+import pandas as pd
+import streamlit as st
+
+from gefid import metricas
+
+
+st.subheader(":material/admin_panel_settings: Administração")
+
+aba_lentas, aba_consultas, aba_admissao = st.tabs(
+    ["**Consultas lentas**", "**Consultas por página**", "**Admissão**"]
+)
+
+with aba_lentas:
+    st.markdown(f"Consultas a partir de **{metricas.LENTA:.0f} s**, gravadas em `{metricas.LOG_LENTAS}`")
+
+    lentas: pd.DataFrame = metricas.lentas()
+
+    if lentas.empty:
+        st.info("**Nenhuma consulta lenta registrada.**", icon=":material/info:", width=600)
+
+    else:
+        filtro = st.columns(3)
+        paginas: list[str] = filtro[0].multiselect(label="**Página:**", options=sorted(lentas["pagina"].unique()))
+        situacoes: list[str] = filtro[1].multiselect(label="**Situação:**",
+                                                     options=sorted(lentas["situacao"].unique()))
+
+        if paginas:
+            lentas = lentas[lentas["pagina"].isin(paginas)]
+
+        if situacoes:
+            lentas = lentas[lentas["situacao"].isin(situacoes)]
+
+        evento = st.dataframe(
+            data=lentas.drop(columns=["sql", "params", "dicas"]),
+            hide_index=True,
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            column_config=dict(
+                momento=st.column_config.DatetimeColumn(label="Momento", format="DD/MM/YYYY HH:mm:ss"),
+                pagina=st.column_config.TextColumn(label="Página"),
+                funcao=st.column_config.TextColumn(label="Função"),
+                classe=st.column_config.TextColumn(label="Classe"),
+                situacao=st.column_config.TextColumn(label="Situação"),
+                tempo_total=st.column_config.NumberColumn(label="Tempo (s)", format="%.1f"),
+                tempo_db2=st.column_config.NumberColumn(label="DB2 (s)", format="%.1f"),
+                linhas=st.column_config.NumberColumn(label="Linhas"),
+                bytes=st.column_config.NumberColumn(label="Bytes"),
+            ),
+        )
+
+        if evento.selection.rows:
+            consulta: pd.Series = lentas.iloc[evento.selection.rows[0]]
+
+            for dica in consulta["dicas"]:
+                st.warning(dica, icon=":material/lightbulb:")
+
+            st.code(consulta["sql"], language="sql", wrap_lines=True)
+            st.json(consulta["params"])
+
+with aba_consultas:
+    st.markdown("Acumulado deste processo do servidor")
+    st.dataframe(data=metricas.resumo(), hide_index=True, use_container_width=True)
+
+    colunas = st.columns(3)
+    colunas[0].json(metricas.comandos())
+    colunas[1].json(metricas.coalescencia())
+    colunas[2].dataframe(data=metricas.cache(), hide_index=True, use_container_width=True)
+
+with aba_admissao:
+    st.dataframe(data=metricas.admissao(), hide_index=True, use_container_width=True)
@@ -10,15 +10,15 @@ from reportlab.lib.pagesizes import A4
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
-from streamlit.connections import SQLConnection
+
+from gefid import db, telemetria
 
 locale.setlocale(locale.LC_ALL, "pt_BR.UTF-8")
 
-engine: SQLConnection = st.connection(name="DB2", type=SQLConnection)
 
 
 def load_evid(_data_pos: date) -> pd.DataFrame:
-    return engine.query(
+    return db.query(
         sql="""
             SELECT
                 CAST(CD_CLI_ACNT AS BIGINT) AS MCI,
@@ -36,8 +36,6 @@ def load_evid(_data_pos: date) -> pd.DataFrame:
             ORDER BY
                 CD_CLI_ACNT
         """,
-        ttl=0,
-        show_spinner=False,
         params=dict(data_posterior=_data_pos),
     )
 
@@ -131,7 +129,9 @@ if st.session_state["btn_ev"]:
     cnv.drawString(x=40, y=30, text="Telefone: (21) 3808-3715")
     cnv.drawString(x=40, y=15, text="Ouvidoria BB - 0800 729 5678")
 
-    cnv.save()
+    # o canvas só acumula os comandos de desenho; o PDF é montado e gravado no save()
+    with telemetria.PDF_SEGUNDOS.medir(pagina="autorregulacao-bb"):
+        cnv.save()
 
     st.toast("###### Arquivo PDF gerado com sucesso e enviado na pasta específica", icon=":material/check_circle:")
 
@@ -505,16 +505,14 @@ if st.session_state["btn_au"]:
     
                 print(dados.head())
     
+                # total de cada CPF indexado uma vez (primeira linha do 738, como fazia o query por célula)
+                totais: dict[int, int] = dados.drop_duplicates("CPF").set_index("CPF")["TOTAL"].to_dict()
+
                 for row in sheet2["C4:C210"]:
                     for cell in row:
                         if cell.value != "":
-                            posicao = dados.query(f"CPF == {cell.value}")["TOTAL"].reset_index()
-                            if posicao.shape[0] > 0:
-                                sheet2[f"E{cell.row}"] = posicao["TOTAL"][0]
-                            else:
-                                sheet2[f"E{cell.row}"] = "-"
-                        else:
-                            continue
+                            cpf: float = pd.to_numeric(cell.value, errors="coerce")
+                            sheet2[f"E{cell.row}"] = "-" if pd.isna(cpf) else totais.get(int(cpf), "-")
     
                 base_acionaria.save(filename=f"static/escriturais/@deletar/Autorregulação_-_DIOPE-GEFID_-_"
                                              f"{data_pos:%B de %Y}.xlsx")
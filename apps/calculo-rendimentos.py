@@ -3,6 +3,8 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 
+from gefid import rendimentos
+
 with st.columns(2)[0]:
     st.subheader(":material/calculate: Cálculo de Rendimentos")
 
@@ -20,20 +22,6 @@ if st.session_state["gerar"]:
 
         tamanho: int = 1048000
 
-        # função para retirar pontos e vírgulas dos números para poder trabalhar como float
-        def replace_comma_and_dot(_x: str) -> str:
-            return _x.replace(".", "").replace(",", "")
-
-        # função para substituir vírgula por ponto para poder trabalhar como float
-        def replace_comma_for_dot(_x: str) -> str:
-            return _x.replace(",", ".")
-
-        # função para eliminar vírgulas, traços e barras co CPF/CNPJ
-        def replace_comma_for_nothing(_x: str) -> str:
-            for char in [".", ",", "-", "/"]:
-                _x = _x.replace(char, "")
-            return _x
-
         # pegando os arquivos com início "BBM.AEBF543A."
         all_files: list[str] = glob.glob(f"{diretorio_origem}/*.AEBF543A.*")
 
@@ -41,32 +29,7 @@ if st.session_state["gerar"]:
             st.toast("###### Não foram localizados arquivos 543a no diretório selecionado", icon=":material/error:")
             st.stop()
 
-        li: list = []
-
-        # iterando a leitura do Pandas em todos os arquivos da pasta
-        for filename in all_files:
-            df: pd.DataFrame = pd.read_fwf(
-                filepath_or_buffer=filename,
-                colspecs=[(29, 33), (34, 38), (43, 53), (54, 58), (117, 121), (123, 144), (145, 154),
-                          (155, 173), (174, 214), (220, 240), (241, 245), (246, 250), (251, 253),
-                          (254, 260), (268, 274), (282, 301), (302, 322), (323, 341), (378, 400),
-                          (401, 423)],
-                names=["cod_emissor", "tipo_delib", "data_delib", "direito", "ativo", "valor_por_ativo",
-                       "mci_investidor", "cpfcnpj_investidor", "nome_investidor", "forma_pagamento",
-                       "pais_bb", "pais_b3", "tipo_pessoa", "faixa_ir_bb", "faixa_ir_b3", "qtd_ativos",
-                       "vlr_bruto_bb", "vlr_ir_bb", "vlr_bruto_b3", "vlr_ir_b3"],
-                converters={
-                    "cpfcnpj_investidor": replace_comma_for_nothing, "valor_por_ativo": replace_comma_for_dot,
-                    "faixa_ir_bb": replace_comma_for_dot, "faixa_ir_b3": replace_comma_for_dot,
-                    "qtd_ativos": replace_comma_and_dot, "vlr_bruto_bb": replace_comma_and_dot,
-                    "vlr_ir_bb": replace_comma_and_dot, "vlr_bruto_b3": replace_comma_and_dot,
-                    "vlr_ir_b3": replace_comma_and_dot
-                },
-                encoding="iso-8859-1"
-            )
-            li.append(df)
-
-        df = pd.concat(li, axis=0, ignore_index=True, verify_integrity=True)
+        df = rendimentos.ler_543(all_files)
 
         lista_dir = df["direito"].unique()
 
@@ -76,16 +39,6 @@ if st.session_state["gerar"]:
                      f" emissor.\nIremos encerrar o processo.", icon=":material/warning:")
             st.stop()
 
-        df["cpfcnpj_investidor"] = df["cpfcnpj_investidor"].astype(float)
-        df["qtd_ativos"] = df["qtd_ativos"].astype(int)
-        df["valor_por_ativo"] = df["valor_por_ativo"].astype(float)
-        df["faixa_ir_bb"] = df["faixa_ir_bb"].astype(float)
-        df["faixa_ir_b3"] = df["faixa_ir_b3"].astype(float)
-        df["vlr_bruto_bb"] = df["vlr_bruto_bb"].astype(float)
-        df["vlr_ir_bb"] = df["vlr_ir_bb"].astype(float)
-        df["vlr_bruto_b3"] = df["vlr_bruto_b3"].astype(float)
-        df["vlr_ir_b3"] = df["vlr_ir_b3"].astype(float)
-
         cod_aeb = df.iat[0, 0]
         mci_emissor = 0
         nome_emissor = ""
@@ -201,36 +154,7 @@ if st.session_state["gerar"]:
         tipo_delib = df.iat[0, 1]
         data_base = df.iat[0, 2]
 
-        # criando as colunas finais
-        df.insert(12, "pais_final", "")
-        df.insert(16, "faixa_ir_final", "")
-        df.insert(22, "vlr_bruto_final", "")
-        df.insert(23, "vlr_ir_final", "")
-
-        # pegando o país, faixa e valores da bolsa para pagamento em bolsa e pais,
-        # faixa e valores do BB para os demais tipos de pagamento
-        df.loc[df["forma_pagamento"] == "STR/SISPAG", "pais_final"] = df["pais_b3"]
-        df.loc[df["forma_pagamento"] != "STR/SISPAG", "pais_final"] = df["pais_bb"]
-
-        df.loc[df["forma_pagamento"] == "STR/SISPAG", "faixa_ir_final"] = df["faixa_ir_b3"]
-        df.loc[df["forma_pagamento"] != "STR/SISPAG", "faixa_ir_final"] = df["faixa_ir_bb"]
-
-        df.loc[df["forma_pagamento"] == "STR/SISPAG", "vlr_bruto_final"] = df["vlr_bruto_b3"]
-        df.loc[df["forma_pagamento"] != "STR/SISPAG", "vlr_bruto_final"] = df["vlr_bruto_bb"]
-
-        df.loc[df["forma_pagamento"] == "STR/SISPAG", "vlr_ir_final"] = df["vlr_ir_b3"]
-        df.loc[df["forma_pagamento"] != "STR/SISPAG", "vlr_ir_final"] = df["vlr_ir_bb"]
-
-        # criando a coluna de valor líquido final
-        df["vlr_liquido_final"] = df["vlr_bruto_final"] - df["vlr_ir_final"]
-
-        # apagando as colunas desnecessárias
-        df.drop(["cod_emissor", "tipo_delib", "data_delib", "pais_bb", "pais_b3", "faixa_ir_bb",
-                 "faixa_ir_b3", "vlr_bruto_bb", "vlr_bruto_b3", "vlr_ir_bb", "vlr_ir_b3"], axis=1, inplace=True)
-
-        df["vlr_bruto_final"] = df["vlr_bruto_final"] / 100
-        df["vlr_ir_final"] = df["vlr_ir_final"] / 100
-        df["vlr_liquido_final"] = df["vlr_liquido_final"] / 100
+        df = rendimentos.calcular_543(df)
 
         for x in range(len(lista_dir)):
             # separando os dataframes por tipo de direito
@@ -241,93 +165,8 @@ if st.session_state["gerar"]:
             globals()[nome_df].drop(["direito"], axis=1, inplace=True)
 
             # fazendo somatórios importantes
-            vlr_bruto_caixa = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "CAIXA",
-                      ["vlr_bruto_final"]].sum()), 2)
-            vlr_ir_caixa = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "CAIXA",
-                      ["vlr_ir_final"]].sum()), 2)
-            vlr_liquido_caixa = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "CAIXA",
-                      ["vlr_liquido_final"]].sum()), 2)
-            vlr_bruto_contacorrentebb = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "CONTA-CORRENTE BB",
-                      ["vlr_bruto_final"]].sum()), 2)
-            vlr_ir_contacorrentebb = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "CONTA-CORRENTE BB",
-                      ["vlr_ir_final"]].sum()), 2)
-            vlr_liquido_contacorrentebb = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "CONTA-CORRENTE BB",
-                      ["vlr_liquido_final"]].sum()), 2)
-            vlr_bruto_empresa = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "EMPRESA",
-                      ["vlr_bruto_final"]].sum()), 2)
-            vlr_ir_empresa = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "EMPRESA",
-                      ["vlr_ir_final"]].sum()), 2)
-            vlr_liquido_empresa = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "EMPRESA",
-                      ["vlr_liquido_final"]].sum()), 2)
-            vlr_bruto_poupancaourobb = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "POUPANCA OURO BB",
-                      ["vlr_bruto_final"]].sum()), 2)
-            vlr_ir_poupancaourobb = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "POUPANCA OURO BB",
-                      ["vlr_ir_final"]].sum()), 2)
-            vlr_liquido_poupancaourobb = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "POUPANCA OURO BB",
-                      ["vlr_liquido_final"]].sum()), 2)
-            vlr_bruto_credtesouronacional = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "CRED TESOURO NAC",
-                      ["vlr_bruto_final"]].sum()), 2)
-            vlr_ir_credtesouronacional = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "CRED TESOURO NAC",
-                      ["vlr_ir_final"]].sum()), 2)
-            vlr_liquido_credtesouronacional = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "CRED TESOURO NAC",
-                      ["vlr_liquido_final"]].sum()), 2)
-            vlr_bruto_strsispag = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "STR/SISPAG",
-                      ["vlr_bruto_final"]].sum()), 2)
-            vlr_ir_strsispag = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "STR/SISPAG",
-                      ["vlr_ir_final"]].sum()), 2)
-            vlr_liquido_strsispag = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] == "STR/SISPAG",
-                      ["vlr_liquido_final"]].sum()), 2)
-            vlr_bruto_doctedcustinvest = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] ==
-                                                   "DOC/TED CUSTO INVEST", ["vlr_bruto_final"]].sum()), 2)
-            vlr_ir_doctedcustinvest = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] ==
-                                                   "DOC/TED CUSTO INVEST", ["vlr_ir_final"]].sum()), 2)
-            vlr_liquido_doctedcustinvest = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] ==
-                                                   "DOC/TED CUSTO INVEST", ["vlr_liquido_final"]].sum()), 2)
-            vlr_bruto_doctedcustempresa = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] ==
-                                                   "DOC/TED CUSTO EMPRES", ["vlr_bruto_final"]].sum()), 2)
-            vlr_ir_doctedcustempresa = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] ==
-                                                   "DOC/TED CUSTO EMPRES", ["vlr_ir_final"]].sum()), 2)
-            vlr_liquido_doctedcustempresa = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] ==
-                                                   "DOC/TED CUSTO EMPRES", ["vlr_liquido_final"]].sum()), 2)
-            vlr_bruto_depositojudicial = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] ==
-                                                   "DEPOSITO JUDICIAL EF", ["vlr_bruto_final"]].sum()), 2)
-            vlr_ir_depositojudicial = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] ==
-                                                   "DEPOSITO JUDICIAL EF", ["vlr_ir_final"]].sum()), 2)
-            vlr_liquido_depositojudicial = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["forma_pagamento"] ==
-                                                   "DEPOSITO JUDICIAL EF", ["vlr_liquido_final"]].sum()), 2)
-            vlr_ir_domestico = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["pais_final"] ==
-                                                   105, ["vlr_ir_final"]].sum()), 2)
-            vlr_ir_estrangeiro = \
-                round(float(globals()[nome_df].loc[globals()[nome_df]["pais_final"] !=
-                                                   105, ["vlr_ir_final"]].sum()), 2)
+            totais: pd.DataFrame = rendimentos.totais_543(globals()[nome_df])
+            vlr_ir_domestico, vlr_ir_estrangeiro = rendimentos.ir_pais_543(globals()[nome_df])
 
             # dividindo em partes iguais se for maior que o "tamanho"
             globals()[nome_df] = np.array_split(globals()[nome_df],
@@ -428,37 +267,8 @@ if st.session_state["gerar"]:
             worksheet.merge_range("B5:D5", "", texto_format5)
 
             # escrevendo valores
-            worksheet.write("B8", vlr_bruto_caixa, vlr_format)
-            worksheet.write("C8", vlr_ir_caixa, vlr_format)
-            worksheet.write("D8", vlr_liquido_caixa, vlr_format)
-
-            worksheet.write("B9", vlr_bruto_contacorrentebb, vlr_format)
-            worksheet.write("C9", vlr_ir_contacorrentebb, vlr_format)
-            worksheet.write("D9", vlr_liquido_contacorrentebb, vlr_format)
-
-            worksheet.write("B10", vlr_bruto_empresa, vlr_format)
-            worksheet.write("C10", vlr_ir_empresa, vlr_format)
-            worksheet.write("D10", vlr_liquido_empresa, vlr_format)
-
-            worksheet.write("B11", vlr_bruto_poupancaourobb, vlr_format)
-            worksheet.write("C11", vlr_ir_poupancaourobb, vlr_format)
-            worksheet.write("D11", vlr_liquido_poupancaourobb, vlr_format)
-
-            worksheet.write("B12", vlr_bruto_credtesouronacional, vlr_format)
-            worksheet.write("C12", vlr_ir_credtesouronacional, vlr_format)
-            worksheet.write("D12", vlr_liquido_credtesouronacional, vlr_format)
-
-            worksheet.write("B13", vlr_bruto_strsispag, vlr_format)
-            worksheet.write("C13", vlr_ir_strsispag, vlr_format)
-            worksheet.write("D13", vlr_liquido_strsispag, vlr_format)
-
-            worksheet.write("B14", vlr_bruto_doctedcustinvest + vlr_bruto_doctedcustempresa, vlr_format)
-            worksheet.write("C14", vlr_ir_doctedcustinvest + vlr_ir_doctedcustempresa, vlr_format)
-            worksheet.write("D14", vlr_liquido_doctedcustinvest + vlr_liquido_doctedcustempresa, vlr_format)
-
-            worksheet.write("B15", vlr_bruto_depositojudicial, vlr_format)
-            worksheet.write("C15", vlr_ir_depositojudicial, vlr_format)
-            worksheet.write("D15", vlr_liquido_depositojudicial, vlr_format)
+            for linha, valores in enumerate(totais.itertuples(index=False), start=8):
+                worksheet.write_row(f"B{linha}", valores, vlr_format)
 
             worksheet.write_formula(15, 1, "=SUM(B8:B15)", vlr_format2)
             worksheet.write_formula(15, 2, "=SUM(C8:C15)", vlr_format2)
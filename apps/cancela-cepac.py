@@ -15,46 +15,16 @@ from reportlab.lib.styles import ParagraphStyle
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
-from streamlit.connections import SQLConnection
-
-engine: SQLConnection = st.connection(name="DB2", type=SQLConnection)
-
-
-def load_extract(join: str, field: str, value: int, active: int) -> pd.DataFrame:
-    return engine.query(
-        sql=f"""
-            SELECT CAST(t1.DT_MVTC AS DATE)    AS DATA_MVTC,
-                   CAST(t1.QT_TIT_MVTD AS INT) AS MVT,
-                   CAST(t1.QT_TIT_ATU AS INT)  AS SALDO
-            FROM DB2AEB.MVTC_DIAR_PSC t1{join}
-            WHERE t1.CD_CLI_EMT = 906535030
-              AND {field} = :value
-              AND t1.CD_CLI_CSTD = 903485186
-              AND t1.CD_TIP_TIT = :active
-            ORDER BY CAST(t1.DT_MVTC AS DATE)
-            """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(value=value, active=active),
-    )
+
+from gefid import buscas, db, telemetria
+
+
+def load_extract(field: str, value: int, active: int) -> pd.DataFrame:
+    return db.query(sql=buscas.EXTRATO_CEPAC.sql(field), params=dict(value=value, active=active))
 
 
 def load_cadastro(field: str, value: int) -> tuple[str, ...]:
-    load: pd.DataFrame = engine.query(
-        sql=f"""
-            SELECT t1.COD AS MCI,
-                   STRIP(t1.NOM) AS INVESTIDOR,
-                   CASE
-                       WHEN t1.COD_TIPO = 2 THEN LPAD(t1.COD_CPF_CGC, 14, '0')
-                       ELSE LPAD(t1.COD_CPF_CGC, 11, '0')
-                   END AS CPF_CNPJ
-            FROM DB2MCI.CLIENTE t1
-            WHERE t1.{field.upper()} = :value
-        """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(value=value),
-    )
+    load: pd.DataFrame = db.query(sql=buscas.CADASTRO_INVESTIDOR.sql(field), params=dict(value=value))
     return str(load["mci"].iloc[0]), load["investidor"].iloc[0], load["cpf_cnpj"].iloc[0]
 
 
@@ -98,7 +68,7 @@ def send_mail() -> None:
 
         msg.attach(part)
 
-        with smtplib.SMTP("smtp.bb.com.br", 25) as server:
+        with telemetria.SMTP_SEGUNDOS.medir(pagina="cancela-cepac"), smtplib.SMTP("smtp.bb.com.br", 25) as server:
             server.set_debuglevel(1)
 
             try:
@@ -164,8 +134,7 @@ if st.session_state["montar"]:
             if st.session_state["tipo_papel"] == "Água Espraiada (CPC)" else 56
 
         extract: pd.DataFrame = load_extract(
-            join="" if st.session_state["mci_client"] else " INNER JOIN DB2MCI.CLIENTE t2 ON t2.COD = t1.CD_CLI_ACNT",
-            field="t1.CD_CLI_ACNT" if st.session_state["mci_client"] else "t2.COD_CPF_CGC",
+            field="cod" if st.session_state["mci_client"] else "cod_cpf_cgc",
             value=st.session_state["mci_client"] if st.session_state["mci_client"] else st.session_state["cnpj_client"],
             active=ativo
         )
@@ -248,7 +217,8 @@ if st.session_state["montar"]:
                      f"DAF{st.session_state['carta_daf']}.pdf",
             pagesize=A4
         )
-        pdf.build(elements)
+        with telemetria.PDF_SEGUNDOS.medir(pagina="cancela-cepac"):
+            pdf.build(elements)
 
         st.toast("###### Declaração de Cancelamento de CEPAC pronta para enviar e-mail", icon=":material/check_circle:")
 
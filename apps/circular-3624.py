@@ -3,46 +3,12 @@ from datetime import date
 import pandas as pd
 import streamlit as st
 import xlsxwriter
-from streamlit.connections import SQLConnection
 
-engine: SQLConnection = st.connection(name="DB2", type=SQLConnection)
-
-
-def load_data(year: int, month: int) -> pd.DataFrame:
-    return engine.query(
-        sql="""
-            SELECT
-                t2.CD_CLSC_TIP_DRT,
-                t1.DT_DLBC,
-                YEAR(t1.DT_DLBC) AS ANO_DELIB,
-                t1.VL_MVT_REN,
-                t1.VL_IR_CLCD_MVT_REN,
-                t1.VL_MVT_REN - t1.VL_IR_CLCD_MVT_REN AS LIQUIDO_PRINCIPAL,
-                t1.VL_CORR_MVT_REN,
-                t1.VL_IR_CORR_MVT_REN,
-                t1.VL_IR_CORR_MVT_REN - t1.VL_IR_CORR_MVT_REN AS LIQUIDO_CORR
-            FROM
-                DB2AEB.MVT_REN t1
-                    INNER JOIN DB2AEB.TIP_DRT t2
-                        ON t2.CD_TIP_DRT = t1.CD_TIP_DRT
-            WHERE
-                t1.CD_TIP_DRT IN (9) AND
-                YEAR(t1.DT_MVT_DRT) = :year AND
-                MONTH(t1.DT_MVT_DRT) = :month AND
-                t1.CD_CLI_DLBC IN (903485186) AND
-                t2.CD_CLSC_TIP_DRT IN (1, 5, 10, 14)
-            ORDER BY
-                t1.DT_DLBC DESC,
-                t1.CD_TIP_DRT
-        """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(year=year, month=month),
-    )
+from gefid import rendimentos
 
 
 def preparo_xlsx(year: int, month: int) -> None:
-    xlsx: pd.DataFrame = load_data(year, month)
+    xlsx: pd.DataFrame = rendimentos.load_circular_3624(year, month)
 
     if xlsx.empty:
         st.toast("###### Não há dados para enviar...", icon=":material/error:")
@@ -61,203 +27,7 @@ def preparo_xlsx(year: int, month: int) -> None:
             txt_format = wb.add_format(dict(align="center", bg_color="FFED00", border=2, font_size=12, bold=True))
             txt_format2 = wb.add_format(dict(align="center", bg_color="bfbfbf", border=2, bold=True))
 
-            bruto_div_ano_corrente = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_MVT_REN'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_CORR_MVT_REN'].sum())
-            )
-
-            ir_div_ano_corrente = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_IR_CLCD_MVT_REN'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_IR_CORR_MVT_REN'].sum())
-            )
-
-            liquido_div_ano_corrente = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['LIQUIDO_PRINCIPAL'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['LIQUIDO_CORR'].sum())
-            )
-
-            bruto_div_ano_antes = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year - 1) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_MVT_REN'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year - 1) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_CORR_MVT_REN'].sum())
-            )
-
-            ir_div_ano_antes = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year - 1) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_IR_CLCD_MVT_REN'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year - 1) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_IR_CORR_MVT_REN'].sum())
-            )
-
-            liquido_div_ano_antes = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year - 1) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['LIQUIDO_PRINCIPAL'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year - 1) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['LIQUIDO_CORR'].sum())
-            )
-
-            bruto_div_ano_anterior = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] != year) & (xlsx['ANO_DELIB'] != year - 1) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14)))['VL_MVT_REN'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] != year) & (xlsx['ANO_DELIB'] != year - 1) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_CORR_MVT_REN'].sum())
-            )
-
-            ir_div_ano_anterior = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] != year) & (xlsx['ANO_DELIB'] != year - 1) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_IR_CLCD_MVT_REN'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] != year) & (xlsx['ANO_DELIB'] != year - 1) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_IR_CORR_MVT_REN'].sum())
-            )
-
-            liquido_div_ano_anterior = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] != year) & (xlsx['ANO_DELIB'] != year - 1) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['LIQUIDO_PRINCIPAL'].sum()
-                          ) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] != year) & (xlsx['ANO_DELIB'] != year - 1) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['LIQUIDO_CORR'].sum())
-            )
-
-            bruto_jcp_ano_corrente = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 5) | (xlsx['CD_CLSC_TIP_DRT'] == 10))
-                    )['VL_MVT_REN'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_CORR_MVT_REN'].sum())
-            )
-
-            ir_jcp_ano_corrente = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 5) | (xlsx['CD_CLSC_TIP_DRT'] == 10))
-                    )['VL_IR_CLCD_MVT_REN'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_IR_CORR_MVT_REN'].sum())
-            )
-
-            liquido_jcp_ano_corrente = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 5) | (xlsx['CD_CLSC_TIP_DRT'] == 10))
-                    )['LIQUIDO_PRINCIPAL'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['LIQUIDO_CORR'].sum())
-            )
-
-            bruto_jcp_ano_antes = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year - 1) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 5) | (xlsx['CD_CLSC_TIP_DRT'] == 10))
-                    )['VL_MVT_REN'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year - 1) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_CORR_MVT_REN'].sum())
-            )
-
-            ir_jcp_ano_antes = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year - 1) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 5) | (xlsx['CD_CLSC_TIP_DRT'] == 10))
-                    )['VL_IR_CLCD_MVT_REN'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year - 1) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_IR_CORR_MVT_REN'].sum())
-            )
-
-            liquido_jcp_ano_antes = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year - 1) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 5) | (xlsx['CD_CLSC_TIP_DRT'] == 10))
-                    )['LIQUIDO_PRINCIPAL'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] == year - 1) & (
-                                (xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['LIQUIDO_CORR'].sum())
-            )
-
-            bruto_jcp_ano_anterior = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] != year) & (xlsx['ANO_DELIB'] != year - 1) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 5) | (xlsx['CD_CLSC_TIP_DRT'] == 10))
-                    )['VL_MVT_REN'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] != year) & (xlsx['ANO_DELIB'] != year - 1) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_CORR_MVT_REN'].sum())
-            )
-
-            ir_jcp_ano_anterior = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] != year) & (xlsx['ANO_DELIB'] != year - 1) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 5) | (xlsx['CD_CLSC_TIP_DRT'] == 10))
-                    )['VL_IR_CLCD_MVT_REN'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] != year) & (xlsx['ANO_DELIB'] != year - 1) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['VL_IR_CORR_MVT_REN'].sum())
-            )
-
-            liquido_jcp_ano_anterior = (
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] != year) & (xlsx['ANO_DELIB'] != year - 1) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 5) | (xlsx['CD_CLSC_TIP_DRT'] == 10))
-                    )['LIQUIDO_PRINCIPAL'].sum()) +
-                    float(xlsx.filter(
-                        (xlsx['ANO_DELIB'] != year) & (xlsx['ANO_DELIB'] != year - 1) &
-                        ((xlsx['CD_CLSC_TIP_DRT'] == 1) | (xlsx['CD_CLSC_TIP_DRT'] == 14))
-                    )['LIQUIDO_CORR'].sum())
-            )
+            resumo: pd.DataFrame = rendimentos.resumo_circular_3624(xlsx, year)
 
             ws.set_column(0, 0, 20)
             ws.set_column(1, 6, 18)
@@ -279,24 +49,8 @@ def preparo_xlsx(year: int, month: int) -> None:
             ws.write("A7", f"Anteriores a {year - 1}", txt_format2)
             ws.write("A8", "TOTAL", txt_format2)
 
-            ws.write("B5", bruto_div_ano_corrente, vlr_format)
-            ws.write("C5", ir_div_ano_corrente, vlr_format)
-            ws.write("D5", liquido_div_ano_corrente, vlr_format)
-            ws.write("B6", bruto_div_ano_antes, vlr_format)
-            ws.write("C6", ir_div_ano_antes, vlr_format)
-            ws.write("D6", liquido_div_ano_antes, vlr_format)
-            ws.write("B7", bruto_div_ano_anterior, vlr_format)
-            ws.write("C7", ir_div_ano_anterior, vlr_format)
-            ws.write("D7", liquido_div_ano_anterior, vlr_format)
-            ws.write("E5", bruto_jcp_ano_corrente, vlr_format)
-            ws.write("F5", ir_jcp_ano_corrente, vlr_format)
-            ws.write("G5", liquido_jcp_ano_corrente, vlr_format)
-            ws.write("E6", bruto_jcp_ano_antes, vlr_format)
-            ws.write("F6", ir_jcp_ano_antes, vlr_format)
-            ws.write("G6", liquido_jcp_ano_antes, vlr_format)
-            ws.write("E7", bruto_jcp_ano_anterior, vlr_format)
-            ws.write("F7", ir_jcp_ano_anterior, vlr_format)
-            ws.write("G7", liquido_jcp_ano_anterior, vlr_format)
+            for linha, valores in enumerate(resumo.itertuples(index=False), start=5):
+                ws.write_row(f"B{linha}", valores, vlr_format)
 
             ws.write_formula("B8", "=SUM(B5:B7)", vlr_format2)
             ws.write_formula("C8", "=SUM(C5:C7)", vlr_format2)
@@ -305,8 +59,6 @@ def preparo_xlsx(year: int, month: int) -> None:
             ws.write_formula("F8", "=SUM(F5:F7)", vlr_format2)
             ws.write_formula("G8", "=SUM(G5:G7)", vlr_format2)
 
-            xlsx.write_excel(workbook=wb, worksheet=ws)
-
 
 st.subheader(":material/cycle: Circular BACEN 3624")
 
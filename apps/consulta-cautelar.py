@@ -1,29 +1,25 @@
 import pandas as pd
 import streamlit as st
-from streamlit.connections import SQLConnection
 from unidecode import unidecode
 
-engine: SQLConnection = st.connection(name="DB2", type=SQLConnection)
+from gefid import buscas, db
 
 
 def load_acionista(key: str, value: int | str) -> pd.DataFrame:
-    return engine.query(
-        sql=f"SELECT * FROM DB2I13E5.SISTEMA_ANTIGO_ACIONISTAS WHERE {key.upper()} = :value",
-        show_spinner=False,
-        ttl=0,
+    return db.query(
+        sql=buscas.ACIONISTAS.sql(key),
         params=dict(value=value)
     )
 
 
-def load_certificado(value: tuple) -> pd.DataFrame:
-    return engine.query(
-        sql=f"""
+def load_certificado(value: list[int]) -> pd.DataFrame:
+    return db.buscar(
+        sql="""
             SELECT DISTINCT INSCRICAO, NUMERO_CERT, NR_PRIM_ACAO, DATA_EMIS, QT_ACOES
             FROM DB2I13E5.SISTEMA_ANTIGO_CERTIFICADOS
-            WHERE INSCRICAO IN {value}
+            WHERE INSCRICAO IN :chaves
         """,
-        show_spinner=False,
-        ttl=0,
+        valores=value,
     )
 
 
@@ -79,11 +75,11 @@ if st.session_state["search"]:
             st.toast("###### Não foram encontrados dados da pesquisa...", icon=":material/error:")
             st.stop()
 
-        inscricoes: tuple = tuple(acionistas["inscricao"].astype("int64").drop_duplicates().to_list())
+        inscricoes: list[int] = acionistas["inscricao"].astype("int64").drop_duplicates().to_list()
 
         certificados: pd.DataFrame = load_certificado(value=inscricoes)
 
-        if not certificados.empty:
+        if certificados.empty:
             st.toast("###### Não foram encontrados dados da pesquisa...", icon=":material/error:")
             st.stop()
 
@@ -1,52 +1,9 @@
 import glob
 
-import pandas as pd
 import streamlit as st
 import xlsxwriter
-from streamlit.connections import SQLConnection
-
-engine: SQLConnection = st.connection("DB2", type=SQLConnection)
-
-
-@st.cache_data(show_spinner="**:material/hourglass: Preparando a listagem da empresa, aguarde...**")
-def load_active(active: str) -> dict[str, int]:
-    load: pd.DataFrame = engine.query(
-        sql=f"""
-            SELECT t1.CD_CLI_EMT AS MCI, STRIP(t2.NOM) AS NOM
-            FROM DB2AEB.PRM_EMP AS t1 INNER JOIN DB2MCI.CLIENTE AS t2 ON t2.COD = t1.CD_CLI_EMT
-            WHERE t1.DT_ECR_CTR IS {active.upper()}
-            ORDER BY STRIP(t2.NOM)
-        """,
-        show_spinner=False,
-        ttl=0,
-    )
-    return {k: v for k, v in zip(load["nom"].to_list(), load["mci"].to_list())}
-
-
-def load_report(_mci: int) -> tuple[str, ...]:
-    load: pd.DataFrame = engine.query(
-        sql="""
-            SELECT
-                t1.CD_CLI_EMT AS MCI,
-                STRIP(t2.NOM) AS EMPRESA,
-                CASE
-                    WHEN t2.COD_TIPO = 2 THEN LPAD(t2.COD_CPF_CGC, 14, '0')
-                    ELSE LPAD(t2.COD_CPF_CGC, 11, '0')
-                END AS CNPJ,
-                STRIP(t1.SG_EMP) AS SIGLA
-                FROM
-                DB2AEB.PRM_EMP t1
-                    INNER JOIN DB2MCI.CLIENTE t2
-                        ON t2.COD = t1.CD_CLI_EMT
-            WHERE
-                t1.CD_CLI_EMT = :mci
-            """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(mci=_mci),
-    )
-
-    return str(load["mci"].iloc[0]), load["empresa"].iloc[0], load["cnpj"].iloc[0], load["sigla"].iloc[0]
+
+from gefid import catalogo, rendimentos
 
 
 st.subheader(":material/dynamic_form: DIPJ")
@@ -58,7 +15,7 @@ st.columns(2)[0].markdown("##### Devem ser colocados 12 arquivos 064B da mesma e
 col1 = st.columns(2)[0]
 col1.radio(label="**Situação de Clientes:**", options=["ativos", "inativos"], key="option")
 
-kv: dict[str, int] = load_active("null") if st.session_state["option"] == "ativos" else load_active("not null")
+kv: dict[str, int] = catalogo.clientes(st.session_state["option"] == "ativos")
 
 col1.selectbox(
     label="**Clientes ativos:**" if st.session_state["option"] == "ativos" else "**Clientes inativos:**",
@@ -69,7 +26,8 @@ col1.selectbox(
 mci: int = kv.get(st.session_state["empresa"])
 
 if st.button("**Gerar DIPJ**", type="primary", icon=":material/save:"):
-    mci_emissor, nome_emissor, cnpj_emissor, cod_aeb = load_report(mci)
+    emissor: catalogo.Emissor = catalogo.emissor(mci)
+    mci_emissor, nome_emissor, cnpj_emissor, cod_aeb = emissor.mci, emissor.nome, emissor.cnpj, emissor.sigla
 
     diretorio_origem: str = "static/escriturais/@deletar"
     diretorio_destino: str = "static/escriturais/@deletar"
@@ -89,42 +47,7 @@ if st.button("**Gerar DIPJ**", type="primary", icon=":material/save:"):
         st.stop()
 
     with st.spinner("**:material/hourglass: Verificando os dados, aguarde...**", show_time=True):
-        li = []
-
-        # criando dict para modelar o dataframe com os 12 meses
-        mod: dict[str, list[int | str]] = {
-            "Ano Ref": ["9999", "9999", "9999", "9999", "9999", "9999", "9999", "9999", "9999", "9999", "9999", "9999"],
-            "MCI Emissor": ["999999999", "999999999", "999999999", "999999999", "999999999", "999999999", "999999999",
-                            "999999999", "999999999", "999999999", "999999999", "999999999"],
-            "País": ["BRA", "BRA", "BRA", "BRA", "BRA", "BRA", "BRA", "BRA", "BRA", "BRA", "BRA", "BRA"],
-            "Tipo Pessoa": ["99", "99", "99", "99", "99", "99", "99", "99", "99", "99", "99", "99"],
-            "Mês Ref": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12],
-            "Tipo Direito": ["DIVIDENDOS", "DIVIDENDOS", "DIVIDENDOS", "DIVIDENDOS", "DIVIDENDOS", "DIVIDENDOS",
-                             "DIVIDENDOS", "DIVIDENDOS", "DIVIDENDOS", "DIVIDENDOS", "DIVIDENDOS", "DIVIDENDOS"],
-            "Vlr Bruto": [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            "Vlr IR": [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            "Vlr Líquido": [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
-        }
-
-        li.append(pd.DataFrame.from_dict(mod))
-
-        for filename in all_files:
-            df: pd.DataFrame = pd.read_fwf(
-                filepath_or_buffer=filename,
-                colspecs=[(0, 4), (4, 6), (6, 15), (15, 18), (18, 19), (19, 59),
-                          (59, 76), (76, 93), (93, 110), (110, 133)],
-                names=["Ano Ref", "Mês Ref", "MCI Emissor", "País", "Tipo Pessoa",
-                       "Tipo Direito", "Vlr Bruto", "Vlr IR", "Vlr Líquido", "Controle"],
-                encoding="latin"
-            )
-
-            # guardando a informação do ano do último arquivo lido
-            ano: str = str(df.iat[0, 0])
-            dfs = df[pd.isnull(df["Controle"]) & df["Mês Ref"].ne(99) & df["MCI Emissor"].eq(mci_emissor)]
-
-            li.append(dfs)
-
-        dfs = pd.concat(li, axis=0, ignore_index=True, verify_integrity=True)
+        dfs, ano = rendimentos.ler_dipj(all_files, mci_emissor)
 
         # Verificando se todos os arquivos são do mesmo ano e guardando o ano caso
         if len(dfs["Ano Ref"].unique()) == 1:
@@ -140,18 +63,7 @@ if st.button("**Gerar DIPJ**", type="primary", icon=":material/save:"):
             st.stop()
 
     with st.spinner("**:material/hourglass: Verificando os dados, aguarde...**", show_time=True):
-        table = pd.pivot_table(dfs, values=["Vlr Bruto", "Vlr IR", "Vlr Líquido"],
-                           index=["País", "Tipo Pessoa", "Tipo Direito"],
-                           columns=["Mês Ref"], sort=False)
-
-        # substitui nan por zeros
-        table = table.fillna(0)
-
-        # resetando os index para eliminar a hierarquia
-        table = table.reset_index()
-
-        # eliminando a primeira linha que foi criada só para gerar o modelo com os 12 meses
-        table = table.drop(labels=0, axis=0)
+        table = rendimentos.pivot_dipj(dfs)
 
         # criando o workbook e a worksheet com o xlsxwriter
         workbook = xlsxwriter.Workbook(f"{diretorio_destino}/DIPJ {cod_aeb} {ano}.xlsx")
@@ -1,77 +1,19 @@
+from functools import partial
+
 import pandas as pd
 import streamlit as st
-from streamlit.connections import SQLConnection
 from unidecode import unidecode
 
-engine: SQLConnection = st.connection(name="DB2", type=SQLConnection)
+from gefid import buscas, catalogo, db, dimensoes, tipos
 
 
-@st.cache_data(show_spinner="**:material/hourglass: Preparando a listagem da empresa, aguarde...**")
-def load_client() -> dict[str, int]:
-    load: pd.DataFrame = engine.query(
-        sql="""
-            SELECT t1.CD_CLI_EMT AS MCI, STRIP(t2.NOM) AS NOM
-            FROM DB2AEB.PRM_EMP t1 INNER JOIN DB2MCI.CLIENTE t2 ON t2.COD = t1.CD_CLI_EMT
-            WHERE t1.DT_ECR_CTR IS NULL
-            ORDER BY STRIP(t2.NOM)
-        """,
-        show_spinner=False,
-        ttl=0
-    )
-    return {k: v for k, v in zip(load["nom"].to_list(), load["mci"].to_list())}
+def load_empresa(field: str, value: int | str) -> pd.DataFrame:
+    return db.query(sql=buscas.EMPRESA.sql(field), params=dict(value=value))
 
 
-def load_empresa(field: str, value: int | str) -> pd.DataFrame:
-    return engine.query(
-        sql=f"""
-            SELECT
-                COD AS MCI_EMPRESA,
-                STRIP(NOM) AS NOME_EMPRESA,
-                CASE
-                    WHEN COD_TIPO = 2 THEN LPAD(COD_CPF_CGC, 14, '0')
-                    ELSE LPAD(COD_CPF_CGC, 11, '0')
-                END AS CNPJ_EMPRESA
-            FROM
-                DB2MCI.CLIENTE
-            WHERE
-                {field.upper()} = :value
-        """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(value=value)
-    )
-
-
-def load_extrato(join: str, field: str, _mci: int, value: int | str) -> pd.DataFrame:
-    return engine.query(
-        sql=f"""
-            SELECT
-                t0.SG_TIP_TIT AS SIGLA,
-                t1.CD_TIP_TIT AS TIPO,
-                t1.DT_MVTC AS DATA_MVTC,
-                SUM(CAST(t1.QT_TIT_MVTD AS BIGINT)) AS MOVIMENTO,
-                SUM(CAST(t1.QT_TIT_ATU AS BIGINT)) AS SALDO,
-                CAST(SUM(t1.QT_TIT_ATU - t1.QT_TIT_MVTD) AS BIGINT) AS SALDO_ANTERIOR,
-                t1.CD_CLI_CSTD AS MCI_CUSTODIANTE
-            FROM
-                DB2AEB.TIP_TIT t0
-                RIGHT JOIN DB2AEB.MVTC_DIAR_PSC t1
-                    ON t1.CD_TIP_TIT = t0.CD_TIP_TIT{join}
-            WHERE
-                t1.CD_CLI_EMT = :mci AND
-                {field} = :value
-            GROUP BY
-                t0.SG_TIP_TIT,
-                t1.CD_TIP_TIT,
-                t1.DT_MVTC,
-                t1.CD_CLI_CSTD
-            ORDER BY
-                t1.DT_MVTC
-        """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(mci=_mci, value=value)
-    )
+def load_extrato(field: str, _mci: int, value: int | str) -> pd.DataFrame:
+    load: pd.DataFrame = db.query(sql=buscas.EXTRATO_MOVIMENTACAO.sql(field), params=dict(mci=_mci, value=value))
+    return dimensoes.rotular(load, sigla="tipo_titulo")
 
 
 with st.columns(2)[0]:
@@ -79,7 +21,7 @@ with st.columns(2)[0]:
 
     st.markdown("##### Extrato de Movimentação de Ativos dos últimos 12 meses")
 
-    kv: dict[str, int] = load_client()
+    kv: dict[str, int] = catalogo.clientes()
 
     st.selectbox(label="**Empresa:**", options=kv.keys(), key="empresa")
     st.text_input(label="**Nome Investidor:**", max_chars=100, key="nome_inv")
@@ -109,25 +51,26 @@ if st.session_state["search"]:
         st.stop()
 
     with st.spinner("**:material/hourglass: Preparando os dados para exibir, aguarde...**", show_time=True):
-        cliente: pd.DataFrame = load_empresa("cod", mci)
-
-        investidor: pd.DataFrame = load_empresa(
-            field="nom" if st.session_state["nome_inv"] else "cod" if st.session_state["mci_inv"]
-            else "cod_cpf_cgc",
-            value=unidecode(st.session_state["nome_inv"]).upper() if st.session_state["nome_inv"]
-            else st.session_state["mci_inv"] if st.session_state["mci_inv"]
-            else st.session_state["cpf_cnpj_inv"],
-        )
-
-        extrato: pd.DataFrame = load_extrato(
-            join=" LEFT JOIN DB2MCI.CLIENTE t2 ON t2.COD = t1.CD_CLI_EMT" if st.session_state["nome_inv"]
-            else "" if st.session_state["mci_inv"] else " INNER JOIN DB2MCI.CLIENTE t2 ON t2.COD = t1.CD_CLI_EMT",
-            field="t2.NOM" if st.session_state["nome_inv"] else "t1.CD_CLI_ACNT" if st.session_state["mci_inv"]
-            else "t2.COD_CPF_CGC",
-            _mci=mci,
-            value=unidecode(st.session_state["nome_inv"]).upper() if st.session_state["nome_inv"]
-            else st.session_state["mci_inv"] if st.session_state["mci_inv"]
-            else st.session_state["cpf_cnpj_inv"],
+        # as três consultas não dependem umas das outras e vão juntas ao DB2
+        cliente, investidor, extrato = db.gather(
+            partial(load_empresa, "cod", mci),
+            partial(
+                load_empresa,
+                field="nom" if st.session_state["nome_inv"] else "cod" if st.session_state["mci_inv"]
+                else "cod_cpf_cgc",
+                value=unidecode(st.session_state["nome_inv"]).upper() if st.session_state["nome_inv"]
+                else st.session_state["mci_inv"] if st.session_state["mci_inv"]
+                else st.session_state["cpf_cnpj_inv"],
+            ),
+            partial(
+                load_extrato,
+                field="nom" if st.session_state["nome_inv"] else "cod" if st.session_state["mci_inv"]
+                else "cod_cpf_cgc",
+                _mci=mci,
+                value=unidecode(st.session_state["nome_inv"]).upper() if st.session_state["nome_inv"]
+                else st.session_state["mci_inv"] if st.session_state["mci_inv"]
+                else st.session_state["cpf_cnpj_inv"],
+            ),
         )
 
         extrato = extrato[extrato["mci_custodiante"].eq(idx_custodia)] if idx_custodia != 0 else extrato
@@ -152,7 +95,7 @@ if st.session_state["search"]:
                 st.markdown("")
 
                 st.dataframe(
-                    data=extrato,
+                    data=tipos.exibir(extrato),
                     hide_index=True,
                     use_container_width=True,
                     column_config={
@@ -2,84 +2,26 @@ import locale
 
 import pandas as pd
 import streamlit as st
-from streamlit.connections import SQLConnection
 from unidecode import unidecode
 
-locale.setlocale(locale.LC_ALL, "pt_BR.UTF-8")
-
-engine: SQLConnection = st.connection(name="DB2", type=SQLConnection)
+from gefid import buscas, catalogo, db, dimensoes, tipos
 
+locale.setlocale(locale.LC_ALL, "pt_BR.UTF-8")
 
-@st.cache_data(show_spinner="**:material/hourglass: Preparando a listagem da empresa, aguarde...**")
-def load_client() -> dict[str, int]:
-    load: pd.DataFrame = engine.query(
-        sql="""
-            SELECT t1.CD_CLI_EMT AS MCI, STRIP(t2.NOM) AS NOM
-            FROM DB2AEB.PRM_EMP t1 INNER JOIN DB2MCI.CLIENTE t2 ON t2.COD = t1.CD_CLI_EMT
-            WHERE t1.DT_ECR_CTR IS NULL
-            ORDER BY STRIP(t2.NOM)
-        """,
-        show_spinner=False,
-        ttl=0
-    )
-    return {k: v for k, v in zip(load["nom"].to_list(), load["mci"].to_list())}
 
 
 def load_cadastro(field: str, value: int | str) -> pd.DataFrame:
-    return engine.query(
-        sql=f"""
-            SELECT t1.COD AS MCI_EMPRESA, STRIP(t1.NOM) AS EMPRESA, LPAD(t1.COD_CPF_CGC, 14, '0') AS CNPJ
-            FROM DB2MCI.CLIENTE t1
-            WHERE t1.{field.upper()} = :value
-        """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(value=value),
-    )
+    return db.query(sql=buscas.CADASTRO_EMPRESA.sql(field), params=dict(value=value), classe="leve")
 
 
 def load_extrato(field: str, _mci: int, value: int | str) -> pd.DataFrame:
-    return engine.query(
-        sql=f"""
-            SELECT
-                t1.CD_TIP_TIT AS TIPO,
-                t1.DT_MVT_DRT AS DATA_MVT,
-                CAST(t1.QT_MVT_REN AS INT) AS QUANTIDADE,
-                CAST(t1.VL_MVT_REN AS FLOAT) AS VALOR,
-                CAST(t1.VL_IR_CLCD_MVT_REN AS FLOAT) AS VALOR_IR,
-                CAST(t1.VL_MVT_REN - t1.VL_IR_CLCD_MVT_REN AS FLOAT) AS VALOR_LIQUIDO,
-                t3.NM_TIP_DRT AS TIPO_DIREITO,
-                t4.NM_EST_DRT AS ESTADO,
-                CASE
-                    WHEN t1.CD_FMA_PGTO_REN = 1 THEN 'CAIXA'
-                    WHEN t1.CD_FMA_PGTO_REN = 2 THEN 'CONTA'
-                    ELSE '-'
-                END AS FORMA_PAGAMENTO
-            FROM
-                DB2AEB.MVT_REN t1
-                    INNER JOIN DB2MCI.CLIENTE t2
-                        ON t2.COD = t1.CD_CLI_TITR
-                    INNER JOIN DB2AEB.TIP_DRT t3
-                        ON t3.CD_TIP_DRT = t1.CD_TIP_DRT
-                    INNER JOIN DB2AEB.EST_DRT t4
-                        ON t4.CD_EST_DRT = t1.CD_EST_DRT
-            WHERE
-                t1.CD_CLI_EMT = :mci AND
-                {field} = :value
-            ORDER BY
-                t1.DT_MVT_DRT,
-                t1.CD_EST_DRT,
-                t1.CD_TIP_DRT
-        """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(mci=_mci, value=value),
-    )
+    load: pd.DataFrame = db.query(sql=buscas.EXTRATO_RENDIMENTOS.sql(field), params=dict(mci=_mci, value=value))
+    return dimensoes.rotular(load, juncao="inner", tipo_direito="direito", estado="estado")
 
 
 st.subheader(":material/local_atm: Extrato de Rendimentos")
 
-kv: dict[str, int] = load_client()
+kv: dict[str, int] = catalogo.clientes()
 
 with st.columns(2)[0]:
     st.selectbox("**Empresa:**", options=kv.keys(), key="empresa")
@@ -118,9 +60,8 @@ if st.session_state["pesquisar"]:
         )
 
         df_extrato: pd.DataFrame = load_extrato(
-            field="t2.NOM" if st.session_state["nome_investidor"] else
-            "t1.CD_CLI_TITR" if st.session_state["mci_investidor"] else
-            "t2.COD_CPF_CGC",
+            field="nom" if st.session_state["nome_investidor"] else
+            "cod" if st.session_state["mci_investidor"] else "cod_cpf_cgc",
             _mci=mci,
             value=unidecode(st.session_state["nome_investidor"]).upper() if st.session_state["nome_investidor"] else
             st.session_state["mci_investidor"] if st.session_state["mci_investidor"] else
@@ -129,7 +70,7 @@ if st.session_state["pesquisar"]:
 
         if not df_extrato.empty:
             st.data_editor(
-                data=df_extrato,
+                data=tipos.exibir(df_extrato),
                 hide_index=True,
                 use_container_width=True,
                 column_config={
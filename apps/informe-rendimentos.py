@@ -1,80 +1,31 @@
 import re
 from datetime import date
+from functools import partial
 
 import pandas as pd
 import streamlit as st
-from streamlit.connections import SQLConnection
 from streamlit.elements.lib.column_types import ColumnConfig
 from unidecode import unidecode
 
-engine: SQLConnection = st.connection(name="DB2", type=SQLConnection)
+from gefid import buscas, cache, db
 
 
 def get_join_email(key: str, value: int | str) -> pd.DataFrame:
-    return engine.query(
-        sql=f"""
-            SELECT DISTINCT
-                t1.CD_CLI_ACNT AS MCI_INVESTIDOR,
-                CASE
-                    WHEN t1.CD_EST_PRCT = 13 THEN 'EMAIL ENVIADO'
-                    ELSE 'NÃO ENVIADO'
-                END AS STATUS,
-                t1.TS_INC_PRCT_EMAI AS LOG,
-                t1.TX_END_EMAI AS EMAIL
-            FROM
-                DB2I13E5.IR{date.today().year}_ENVIO_EMAILS t1
-                LEFT JOIN DB2I13E5.IR{date.today().year}_CADASTRO_BB t2
-                    ON t2.MCI_INVESTIDOR = t1.CD_CLI_ACNT
-                LEFT JOIN DB2I13E5.IR{date.today().year}_CADASTRO_B3 t3
-                    ON t3.MCI_INVESTIDOR = t1.CD_CLI_ACNT
-            WHERE
-                t2.{key.upper()} = :value OR
-                t3.{key.upper()} = :value
-        """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(value=value),
-    )
+    return db.query(sql=buscas.envio_emails_cadastro(date.today().year).sql(key), params=dict(value=value))
 
 
 def get_email(key: str, value: int | str) -> pd.DataFrame:
-    return engine.query(
-        sql=f"""
-            SELECT DISTINCT
-                CD_CLI_ACNT AS MCI_INVESTIDOR,
-                CASE
-                    WHEN CD_EST_PRCT = 13 THEN 'EMAIL ENVIADO'
-                    ELSE 'NÃO ENVIADO'
-                END AS STATUS,
-                TS_INC_PRCT_EMAI AS LOG,
-                TX_END_EMAI AS EMAIL
-            FROM
-                DB2I13E5.IR{date.today().year}_ENVIO_EMAILS
-            WHERE
-                {key.upper()} = :value
-        """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(value=value),
-    )
+    return db.query(sql=buscas.envio_emails(date.today().year).sql(key), params=dict(value=value))
 
 
+@cache.dados(ttl=60)
 def get_bb(key: str, value: int | str) -> pd.DataFrame:
-    return engine.query(
-        sql=f"SELECT * FROM DB2I13E5.IR2025_CADASTRO_BB WHERE {key.upper()} = :value",
-        show_spinner=False,
-        ttl=60,
-        params=dict(value=value),
-    )
+    return db.query(sql=buscas.CADASTRO_IR_BB.sql(key), params=dict(value=value))
 
 
+@cache.dados(ttl=60)
 def get_b3(key: str, value: int | str) -> pd.DataFrame:
-    return engine.query(
-        sql=f"SELECT * FROM DB2I13E5.IR2025_CADASTRO_B3 WHERE {key.upper()} = :value",
-        show_spinner=False,
-        ttl=60,
-        params=dict(value=value),
-    )
+    return db.query(sql=buscas.CADASTRO_IR_B3.sql(key), params=dict(value=value))
 
 
 st.subheader(f":material/ad: Informe de Rendimentos - {date.today().year}")
@@ -146,35 +97,35 @@ if st.session_state["search"]:
 
     with st.spinner(text=":material/hourglass: Obtendo os dados, aguarde...", show_time=True):
         if st.session_state["nome_inv"] != "":
-            report(
-                get_join_email("investidor", unidecode(st.session_state["nome_inv"]).upper()),
-                get_bb("investidor", unidecode(st.session_state["nome_inv"]).upper()),
-                get_b3("investidor", unidecode(st.session_state["nome_inv"]).upper())
-            )
+            report(*db.gather(
+                partial(get_join_email, "investidor", unidecode(st.session_state["nome_inv"]).upper()),
+                partial(get_bb, "investidor", unidecode(st.session_state["nome_inv"]).upper()),
+                partial(get_b3, "investidor", unidecode(st.session_state["nome_inv"]).upper()),
+            ))
 
         elif st.session_state["mci_inv"] != "":
             if re.sub(r"\D", "", st.session_state["mci_inv"]):
-                report(
-                    get_email("cd_cli_acnt", re.sub(r"\D", "", st.session_state["mci_inv"])),
-                    get_bb("mci_investidor", re.sub(r"\D", "", st.session_state["mci_inv"])),
-                    get_b3("mci_investidor", re.sub(r"\D", "", st.session_state["mci_inv"]))
-                )
+                report(*db.gather(
+                    partial(get_email, "cd_cli_acnt", re.sub(r"\D", "", st.session_state["mci_inv"])),
+                    partial(get_bb, "mci_investidor", re.sub(r"\D", "", st.session_state["mci_inv"])),
+                    partial(get_b3, "mci_investidor", re.sub(r"\D", "", st.session_state["mci_inv"])),
+                ))
             else:
                 st.toast("###### O campo MCI está inválido...", icon=":material/warning:")
 
         elif st.session_state["cpf_cnpj"] != "":
             if re.sub(r"\D", "", st.session_state["cpf_cnpj"]):
-                report(
-                    get_join_email("cpf_cnpj", re.sub("\D", "", st.session_state["cpf_cnpj"])),
-                    get_bb("cpf_cnpj", re.sub("\D", "", st.session_state["cpf_cnpj"])),
-                    get_b3("cpf_cnpj", re.sub("\D", "", st.session_state["cpf_cnpj"]))
-                )
+                report(*db.gather(
+                    partial(get_join_email, "cpf_cnpj", re.sub("\D", "", st.session_state["cpf_cnpj"])),
+                    partial(get_bb, "cpf_cnpj", re.sub("\D", "", st.session_state["cpf_cnpj"])),
+                    partial(get_b3, "cpf_cnpj", re.sub("\D", "", st.session_state["cpf_cnpj"])),
+                ))
             else:
                 st.toast("###### O Campo CPF / CNPJ está inválido...", icon=":material/warning:")
 
         elif st.session_state["mail_inv"] != "":
-            report(
-                get_email("tx_end_emai", st.session_state["mail_inv"].lower()),
-                get_bb("email", st.session_state["mail_inv"].lower()),
-                get_b3("email", st.session_state["mail_inv"].lower())
-            )
+            report(*db.gather(
+                partial(get_email, "tx_end_emai", st.session_state["mail_inv"].lower()),
+                partial(get_bb, "email", st.session_state["mail_inv"].lower()),
+                partial(get_b3, "email", st.session_state["mail_inv"].lower()),
+            ))
@@ -1,6 +1,6 @@
 import os
 import smtplib
-from datetime import date, timedelta
+from datetime import date
 from email import encoders
 from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
@@ -15,122 +15,8 @@ from reportlab.lib.styles import ParagraphStyle
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
-from streamlit.connections import SQLConnection
-
-engine: SQLConnection = st.connection(name="DB2", type=SQLConnection)
-
-
-@st.cache_data(show_spinner="**:material/hourglass: Preparando a listagem da empresa, aguarde...**")
-def load_client() -> dict[str, int]:
-    load: pd.DataFrame = engine.query(
-        sql="""
-            SELECT t1.CD_CLI_EMT AS MCI, STRIP(t2.NOM) AS NOM
-            FROM DB2AEB.PRM_EMP t1 INNER JOIN DB2MCI.CLIENTE t2 ON t2.COD = t1.CD_CLI_EMT
-            WHERE t1.DT_ECR_CTR IS NULL
-            ORDER BY STRIP(t2.NOM)
-        """,
-        show_spinner=False,
-        ttl=0
-    )
-    return {k: v for k, v in zip(load["nom"].to_list(), load["mci"].to_list())}
-
-
-def load_empresa(_mci: int, _data_ant: date, _data_atual: date) -> pd.DataFrame:
-    return engine.query(
-        sql=f"""
-            SELECT
-                t5.CD_CLI_ACNT AS MCI,
-                STRIP(CASE
-                    WHEN t5.CD_CLI_ACNT < 1000000000 THEN t6.NOM
-                    ELSE t8.NM_INVR
-                END) AS INVESTIDOR,
-                CASE
-                    WHEN t5.CD_CLI_ACNT < 1000000000 THEN
-                        CASE
-                            WHEN t6.COD_TIPO = 2 THEN LPAD(CAST(t6.COD_CPF_CGC AS BIGINT), 14, '0')
-                            ELSE LPAD(CAST(t6.COD_CPF_CGC AS BIGINT), 14, '0')
-                        END
-                    ELSE
-                        CASE
-                            WHEN t6.COD_TIPO = 2 THEN LPAD(CAST(t8.NR_CPF_CNPJ_INVR AS BIGINT), 14, '0')
-                            ELSE LPAD(CAST(t8.NR_CPF_CNPJ_INVR AS BIGINT), 14, '0')
-                        END
-                END AS CPF_CNPJ,
-                t5.CD_TIP_TIT AS COD_TITULO,
-                STRIP(t7.SG_TIP_TIT) || ' ' || STRIP(t7.CD_CLS_TIP_TIT) AS SIGLA,
-                CAST(t5.QUANTIDADE AS BIGINT) AS QTD,
-                CASE
-                    WHEN t5.CD_CLI_CSTD = 903485186 THEN 'ESCRITURAL'
-                    ELSE 'CUSTÓDIA'
-                END AS CUSTODIANTE
-            FROM (
-                SELECT
-                    CD_CLI_EMT,
-                    CD_TIP_TIT,
-                    CD_CLI_ACNT,
-                    CD_CLI_CSTD,
-                    DATA,
-                    QUANTIDADE
-                FROM (
-                    SELECT
-                        t1.CD_CLI_EMT,
-                        t1.CD_TIP_TIT,
-                        t1.CD_CLI_ACNT,
-                        t1.CD_CLI_CSTD,
-                        t1.DT_MVTC AS DATA,
-                        t1.QT_TIT_ATU AS QUANTIDADE
-                    FROM
-                        DB2AEB.MVTC_DIAR_PSC t1
-                    WHERE
-                        t1.CD_CLI_EMT = :mci AND
-                        t1.CD_CLI_ACNT <> 205007939
-                    UNION ALL
-                    SELECT
-                        t1.CD_CLI_EMT,
-                        t1.CD_TIP_TIT,
-                        t1.CD_CLI_ACNT,
-                        t1.CD_CLI_CSTD,
-                        t1.DT_PSC - 1 DAY AS DATA,
-                        t1.QT_TIT_INC_MM AS QUANTIDADE
-                    FROM
-                        DB2AEB.PSC_TIT_MVTD t1
-                    WHERE
-                        t1.CD_CLI_EMT = :mci AND
-                        t1.CD_CLI_ACNT <> 205007939
-                )
-            ) t5
-                LEFT JOIN DB2MCI.CLIENTE t6
-                    ON t6.COD = t5.CD_CLI_ACNT
-                LEFT JOIN DB2AEB.TIP_TIT t7
-                    ON t7.CD_TIP_TIT = t5.CD_TIP_TIT
-                LEFT JOIN DB2AEB.VCL_ACNT_BLS t8
-                    ON t8.CD_CLI_ACNT = t5.CD_CLI_ACNT
-            WHERE
-                DATA BETWEEN :data_ant AND :data_atual AND
-                t5.CD_CLI_ACNT NOT IN (:mci, 205007939)
-            ORDER BY
-                CAST(t5.CD_CLI_ACNT AS INTEGER),
-                DATA DESC
-        """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(mci=_mci, data_ant=_data_ant, data_atual=_data_atual)
-    )
-
-
-def load_cadastro(_mci: int) -> tuple[str, ...]:
-    load: pd.DataFrame = engine.query(
-        sql="""
-            SELECT t1.CD_CLI_EMT AS MCI, STRIP(t2.NOM) AS EMPRESA, LPAD(t2.COD_CPF_CGC, 14, '0') AS CNPJ
-            FROM DB2AEB.PRM_EMP t1 INNER JOIN DB2MCI.CLIENTE t2 ON t2.COD = t1.CD_CLI_EMT
-            WHERE t1.CD_CLI_EMT = :mci
-        """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(mci=_mci)
-    )
-
-    return str(load["mci"].iloc[0]), load["empresa"].iloc[0], load["cnpj"].iloc[0]
+
+from gefid import catalogo, investidores, telemetria
 
 
 @st.dialog("Despachar E-mail")
@@ -176,7 +62,10 @@ def send_mail() -> None:
 
         msg.attach(part)
 
-        with smtplib.SMTP("smtp.bb.com.br", 25) as server:
+        with (
+            telemetria.SMTP_SEGUNDOS.medir(pagina="maiores-investidores"),
+            smtplib.SMTP("smtp.bb.com.br", 25) as server,
+        ):
             server.set_debuglevel(1)
 
             try:
@@ -205,7 +94,7 @@ with open("static/arquivos/protocolador/protocolador.txt") as file2:
 
 st.markdown(f"Protocolo: **{date.today().year}** / DIEST: **{last_protocol}**")
 
-kv: dict[str, int] = load_client()
+kv: dict[str, int] = catalogo.clientes()
 
 st.columns(2)[0].selectbox("**Clientes Ativos:**", options=kv.keys(), key="empresa")
 
@@ -229,33 +118,12 @@ if st.session_state["montar"]:
         pdfmetrics.registerFont(TTFont("VeraIt", "VeraIt.ttf"))
         pdfmetrics.registerFont(TTFont("VeraBI", "VeraBI.ttf"))
 
-        data_ant: date = (st.session_state["data"].replace(day=1) - timedelta(days=1)).replace(day=28)
-
-        base: pd.DataFrame = load_empresa(mci, data_ant, st.session_state["data"]) \
-            .rename(columns={"investidor": "INVESTIDOR", "cpf_cnpj": "CPF_CNPJ", "sigla": "SIGLA", "qtd": "QTD"})
+        base: pd.DataFrame = investidores.maiores(mci, st.session_state["data"], st.session_state["quantidade"])
 
         if base.empty:
             st.toast("###### Não há dados para montar a declaração...**", icon=":material/warning:")
             st.stop()
 
-        base["pk"] = base.apply(lambda x: f"{x['mci']}-{x['cod_titulo']}-{x['custodiante']}", axis=1)
-        base = base.groupby("pk").first()
-        base = base[base["QTD"].ne(0)]
-
-        base.drop(["mci", "cod_titulo", "custodiante"], axis=1, inplace=True)
-
-        if len(base["SIGLA"].unique()) == 1:
-            base.pop("SIGLA")
-            base = base.groupby("CPF_CNPJ").agg({"INVESTIDOR": "first", "CPF_CNPJ": "first", "QTD": "sum"})
-
-        else:
-            base = base.groupby(["CPF_CNPJ", "SIGLA"]).agg({"INVESTIDOR": "first", "CPF_CNPJ": "first",
-                                                            "SIGLA": "first", "QTD": "sum"})
-
-        base = base.sort_values(["QTD"], ascending=False)
-        base.reset_index(drop=True, inplace=True)
-        base = base[:st.session_state["quantidade"]]
-
         # definindo estilos que serão usados na carta
         header: ParagraphStyle = ParagraphStyle("header", fontName="Vera", fontSize=11, textColor=colors.black,
                                                 aligment="right")
@@ -263,7 +131,8 @@ if st.session_state["montar"]:
                                                  aligment="justify")
         footer: ParagraphStyle = ParagraphStyle("header", fontName="Vera", fontSize=8, textColor=colors.black)
 
-        mci_empresa, nome_empresa, cnpj_empresa = load_cadastro(mci)
+        emissor: catalogo.Emissor = catalogo.emissor(mci)
+        nome_empresa, cnpj_empresa = emissor.nome, emissor.cnpj
 
         elements = [
             Image(filename="static/imagens/bb.jpg", width=300, height=38),
@@ -318,7 +187,8 @@ if st.session_state["montar"]:
                      f"MaioresAcionistas.pdf",
             pagesize=A4
         )
-        pdf.build(elements)
+        with telemetria.PDF_SEGUNDOS.medir(pagina="maiores-investidores"):
+            pdf.build(elements)
 
         st.toast("###### Declaração gerada com sucesso! Pode clicar Preparar E-mail.", icon=":material/check_circle:")
 
@@ -1,96 +1,70 @@
-import io
+from collections.abc import Iterator
 
 import pandas as pd
 import streamlit as st
-from streamlit.connections import SQLConnection
-
-engine: SQLConnection = st.connection(name="DB2", type=SQLConnection)
-
-
-@st.cache_data(show_spinner="**:material/hourglass: Carregando a listagem de empresa, aguarde...**")
-def load_active(active: str) -> dict[str, int]:
-    load: pd.DataFrame = engine.query(
-        sql=f"""
-            SELECT t1.CD_CLI_EMT AS MCI, STRIP(t2.NOM) AS NOM
-            FROM DB2AEB.PRM_EMP AS t1 INNER JOIN DB2MCI.CLIENTE AS t2 ON t2.COD = t1.CD_CLI_EMT
-            WHERE t1.DT_ECR_CTR IS {active}
-            ORDER BY STRIP(t2.NOM)
-        """,
-        show_spinner=False,
-        ttl=0,
-    )
-    return {k: v for k, v in zip(load["nom"].to_list(), load["mci"].to_list())}
+
+from gefid import catalogo, db, dimensoes, exportar, resultados, tipos
+
+
+SQL_REPORT: str = """
+    SELECT
+        t1.CD_CLI_TITR AS MCI,
+        STRIP(t2.NOM) AS INVESTIDOR,
+        CASE
+            WHEN t2.COD_TIPO = 2 THEN LPAD(CAST(t2.COD_CPF_CGC AS BIGINT), 14, '0')
+            ELSE LPAD(CAST(t2.COD_CPF_CGC AS BIGINT), 11, '0')
+        END AS CPF_CNPJ,
+        CASE WHEN t2.COD_TIPO = 1 THEN 'PF' ELSE 'PJ' END AS TIPO_PESSOA,
+        t1.DT_MVT_DRT AS DATA,
+        t1.CD_TIP_DRT AS DIREITO,
+        t1.CD_TIP_TIT AS SIGLA,
+        t1.VL_MVT_REN AS VALOR,
+        t1.VL_IR_CLCD_MVT_REN AS VALOR_IR,
+        t1.VL_MVT_REN - t1.VL_IR_CLCD_MVT_REN AS VALOR_LIQUIDO
+    FROM
+        DB2AEB.MVT_REN t1
+        FULL JOIN DB2MCI.CLIENTE t2
+            ON t2.COD = t1.CD_CLI_TITR
+    WHERE
+        t1.CD_CLI_DLBC = :mci AND
+        t1.CD_EST_DRT IN (2, 22, 23)
+    ORDER BY
+        STRIP(t2.NOM),
+        t1.DT_MVT_DRT
+"""
+
+# tipos das colunas do relatório: ids em int64, valores em centavos e textos repetidos como categoria;
+# direito e sigla chegam como código e viram categoria pelas tabelas de domínio (gefid.dimensoes)
+SCHEMA_REPORT: dict[str, str] = dict(
+    mci="id",
+    investidor="texto",
+    cpf_cnpj="texto",
+    tipo_pessoa="categoria",
+    data="data",
+    direito="id",
+    sigla="id",
+    valor="centavos",
+    valor_ir="centavos",
+    valor_liquido="centavos",
+)
 
 
 def load_report(_mci: int) -> pd.DataFrame:
-    return engine.query(
-        sql="""
-            SELECT
-                t1.CD_CLI_TITR AS MCI,
-                STRIP(t2.NOM) AS INVESTIDOR,
-                CASE
-                    WHEN t2.COD_TIPO = 2 THEN LPAD(CAST(t2.COD_CPF_CGC AS BIGINT), 14, '0')
-                    ELSE LPAD(CAST(t2.COD_CPF_CGC AS BIGINT), 11, '0')
-                END AS CPF_CNPJ,
-                CASE WHEN t2.COD_TIPO = 1 THEN 'PF' ELSE 'PJ' END AS TIPO_PESSOA,
-                t1.DT_MVT_DRT AS DATA, 
-                t4.NM_TIP_DRT AS DIREITO,
-                CONCAT(STRIP(t3.SG_TIP_TIT), STRIP(t3.CD_CLS_TIP_TIT)) AS SIGLA,
-                t1.VL_MVT_REN AS VALOR,
-                t1.VL_IR_CLCD_MVT_REN AS VALOR_IR,
-                t1.VL_MVT_REN - t1.VL_IR_CLCD_MVT_REN AS VALOR_LIQUIDO
-            FROM
-                DB2AEB.MVT_REN t1
-                FULL JOIN DB2MCI.CLIENTE t2
-                    ON t2.COD = t1.CD_CLI_TITR
-                INNER JOIN DB2AEB.TIP_TIT t3
-                    ON t3.CD_TIP_TIT = t1.CD_TIP_TIT
-                INNER JOIN DB2AEB.TIP_DRT t4
-                    ON t4.CD_TIP_DRT = t1.CD_TIP_DRT
-            WHERE
-                t1.CD_CLI_DLBC = :mci AND
-                t1.CD_EST_DRT IN (2, 22, 23)
-            ORDER BY
-                STRIP(t2.NOM),
-                t1.DT_MVT_DRT
-        """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(mci=_mci),
-    )
+    load: pd.DataFrame = db.query(sql=SQL_REPORT, params=dict(mci=_mci), schema=SCHEMA_REPORT, classe="mvt_ren")
+    return dimensoes.rotular(load, juncao="inner", direito="direito", sigla="sigla")
 
 
-def load_data(_mci: int) -> tuple[str, ...]:
-    load: pd.DataFrame = engine.query(
-        sql="""
-            SELECT
-                t1.CD_CLI_EMT AS MCI,
-                STRIP(t1.SG_EMP) AS SIGLA,
-                STRIP(t2.NOM) AS EMPRESA,
-                CASE
-                    WHEN t2.COD_TIPO = 2 THEN LPAD(t2.COD_CPF_CGC, 14, '0')
-                    ELSE LPAD(t2.COD_CPF_CGC, 11, '0')
-                END AS CNPJ
-            FROM
-                DB2AEB.PRM_EMP t1
-                INNER JOIN DB2MCI.CLIENTE t2
-                    ON t2.COD = t1.CD_CLI_EMT
-            WHERE
-                t1.CD_CLI_EMT = :mci
-        """,
-        show_spinner=False,
-        ttl=0,
-        params=dict(mci=_mci),
-    )
-
-    return str(load["mci"].iloc[0]), load["empresa"].iloc[0], load["cnpj"].iloc[0], load["sigla"].iloc[0]
+def stream_report(_mci: int) -> Iterator[pd.DataFrame]:
+    partes: Iterator[pd.DataFrame] = db.stream(sql=SQL_REPORT, params=dict(mci=_mci), schema=SCHEMA_REPORT,
+                                               classe="mvt_ren")
+    return (dimensoes.rotular(parte, juncao="inner", direito="direito", sigla="sigla") for parte in partes)
 
 
 st.subheader(":material/savings: Rendimentos Pendentes")
 
 st.radio(label="**Situação de Clientes:**", options=["ativos", "inativos"], key="option_active")
 
-kv: dict[str, int] = load_active("null") if st.session_state["option_active"] == "ativos" else load_active("not null")
+kv: dict[str, int] = catalogo.clientes(st.session_state["option_active"] == "ativos")
 
 with st.columns(2)[0]:
     st.selectbox(
@@ -105,30 +79,43 @@ with st.columns(2)[0]:
 
     st.markdown("")
 
-    col = st.columns(3)
+    col = st.columns(5)
     col[0].button(label="**Visualizar na tela**", key="view", icon=":material/preview:", **params)
     col[1].button(label="**Baixar CSV**", key="csv", icon=":material/download:", **params)
     col[2].button(label="**Baixar Excel**", key="xlsx", icon=":material/download:", **params)
+    col[3].button(label="**Atualizar**", key="refresh", icon=":material/refresh:", **params)
+    col[4].button(label="**Cancelar**", key="cancel", icon=":material/cancel:", use_container_width=True)
+
+if st.session_state["refresh"]:
+    # descarta o relatório guardado na sessão e os dados do emissor para ler de novo do DB2
+    resultados.descartar("rendimentos-pendentes")
+    catalogo.invalidar(mci)
+
+    st.toast(body="###### Dados atualizados, a próxima consulta será lida do DB2", icon=":material/refresh:")
+
+if st.session_state["cancel"]:
+    # o clique interrompe a execução anterior da página; a consulta que ela tinha no DB2 é cancelada pelo db
+    st.toast(body="###### Consulta cancelada", icon=":material/cancel:")
 
 if st.session_state["view"]:
     with st.spinner("**:material/hourglass: Preparando os dados para exibir, aguarde...**", show_time=True):
-        get_view: pd.DataFrame = load_report(mci)
+        get_view: pd.DataFrame = resultados.obter("rendimentos-pendentes", load_report, mci)
 
         if not get_view.empty:
-            mci_inv, nome_inv, cnpj_inv, _ = load_data(mci)
+            emissor: catalogo.Emissor = catalogo.emissor(mci)
 
-            st.write(f"**MCI:** {mci_inv}")
-            st.write(f"**EMPRESA:** {nome_inv}")
-            st.write(f"**CNPJ:** {cnpj_inv}")
-            st.write(f"**TOTAL BRUTO:** R$ {float(get_view['valor'].sum()):_.2f}"
+            st.write(f"**MCI:** {emissor.mci}")
+            st.write(f"**EMPRESA:** {emissor.nome}")
+            st.write(f"**CNPJ:** {emissor.cnpj}")
+            st.write(f"**TOTAL BRUTO:** R$ {get_view['valor'].sum() / 100:_.2f}"
                      .replace(".", ",").replace("_", "."))
-            st.write(f"**TOTAL IR:** R$ {float(get_view['valor_ir'].sum()):_.2f}"
+            st.write(f"**TOTAL IR:** R$ {get_view['valor_ir'].sum() / 100:_.2f}"
                      .replace(".", ",").replace("_", "."))
-            st.write(f"**TOTAL LÍQUIDO:** R$ {float(get_view['valor_liquido'].sum()):_.2f}"
+            st.write(f"**TOTAL LÍQUIDO:** R$ {get_view['valor_liquido'].sum() / 100:_.2f}"
                      .replace(".", ",").replace("_", "."))
 
             st.data_editor(
-                data=get_view,
+                data=tipos.exibir(tipos.reais(get_view)),
                 use_container_width=True,
                 hide_index=True,
                 column_config={
@@ -152,14 +139,16 @@ if st.session_state["view"]:
 
 if st.session_state["csv"]:
     with st.spinner("**:material/hourglass: Preparando os dados para baixar, aguarde...**", show_time=True):
-        get_csv: pd.DataFrame = load_report(mci)
+        get_csv, linhas = exportar.csv(resultados.partes(
+            "rendimentos-pendentes", load_report, stream_report, mci
+        ))
 
-        if not get_csv.empty:
-            sigla: str = load_data(mci)[3]
+        if linhas:
+            sigla: str = catalogo.emissor(mci).sigla
 
             st.download_button(
                 label="**Baixar CSV**",
-                data=get_csv.to_csv(index=False).encode("utf-8"),
+                data=get_csv,
                 file_name=f"{sigla}-Rendimentos Pendentes.csv",
                 mime="text/csv",
                 key="download_csv",
@@ -174,44 +163,18 @@ if st.session_state["csv"]:
 
 if st.session_state["xlsx"]:
     with st.spinner("**:material/hourglass: Preparando os dados para baixar...**", show_time=True):
-        get_report: pd.DataFrame = load_report(mci)
-
-        if not get_report.empty:
-            sigla: str = load_data(mci)[3]
-
-            path_xls: io.BytesIO = io.BytesIO()
-
-            with pd.ExcelWriter(path_xls, engine="xlsxwriter") as writer:
-                if len(get_report) <= int(1e6):
-                    get_report[:int(1e6)].to_excel(writer, sheet_name="1", index=False)
-
-                elif len(get_report) <= int(2e6):
-                    get_report[:int(1e6)].to_excel(writer, sheet_name="1", index=False)
-                    get_report[int(1e6):].to_excel(writer, sheet_name="2", index=False)
-
-                elif len(get_report) <= int(3e6):
-                    get_report[:int(1e6)].to_excel(writer, sheet_name="1", index=False)
-                    get_report[int(1e6):int(2e6)].to_excel(writer, sheet_name="2", index=False)
-                    get_report[int(2e6):].to_excel(writer, sheet_name="3", index=False)
-
-                elif len(get_report) <= int(4e6):
-                    get_report[:int(1e6)].to_excel(writer, sheet_name="1", index=False)
-                    get_report[int(1e6):int(2e6)].to_excel(writer, sheet_name="2", index=False)
-                    get_report[int(2e6):int(3e6)].to_excel(writer, sheet_name="3", index=False)
-                    get_report[int(3e6):].to_excel(writer, sheet_name="4", index=False)
+        get_xlsx, linhas = exportar.xlsx(resultados.partes(
+            "rendimentos-pendentes", load_report, stream_report, mci
+        ))
 
-                else:
-                    get_report[:int(1e6)].to_excel(writer, sheet_name="1", index=False)
-                    get_report[int(1e6):int(2e6)].to_excel(writer, sheet_name="2", index=False)
-                    get_report[int(2e6):int(3e6)].to_excel(writer, sheet_name="3", index=False)
-                    get_report[int(3e6):int(4e6)].to_excel(writer, sheet_name="4", index=False)
-                    get_report[int(4e6):].to_excel(writer, sheet_name="5", index=False)
+        if linhas:
+            sigla: str = catalogo.emissor(mci).sigla
 
             st.toast("###### Arquivo XLSX pronto para baixar.", icon=":material/check_circle:")
 
             st.download_button(
                 label="**Baixar XLSX**",
-                data=path_xls.getvalue(),
+                data=get_xlsx,
                 file_name=f"{sigla}-Rendimentos Pendentes.xlsx",
                 mime="application/vnd.ms-excel",
                 key="download_xlsx",
@@ -0,0 +1,262 @@
+import argparse
+import json
+import os
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from gefid import investidores, rendimentos, standin
+
+RAIZ: Path = Path(__file__).resolve().parent.parent
+
+# emissor fixo da base local, o mesmo das páginas que só tratam do Banco do Brasil
+MCI: int = 903485186
+
+FORMAS_543: list[str] = [
+    "CAIXA", "CONTA-CORRENTE BB", "EMPRESA", "POUPANCA OURO BB", "CRED TESOURO NAC", "STR/SISPAG",
+    "DOC/TED CUSTO INVEST", "DOC/TED CUSTO EMPRES", "DEPOSITO JUDICIAL EF",
+]
+
+
+def _linha(largura: int, campos: dict[tuple[int, int], str]) -> str:
+    # monta uma linha de leiaute fixo, cada campo alinhado à direita na sua faixa de colunas
+    linha: list[str] = [" "] * largura
+
+    for (inicio, fim), valor in campos.items():
+        linha[inicio:fim] = valor[-(fim - inicio):].rjust(fim - inicio)
+
+    return "".join(linha)
+
+
+def _moeda(centavos: int) -> str:
+    return f"{centavos // 100},{centavos % 100:02d}"
+
+
+def arquivos_543(pasta: Path, linhas: int) -> None:
+    # dois direitos em dois arquivos, como vem do AEB quando a empresa paga dividendos e JCP juntos
+    for arquivo, direito in enumerate(["DIVI", "JCP"], start=1):
+        with open(pasta / f"BBM.AEBF543A.D{arquivo:07d}", "w", encoding="iso-8859-1") as f:
+            for indice in range(linhas // 2):
+                qtd: int = 1 + indice * 7919 % 50_000
+                bruto: int = qtd * 123
+                ir: int = bruto * 15 // 100 if direito == "JCP" else 0
+                forma: str = FORMAS_543[indice % len(FORMAS_543)]
+
+                f.write(_linha(430, {
+                    (29, 33): "BBSA", (34, 38): "2", (43, 53): "31.12.2025", (54, 58): direito, (117, 121): "ON",
+                    (123, 144): "1,23000000000", (145, 154): str(100_000_000 + indice),
+                    (155, 173): f"{indice * 7919 % 999_999_999:011d}", (174, 214): f"INVESTIDOR {indice}",
+                    (220, 240): forma, (241, 245): "105" if indice % 20 else "249", (246, 250): "105",
+                    (251, 253): "F" if indice % 3 else "J", (254, 260): "15,00" if ir else "0,00",
+                    (268, 274): "15,00" if ir else "0,00", (282, 301): str(qtd),
+                    (302, 322): _moeda(bruto), (323, 341): _moeda(ir), (378, 400): _moeda(bruto),
+                    (401, 423): _moeda(ir),
+                }) + "\n")
+
+
+def arquivos_dipj(pasta: Path, linhas: int, ano: int) -> None:
+    # doze arquivos 064B, um por mês, com a linha de totais (mês 99) que a página descarta
+    for mes in range(1, 13):
+        with open(pasta / f"RENDIMENTOS.{ano}{mes:02d}.PAGO", "w", encoding="latin") as f:
+            for indice in range(linhas // 12):
+                bruto: int = 1 + indice * 7919 % 10_000_000
+                ir: int = bruto * 15 // 100
+
+                f.write(_linha(133, {
+                    (0, 4): str(ano), (4, 6): f"{mes:02d}", (6, 15): str(MCI),
+                    (15, 18): "105" if indice % 20 else "249", (18, 19): "F" if indice % 3 else "J",
+                    (19, 59): f"DIREITO {indice % 40:02d}".ljust(40), (59, 76): f"{bruto:017d}",
+                    (76, 93): f"{ir:017d}", (93, 110): f"{bruto - ir:017d}",
+                }) + "\n")
+
+            f.write(_linha(133, {(0, 4): str(ano), (4, 6): "99", (6, 15): str(MCI), (59, 76): "0" * 17}) + "\n")
+
+
+def _escala(base: Path) -> dict[str, str]:
+    if not (base / "gefid.db").exists():
+        return {}
+
+    with sqlite3.connect(base / "gefid.db") as conexao:
+        return dict(conexao.execute("SELECT CHAVE, VALOR FROM STANDIN").fetchall())
+
+
+def preparar(pasta: Path, quantidade: int, ate: date) -> Path:
+    # base local e arquivos de entrada de uma escala, reaproveitados enquanto a escala não mudar
+    base: Path = pasta / f"escala-{quantidade}"
+    movimentos: int = quantidade * 10
+    escala: dict[str, str] = _escala(base)
+
+    if escala.get("movimentos") != str(movimentos) or escala.get("ate") != ate.isoformat():
+        standin.gerar(
+            destino=base,
+            investidores=quantidade,
+            movimentos=movimentos,
+            posicoes=movimentos // 10,
+            rendimentos=movimentos // 5,
+            emissores=20,
+            acionistas=quantidade // 20,
+            dias=730,
+            ate=ate,
+            anos=(2025, ate.year, date.today().year),
+        )
+
+    for entrada, gerador in [("543", arquivos_543), ("dipj", arquivos_dipj)]:
+        if not (base / entrada).exists():
+            (base / entrada).mkdir()
+            gerador(base / entrada, quantidade, *([ate.year] if entrada == "dipj" else []))
+
+    return base
+
+
+def _casos(base: Path, ate: date) -> dict[str, Callable[[], int]]:
+    # o caminho de dados de cada página, sem a tela; devolve quantas linhas a página processou
+    def base_investidores() -> int:
+        return len(investidores.load_base(MCI, ate)[0])
+
+    def maiores_investidores() -> int:
+        load = investidores.load_maiores(MCI, ate)
+        investidores.ranking_maiores(load, 100)
+        return len(load)
+
+    def maiores_top_n_db2() -> int:
+        # o ranking do emissor sem vigências gravadas: o DB2 agrega e devolve só os 100 maiores
+        return len(investidores.load_ranking(MCI, ate, 100))
+
+    def cvm_160() -> int:
+        load = investidores.load_cvm160(MCI, ate)
+        investidores.txt_cvm160(load)
+        return len(load)
+
+    def circular_3624() -> int:
+        load = rendimentos.load_circular_3624(ate.year, ate.month)
+        rendimentos.resumo_circular_3624(load, ate.year)
+        return len(load)
+
+    def calculo_rendimentos() -> int:
+        df = rendimentos.calcular_543(rendimentos.ler_543(sorted(map(str, (base / "543").iterdir()))))
+
+        for direito in df["direito"].unique():
+            rendimentos.totais_543(df[df["direito"] == direito])
+            rendimentos.ir_pais_543(df[df["direito"] == direito])
+
+        return len(df)
+
+    def dipj() -> int:
+        dfs, _ = rendimentos.ler_dipj(sorted(map(str, (base / "dipj").iterdir())), MCI)
+        rendimentos.pivot_dipj(dfs)
+        return len(dfs)
+
+    return {
+        "base-investidores": base_investidores,
+        "maiores-investidores": maiores_investidores,
+        "maiores-top-n-db2": maiores_top_n_db2,
+        "cvm-160": cvm_160,
+        "circular-3624": circular_3624,
+        "calculo-rendimentos": calculo_rendimentos,
+        "dipj": dipj,
+    }
+
+
+def medir(caso: str, base: Path, ate: date, repeticoes: int) -> dict:
+    # roda dentro do processo filho: o pico de memória do processo é o do caso medido
+    executar: Callable[[], int] = _casos(base, ate)[caso]
+    rss_inicial: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tempos: list[float] = []
+
+    for _ in range(repeticoes):
+        relogio: float = time.perf_counter()
+        linhas: int = executar()
+        tempos.append(time.perf_counter() - relogio)
+
+    mediana: float = statistics.median(tempos)
+
+    return dict(
+        caso=caso,
+        linhas=linhas,
+        tempos_s=[round(tempo, 4) for tempo in tempos],
+        mediana_s=round(mediana, 4),
+        linhas_por_s=round(linhas / mediana, 1) if mediana else None,
+        rss_inicial_mb=round(rss_inicial / 1024, 1),
+        rss_pico_mb=round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    )
+
+
+def _filho(caso: str, base: Path, ate: date, repeticoes: int) -> dict:
+    # cada caso num processo novo, com o secrets.toml apontando o DB2 para a base local da escala
+    with tempfile.TemporaryDirectory() as pasta:
+        (Path(pasta) / ".streamlit").mkdir()
+        (Path(pasta) / ".streamlit" / "secrets.toml").write_text(
+            f'[connections.DB2]\nurl = "sqlite+gefid:///{(base / "gefid.db").resolve()}"\n'
+        )
+
+        processo: subprocess.CompletedProcess = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--caso", caso, "--base", str(base.resolve()),
+             "--ate", ate.isoformat(), "--repeticoes", str(repeticoes)],
+            cwd=pasta,
+            env={**os.environ, "PYTHONPATH": str(RAIZ)},
+            capture_output=True,
+            text=True,
+        )
+
+    if processo.returncode:
+        return dict(caso=caso, erro=processo.stderr.strip().splitlines()[-1])
+
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def _versao() -> str:
+    processo: subprocess.CompletedProcess = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                                           capture_output=True, text=True)
+    return processo.stdout.strip() or "desconhecida"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Caminho de dados das páginas contra a base local, por escala")
+    parser.add_argument("--escalas", type=lambda valor: [int(escala) for escala in valor.split(",")],
+                        default=[10_000, 100_000], help="investidores por escala; movimentos = 10x")
+    parser.add_argument("--casos", type=lambda valor: valor.split(","), help="padrão: todas as páginas")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--pasta", type=Path, default=RAIZ / "standin" / "benchmarks")
+    parser.add_argument("--ate", type=date.fromisoformat, default=date.today().replace(day=1) - timedelta(days=1))
+    parser.add_argument("--saida", type=Path, help="padrão: benchmarks/resultados/paginas-<data>-<commit>.json")
+    parser.add_argument("--caso", help=argparse.SUPPRESS)
+    parser.add_argument("--base", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.caso:
+        print(json.dumps(medir(args.caso, args.base, args.ate, args.repeticoes)))
+        return
+
+    versao: str = _versao()
+    resultados: list[dict] = []
+
+    for quantidade in args.escalas:
+        base: Path = preparar(args.pasta, quantidade, args.ate)
+
+        for caso in args.casos or ["base-investidores", "maiores-investidores", "maiores-top-n-db2", "cvm-160",
+                                   "circular-3624", "calculo-rendimentos", "dipj"]:
+            resultado: dict = dict(escala=quantidade, **_filho(caso, base, args.ate, args.repeticoes))
+            resultados.append(resultado)
+
+            print(f"{quantidade:>10_} {caso:<22} {resultado.get('linhas', 0):>10_} linhas "
+                  f"{resultado.get('mediana_s', 0):9.3f} s {resultado.get('linhas_por_s') or 0:>12_.0f} linhas/s "
+                  f"{resultado.get('rss_pico_mb', 0):8.1f} MB {resultado.get('erro', '')}")
+
+    nome: str = f"paginas-{datetime.now():%Y%m%d-%H%M}-{versao}.json"
+    saida: Path = args.saida or RAIZ / "benchmarks" / "resultados" / nome
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(dict(versao=versao, ate=args.ate.isoformat(), repeticoes=args.repeticoes,
+                                     resultados=resultados), indent=2, ensure_ascii=False))
+
+    print(f"resultados em {saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from gefid.db import Periodo
+
+# mesma forma do filtro das páginas de rendimentos, antes e depois do Periodo
+ANTES: str = """
+    SELECT COUNT(*), SUM(VL_MVT_REN)
+    FROM MVT_REN t1
+    WHERE t1.CD_CLI_DLBC = :mci AND YEAR(t1.DT_MVT_DRT) = :ano AND MONTH(t1.DT_MVT_DRT) = :mes
+"""
+
+DEPOIS: str = f"""
+    SELECT COUNT(*), SUM(VL_MVT_REN)
+    FROM MVT_REN t1
+    WHERE t1.CD_CLI_DLBC = :mci AND {Periodo.sql("t1.DT_MVT_DRT")}
+"""
+
+
+def criar(conexao: sqlite3.Connection, linhas: int, emissores: int) -> None:
+    conexao.execute("CREATE TABLE MVT_REN (CD_CLI_DLBC INTEGER, DT_MVT_DRT TEXT, VL_MVT_REN REAL)")
+
+    inicio: date = date(2020, 1, 1)
+    gerador: random.Random = random.Random(42)
+
+    conexao.executemany(
+        "INSERT INTO MVT_REN VALUES (?, ?, ?)",
+        (
+            (gerador.randrange(emissores), (inicio + timedelta(days=gerador.randrange(5 * 365))).isoformat(),
+             round(gerador.uniform(1, 10_000), 2))
+            for _ in range(linhas)
+        ),
+    )
+    conexao.execute("CREATE INDEX IX_MVT_REN_DLBC_DT ON MVT_REN (CD_CLI_DLBC, DT_MVT_DRT)")
+    conexao.commit()
+
+
+def medir(conexao: sqlite3.Connection, sql: str, params: dict, repeticoes: int) -> tuple[float, tuple, str]:
+    plano: str = " | ".join(linha[-1] for linha in conexao.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+    relogio: float = time.perf_counter()
+
+    for _ in range(repeticoes):
+        resultado: tuple = conexao.execute(sql, params).fetchone()
+
+    return (time.perf_counter() - relogio) / repeticoes, resultado, plano
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="YEAR()/MONTH() x intervalo semiaberto sobre DT_MVT_DRT")
+    parser.add_argument("--linhas", type=int, default=2_000_000)
+    parser.add_argument("--emissores", type=int, default=20)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    conexao: sqlite3.Connection = sqlite3.connect(":memory:")
+    conexao.create_function("YEAR", 1, lambda valor: int(valor[:4]), deterministic=True)
+    conexao.create_function("MONTH", 1, lambda valor: int(valor[5:7]), deterministic=True)
+
+    criar(conexao, args.linhas, args.emissores)
+
+    periodo: Periodo = Periodo.mes(2023, 12)
+    params_antes: dict = dict(mci=7, ano=2023, mes=12)
+    params_depois: dict = dict(mci=7, **{nome: str(valor) for nome, valor in periodo.params().items()})
+
+    tempo_antes, resultado_antes, plano_antes = medir(conexao, ANTES, params_antes, args.repeticoes)
+    tempo_depois, resultado_depois, plano_depois = medir(conexao, DEPOIS, params_depois, args.repeticoes)
+
+    assert resultado_antes == resultado_depois, (resultado_antes, resultado_depois)
+
+    print(f"linhas: {args.linhas:_}  emissores: {args.emissores}  resultado: {resultado_depois}")
+    print(f"antes : {tempo_antes * 1000:9.2f} ms  {plano_antes}")
+    print(f"depois: {tempo_depois * 1000:9.2f} ms  {plano_depois}")
+    print(f"ganho : {tempo_antes / tempo_depois:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import time
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+
+from gefid import investidores, tipos
+
+
+def antes(load: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]:
+    # o laço que a base de investidores fazia: um filtro e dois merges por título
+    dfixo = load[["MCI", "INVESTIDOR", "CPF_CNPJ"]].copy()
+    dfixo.drop_duplicates(subset=["MCI"], inplace=True)
+
+    lista_tit = []
+
+    titulos: pd.Series = load["COD_TITULO"] + load["SIGLA"].astype(str)
+
+    for xx in titulos.unique():
+        dfx = load.loc[titulos == xx].copy()
+        dfx.reset_index(drop=True, inplace=True)
+
+        tipo = f"{dfx['SIGLA'].iloc[0]} {dfx['COD_TITULO'].iloc[0]}"
+
+        dfbb = dfx[dfx["CUSTODIANTE"].eq("ESCRITURAL")].copy()[["MCI", "QUANTIDADE"]]
+        dfbb.rename(columns={"QUANTIDADE": "BB_" + tipo}, inplace=True)
+
+        dfb3 = dfx[dfx["CUSTODIANTE"].eq("CUSTÓDIA")].copy()[["MCI", "QUANTIDADE"]]
+        dfb3.rename(columns={"QUANTIDADE": "B3_" + tipo}, inplace=True)
+
+        dfx = pd.merge(dfbb, dfb3, how="outer", on=["MCI"])
+
+        dfixo = pd.merge(dfixo, dfx, how="left", on=["MCI"])
+
+        lista_tit.append(tipo)
+
+    dfixo.fillna(0, inplace=True)
+
+    cols = ["MCI", "INVESTIDOR", "CPF_CNPJ"]
+
+    for tit in lista_tit:
+        dfixo[f"TOTAL_{tit}"] = dfixo[f"BB_{tit}"] + dfixo[f"B3_{tit}"]
+        cols.extend([f"BB_{tit}", f"B3_{tit}", f"TOTAL_{tit}"])
+
+    dfixo = dfixo[cols]
+
+    return dfixo, lista_tit
+
+
+def criar(linhas: int, pessoas: int, titulos: int) -> pd.DataFrame:
+    # posições já resolvidas, no formato que a base de investidores pivota: uma linha por (investidor, título, lado)
+    gerador: np.random.Generator = np.random.default_rng(42)
+    celulas: pd.Series = pd.Series(gerador.choice(pessoas * titulos * 2, size=linhas, replace=False))
+    conta, titulo, lado = celulas // (titulos * 2), celulas // 2 % titulos, celulas % 2
+
+    siglas: list[str] = ["ON", "PN", "UNT"] + [f"PN{chr(ord('A') + posicao)}" for posicao in range(titulos - 3)]
+    mci: pd.Series = 100_000_000 + conta
+
+    return pd.DataFrame(dict(
+        MCI=tipos.serie(mci, "id"),
+        INVESTIDOR=tipos.serie("INVESTIDOR " + mci.astype(str), "texto"),
+        CPF_CNPJ=tipos.serie((10_000_000_000 + conta).astype(str), "texto"),
+        COD_TITULO=(titulo + 1).astype(str),
+        SIGLA=tipos.serie(pd.Series(np.array(siglas)[titulo]), "categoria"),
+        QUANTIDADE=tipos.serie(pd.Series(gerador.integers(1, 1_000_000, linhas)), "quantidade"),
+        CUSTODIANTE=tipos.serie(pd.Series(np.where(lado == 0, "ESCRITURAL", "CUSTÓDIA")), "categoria"),
+    ))
+
+
+def medir(pivotar: Callable, load: pd.DataFrame, repeticoes: int) -> tuple[float, pd.DataFrame, list[str]]:
+    relogio: float = time.perf_counter()
+
+    for _ in range(repeticoes):
+        dfixo, lista_tit = pivotar(load)
+
+    return (time.perf_counter() - relogio) / repeticoes, dfixo, lista_tit
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="merges por título x pivô numa passada da base de investidores")
+    parser.add_argument("--linhas", type=int, default=500_000)
+    parser.add_argument("--investidores", type=int, default=200_000)
+    parser.add_argument("--titulos", type=int, default=30)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    load: pd.DataFrame = criar(args.linhas, args.investidores, args.titulos)
+
+    tempo_antes, dfixo_antes, titulos_antes = medir(antes, load, args.repeticoes)
+    tempo_depois, dfixo_depois, titulos_depois = medir(investidores.pivotar_base, load, args.repeticoes)
+
+    assert titulos_antes == titulos_depois, (titulos_antes, titulos_depois)
+    pd.testing.assert_frame_equal(dfixo_antes, dfixo_depois)
+
+    print(f"linhas: {args.linhas:_}  investidores: {len(dfixo_depois):_}  títulos: {len(titulos_depois)}  "
+          f"colunas: {dfixo_depois.shape[1]}")
+    print(f"antes : {tempo_antes * 1000:9.2f} ms")
+    print(f"depois: {tempo_depois * 1000:9.2f} ms")
+    print(f"ganho : {tempo_antes / tempo_depois:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
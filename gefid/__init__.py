@@ -0,0 +1,4 @@
+from sqlalchemy.dialects import registry
+
+# substituto local do DB2 (gefid/standin.py), usado com url = "sqlite+gefid:///standin/gefid.db"
+registry.register("sqlite.gefid", "gefid.standin", "DialetoStandin")
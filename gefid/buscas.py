@@ -0,0 +1,231 @@
+from functools import cache
+
+# colunas de cada tabela aceitas como chave de pesquisa, pela chave (minúscula) que as páginas passam
+CLIENTE: dict[str, str] = dict(cod="COD", cod_cpf_cgc="COD_CPF_CGC", nom="NOM")
+ACIONISTAS_ANTIGOS: dict[str, str] = dict(inscricao="INSCRICAO", nome_on="NOME_ON", bdc="BDC", cpf_cnpj="CPF_CNPJ")
+CADASTRO_IR: dict[str, str] = dict(
+    investidor="INVESTIDOR", mci_investidor="MCI_INVESTIDOR", cpf_cnpj="CPF_CNPJ", email="EMAIL"
+)
+ENVIO_EMAILS: dict[str, str] = dict(cd_cli_acnt="CD_CLI_ACNT", tx_end_emai="TX_END_EMAI")
+
+
+class Busca:
+    def __init__(self, nome: str, sql: str, chaves: dict[str, str | tuple[str, str]]) -> None:
+        # um comando pronto por chave aceita: {coluna} vira a coluna da chave e {juncao} a tabela que ela exige;
+        # o texto de cada variante é sempre o mesmo, então o driver e o cache de pacotes do DB2 o reaproveitam
+        self.nome: str = nome
+        self.comandos: dict[str, str] = {}
+
+        for chave, coluna in chaves.items():
+            coluna, juncao = coluna if isinstance(coluna, tuple) else (coluna, "")
+            self.comandos[chave] = sql.format(coluna=coluna, juncao=juncao)
+
+    def sql(self, chave: str) -> str:
+        comando: str | None = self.comandos.get(chave.lower())
+
+        if comando is None:
+            raise ValueError(
+                f"Chave de pesquisa {chave!r} não permitida em {self.nome}, use: {', '.join(self.comandos)}"
+            )
+
+        return comando
+
+
+def _colunas(tabela: dict[str, str], alias: str = "") -> dict[str, str | tuple[str, str]]:
+    return {chave: f"{alias}{coluna}" for chave, coluna in tabela.items()}
+
+
+CADASTRO_EMPRESA: Busca = Busca(
+    nome="cadastro da empresa",
+    sql="""
+        SELECT t1.COD AS MCI_EMPRESA, STRIP(t1.NOM) AS EMPRESA, LPAD(t1.COD_CPF_CGC, 14, '0') AS CNPJ
+        FROM DB2MCI.CLIENTE t1
+        WHERE t1.{coluna} = :value
+    """,
+    chaves=_colunas(CLIENTE),
+)
+
+CADASTRO_INVESTIDOR: Busca = Busca(
+    nome="cadastro do investidor",
+    sql="""
+        SELECT t1.COD AS MCI,
+               STRIP(t1.NOM) AS INVESTIDOR,
+               CASE
+                   WHEN t1.COD_TIPO = 2 THEN LPAD(t1.COD_CPF_CGC, 14, '0')
+                   ELSE LPAD(t1.COD_CPF_CGC, 11, '0')
+               END AS CPF_CNPJ
+        FROM DB2MCI.CLIENTE t1
+        WHERE t1.{coluna} = :value
+    """,
+    chaves=_colunas(CLIENTE),
+)
+
+EMPRESA: Busca = Busca(
+    nome="empresa",
+    sql="""
+        SELECT
+            COD AS MCI_EMPRESA,
+            STRIP(NOM) AS NOME_EMPRESA,
+            CASE
+                WHEN COD_TIPO = 2 THEN LPAD(COD_CPF_CGC, 14, '0')
+                ELSE LPAD(COD_CPF_CGC, 11, '0')
+            END AS CNPJ_EMPRESA
+        FROM
+            DB2MCI.CLIENTE
+        WHERE
+            {coluna} = :value
+    """,
+    chaves=_colunas(CLIENTE),
+)
+
+# pesquisas pelo MCI vão direto na movimentação; pelo nome ou CPF/CNPJ passam pelo cadastro (t2);
+# sigla, tipo de direito e estado saem como código, rotulados depois por gefid.dimensoes
+EXTRATO_MOVIMENTACAO: Busca = Busca(
+    nome="extrato de movimentação",
+    sql="""
+        SELECT
+            t1.CD_TIP_TIT AS SIGLA,
+            t1.CD_TIP_TIT AS TIPO,
+            t1.DT_MVTC AS DATA_MVTC,
+            SUM(CAST(t1.QT_TIT_MVTD AS BIGINT)) AS MOVIMENTO,
+            SUM(CAST(t1.QT_TIT_ATU AS BIGINT)) AS SALDO,
+            CAST(SUM(t1.QT_TIT_ATU - t1.QT_TIT_MVTD) AS BIGINT) AS SALDO_ANTERIOR,
+            t1.CD_CLI_CSTD AS MCI_CUSTODIANTE
+        FROM
+            DB2AEB.MVTC_DIAR_PSC t1{juncao}
+        WHERE
+            t1.CD_CLI_EMT = :mci AND
+            {coluna} = :value
+        GROUP BY
+            t1.CD_TIP_TIT,
+            t1.DT_MVTC,
+            t1.CD_CLI_CSTD
+        ORDER BY
+            t1.DT_MVTC
+    """,
+    chaves=dict(
+        nom=("t2.NOM", " LEFT JOIN DB2MCI.CLIENTE t2 ON t2.COD = t1.CD_CLI_EMT"),
+        cod="t1.CD_CLI_ACNT",
+        cod_cpf_cgc=("t2.COD_CPF_CGC", " INNER JOIN DB2MCI.CLIENTE t2 ON t2.COD = t1.CD_CLI_EMT"),
+    ),
+)
+
+EXTRATO_RENDIMENTOS: Busca = Busca(
+    nome="extrato de rendimentos",
+    sql="""
+        SELECT
+            t1.CD_TIP_TIT AS TIPO,
+            t1.DT_MVT_DRT AS DATA_MVT,
+            CAST(t1.QT_MVT_REN AS INT) AS QUANTIDADE,
+            CAST(t1.VL_MVT_REN AS FLOAT) AS VALOR,
+            CAST(t1.VL_IR_CLCD_MVT_REN AS FLOAT) AS VALOR_IR,
+            CAST(t1.VL_MVT_REN - t1.VL_IR_CLCD_MVT_REN AS FLOAT) AS VALOR_LIQUIDO,
+            t1.CD_TIP_DRT AS TIPO_DIREITO,
+            t1.CD_EST_DRT AS ESTADO,
+            CASE
+                WHEN t1.CD_FMA_PGTO_REN = 1 THEN 'CAIXA'
+                WHEN t1.CD_FMA_PGTO_REN = 2 THEN 'CONTA'
+                ELSE '-'
+            END AS FORMA_PAGAMENTO
+        FROM
+            DB2AEB.MVT_REN t1
+                INNER JOIN DB2MCI.CLIENTE t2
+                    ON t2.COD = t1.CD_CLI_TITR
+        WHERE
+            t1.CD_CLI_EMT = :mci AND
+            {coluna} = :value
+        ORDER BY
+            t1.DT_MVT_DRT,
+            t1.CD_EST_DRT,
+            t1.CD_TIP_DRT
+    """,
+    chaves=dict(nom="t2.NOM", cod="t1.CD_CLI_TITR", cod_cpf_cgc="t2.COD_CPF_CGC"),
+)
+
+EXTRATO_CEPAC: Busca = Busca(
+    nome="extrato de CEPAC",
+    sql="""
+        SELECT CAST(t1.DT_MVTC AS DATE)    AS DATA_MVTC,
+               CAST(t1.QT_TIT_MVTD AS INT) AS MVT,
+               CAST(t1.QT_TIT_ATU AS INT)  AS SALDO
+        FROM DB2AEB.MVTC_DIAR_PSC t1{juncao}
+        WHERE t1.CD_CLI_EMT = 906535030
+          AND {coluna} = :value
+          AND t1.CD_CLI_CSTD = 903485186
+          AND t1.CD_TIP_TIT = :active
+        ORDER BY CAST(t1.DT_MVTC AS DATE)
+    """,
+    chaves=dict(
+        cod="t1.CD_CLI_ACNT",
+        cod_cpf_cgc=("t2.COD_CPF_CGC", " INNER JOIN DB2MCI.CLIENTE t2 ON t2.COD = t1.CD_CLI_ACNT"),
+    ),
+)
+
+ACIONISTAS: Busca = Busca(
+    nome="acionistas dos sistemas antigos",
+    sql="SELECT * FROM DB2I13E5.SISTEMA_ANTIGO_ACIONISTAS WHERE {coluna} = :value",
+    chaves=_colunas(ACIONISTAS_ANTIGOS),
+)
+
+CADASTRO_IR_BB: Busca = Busca(
+    nome="cadastro do informe (BB)",
+    sql="SELECT * FROM DB2I13E5.IR2025_CADASTRO_BB WHERE {coluna} = :value",
+    chaves=_colunas(CADASTRO_IR),
+)
+
+CADASTRO_IR_B3: Busca = Busca(
+    nome="cadastro do informe (B3)",
+    sql="SELECT * FROM DB2I13E5.IR2025_CADASTRO_B3 WHERE {coluna} = :value",
+    chaves=_colunas(CADASTRO_IR),
+)
+
+
+@cache
+def envio_emails(ano: int) -> Busca:
+    # as tabelas de envio mudam de nome a cada ano: os comandos são montados uma vez por ano
+    return Busca(
+        nome="envio do informe",
+        sql=f"""
+            SELECT DISTINCT
+                CD_CLI_ACNT AS MCI_INVESTIDOR,
+                CASE
+                    WHEN CD_EST_PRCT = 13 THEN 'EMAIL ENVIADO'
+                    ELSE 'NÃO ENVIADO'
+                END AS STATUS,
+                TS_INC_PRCT_EMAI AS LOG,
+                TX_END_EMAI AS EMAIL
+            FROM
+                DB2I13E5.IR{ano}_ENVIO_EMAILS
+            WHERE
+                {{coluna}} = :value
+        """,
+        chaves=_colunas(ENVIO_EMAILS),
+    )
+
+
+@cache
+def envio_emails_cadastro(ano: int) -> Busca:
+    # envio pesquisado pelas colunas do cadastro, no BB (t2) ou na B3 (t3)
+    return Busca(
+        nome="envio do informe pelo cadastro",
+        sql=f"""
+            SELECT DISTINCT
+                t1.CD_CLI_ACNT AS MCI_INVESTIDOR,
+                CASE
+                    WHEN t1.CD_EST_PRCT = 13 THEN 'EMAIL ENVIADO'
+                    ELSE 'NÃO ENVIADO'
+                END AS STATUS,
+                t1.TS_INC_PRCT_EMAI AS LOG,
+                t1.TX_END_EMAI AS EMAIL
+            FROM
+                DB2I13E5.IR{ano}_ENVIO_EMAILS t1
+                LEFT JOIN DB2I13E5.IR{ano}_CADASTRO_BB t2
+                    ON t2.MCI_INVESTIDOR = t1.CD_CLI_ACNT
+                LEFT JOIN DB2I13E5.IR{ano}_CADASTRO_B3 t3
+                    ON t3.MCI_INVESTIDOR = t1.CD_CLI_ACNT
+            WHERE
+                t2.{{coluna}} = :value OR
+                t3.{{coluna}} = :value
+        """,
+        chaves=_colunas(CADASTRO_IR),
+    )
@@ -0,0 +1,357 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+from typing import Any, Protocol
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from gefid import db, metricas
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# pasta do cache em disco, a mesma para todos os processos do servidor na máquina; cada base (DB2, base local
+# do benchmark) tem a sua subpasta, para entradas de bases diferentes não se misturarem
+PASTA: Path = Path(tempfile.gettempdir()) / "gefid-cache"
+
+# espaço máximo de cada nível; passando dele, saem as entradas usadas há mais tempo
+LIMITE_MEMORIA: int = 512 * 1024 ** 2
+LIMITE_DISCO: int = 4 * 1024 ** 3
+
+
+@dataclass(frozen=True)
+class Entrada:
+    valor: Any
+    expira: float
+    bytes: int
+
+
+class Nivel(Protocol):
+    nome: str
+
+    def ler(self, chave: str) -> Entrada | None: ...
+
+    def gravar(self, chave: str, entrada: Entrada) -> None: ...
+
+    def remover(self, prefixo: str) -> None: ...
+
+    def ocupado(self) -> int: ...
+
+
+def _tamanho(valor: Any) -> int:
+    # dataframes (e séries) pelo uso real; tuplas, listas e dicionários somam o que guardam, senão uma tupla de
+    # dataframes (load_base) contaria só os ponteiros
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(index=True, deep=True))
+
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(_tamanho(chave) + _tamanho(item) for chave, item in valor.items())
+
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return sys.getsizeof(valor) + sum(_tamanho(item) for item in valor)
+
+    return sys.getsizeof(valor)
+
+
+def _copia(valor: Any) -> Any:
+    # cada chamada recebe a sua cópia, as páginas alteram os dataframes que recebem
+    return valor.copy() if isinstance(valor, pd.DataFrame) else valor
+
+
+class Memoria:
+    nome: str = "memoria"
+
+    def __init__(self, limite: int = LIMITE_MEMORIA) -> None:
+        self.limite: int = limite
+        self._ocupado: int = 0
+        self._entradas: OrderedDict[str, Entrada] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def ler(self, chave: str) -> Entrada | None:
+        with self._lock:
+            entrada: Entrada | None = self._entradas.get(chave)
+
+            if entrada is None:
+                return None
+
+            if entrada.expira <= time.time():
+                self._tirar(chave)
+                return None
+
+            self._entradas.move_to_end(chave)
+
+            return entrada
+
+    def gravar(self, chave: str, entrada: Entrada) -> None:
+        with self._lock:
+            self._tirar(chave)
+            self._entradas[chave] = entrada
+            self._ocupado += entrada.bytes
+
+            while self._ocupado > self.limite and len(self._entradas) > 1:
+                self._tirar(next(iter(self._entradas)))
+
+    def remover(self, prefixo: str) -> None:
+        with self._lock:
+            for chave in [chave for chave in self._entradas if chave.startswith(prefixo)]:
+                self._tirar(chave)
+
+    def ocupado(self) -> int:
+        return self._ocupado
+
+    def _tirar(self, chave: str) -> None:
+        entrada: Entrada | None = self._entradas.pop(chave, None)
+
+        if entrada is not None:
+            self._ocupado -= entrada.bytes
+
+
+def _para_arrow(load: pd.DataFrame) -> pa.Table:
+    # colunas em Arrow (gefid.tipos) vão como estão; as demais pelos metadados do pandas, que não sabem
+    # reconstruir ArrowDtype de dictionary; a ordem das colunas e os attrs (schema) seguem nos metadados
+    arrow: list[str] = [coluna for coluna in load.columns if isinstance(load[coluna].dtype, pd.ArrowDtype)]
+    tabela: pa.Table = pa.Table.from_pandas(load.drop(columns=arrow), preserve_index=True)
+    colunas: pa.Table = pa.Table.from_pandas(load[arrow], preserve_index=False)
+
+    for coluna in arrow:
+        tabela = tabela.append_column(coluna, colunas.column(coluna))
+
+    gefid: dict[str, Any] = dict(colunas=list(load.columns), arrow=arrow, attrs=load.attrs)
+
+    return tabela.replace_schema_metadata({**tabela.schema.metadata, b"gefid": json.dumps(gefid).encode()})
+
+
+def _de_arrow(tabela: pa.Table) -> pd.DataFrame:
+    gefid: dict[str, Any] = json.loads(tabela.schema.metadata[b"gefid"])
+    load: pd.DataFrame = tabela.drop_columns(gefid["arrow"]).to_pandas()
+
+    for coluna in gefid["arrow"]:
+        valores: pa.ChunkedArray = tabela.column(coluna)
+        load[coluna] = pd.Series(valores, index=load.index, dtype=pd.ArrowDtype(valores.type))
+
+    load = load[gefid["colunas"]]
+    load.attrs = gefid["attrs"]
+
+    return load
+
+
+class Disco:
+    # um arquivo Arrow por entrada e um índice (chave -> arquivo, tamanho, validade) para os processos da máquina;
+    # o índice só muda com a trava exclusiva (fcntl) do arquivo .trava; leitura usa a trava compartilhada
+    nome: str = "disco"
+
+    def __init__(self, pasta: Path = PASTA, limite: int = LIMITE_DISCO) -> None:
+        self.pasta: Path = pasta
+        self.limite: int = limite
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        self._indice: Path = self.pasta / "indice.json"
+        self._trava: Path = self.pasta / ".trava"
+
+    @contextmanager
+    def _travado(self, modo: int) -> Iterator[None]:
+        with open(self._trava, "a") as trava:
+            fcntl.flock(trava, modo)
+
+            try:
+                yield
+
+            finally:
+                fcntl.flock(trava, fcntl.LOCK_UN)
+
+    def _ler_indice(self) -> dict[str, dict[str, Any]]:
+        try:
+            return json.loads(self._indice.read_text())
+
+        except FileNotFoundError:
+            return {}
+
+        except ValueError:
+            logger.warning("Índice do cache em disco ilegível, recomeçando vazio")
+            return {}
+
+    def _gravar_indice(self, indice: dict[str, dict[str, Any]]) -> None:
+        # grava ao lado e troca de uma vez: quem lê nunca vê o índice pela metade
+        temporario: Path = self._indice.with_suffix(f".{os.getpid()}")
+        temporario.write_text(json.dumps(indice))
+        os.replace(temporario, self._indice)
+
+    def ler(self, chave: str) -> Entrada | None:
+        with self._travado(fcntl.LOCK_SH):
+            item: dict[str, Any] | None = self._ler_indice().get(chave)
+
+            if item is None or item["expira"] <= time.time():
+                return None
+
+            arquivo: Path = self.pasta / item["arquivo"]
+
+            try:
+                with pa.memory_map(str(arquivo)) as origem:
+                    load: pd.DataFrame = _de_arrow(pa.ipc.open_file(origem).read_all())
+
+                # a data de modificação marca o último uso, para a remoção por espaço
+                os.utime(arquivo)
+
+            except (OSError, pa.ArrowInvalid):
+                logger.warning("Entrada %s do cache em disco ilegível, ignorada", chave)
+                return None
+
+        return Entrada(load, item["expira"], _tamanho(load))
+
+    def gravar(self, chave: str, entrada: Entrada) -> None:
+        if not isinstance(entrada.valor, pd.DataFrame):
+            return
+
+        # colunas object com tipos misturados ou attrs fora do JSON falham aqui, antes de qualquer arquivo
+        tabela: pa.Table = _para_arrow(entrada.valor)
+        arquivo: str = f"{hashlib.sha256(chave.encode()).hexdigest()}.arrow"
+        temporario: Path = self.pasta / f"{arquivo}.{os.getpid()}.{threading.get_ident()}"
+
+        # o arquivo é escrito fora da trava; só a troca de nome e o índice ficam dentro dela
+        try:
+            with pa.OSFile(str(temporario), "wb") as destino, pa.ipc.new_file(
+                    destino, tabela.schema, options=pa.ipc.IpcWriteOptions(compression="lz4")) as escritor:
+                escritor.write_table(tabela)
+
+        except BaseException:
+            temporario.unlink(missing_ok=True)
+            raise
+
+        tamanho: int = temporario.stat().st_size
+
+        with self._travado(fcntl.LOCK_EX):
+            os.replace(temporario, self.pasta / arquivo)
+            indice: dict[str, dict[str, Any]] = self._ler_indice()
+            indice[chave] = dict(arquivo=arquivo, expira=entrada.expira, bytes=tamanho)
+            self._liberar(indice)
+            self._gravar_indice(indice)
+
+    def remover(self, prefixo: str) -> None:
+        with self._travado(fcntl.LOCK_EX):
+            indice: dict[str, dict[str, Any]] = self._ler_indice()
+
+            for chave in [chave for chave in indice if chave.startswith(prefixo)]:
+                self._apagar(indice.pop(chave))
+
+            self._gravar_indice(indice)
+
+    def ocupado(self) -> int:
+        with self._travado(fcntl.LOCK_SH):
+            return sum(item["bytes"] for item in self._ler_indice().values())
+
+    def _apagar(self, item: dict[str, Any]) -> None:
+        (self.pasta / item["arquivo"]).unlink(missing_ok=True)
+
+    def _uso(self, item: dict[str, Any]) -> float:
+        try:
+            return (self.pasta / item["arquivo"]).stat().st_mtime
+
+        except FileNotFoundError:
+            return 0.0
+
+    def _liberar(self, indice: dict[str, dict[str, Any]]) -> None:
+        # vencidas saem sempre; depois, as usadas há mais tempo até caber no limite
+        agora: float = time.time()
+
+        for chave in [chave for chave, item in indice.items() if item["expira"] <= agora]:
+            self._apagar(indice.pop(chave))
+
+        ocupado: int = sum(item["bytes"] for item in indice.values())
+
+        for chave in sorted(indice, key=lambda chave: self._uso(indice[chave])):
+            if ocupado <= self.limite or len(indice) == 1:
+                break
+
+            item: dict[str, Any] = indice.pop(chave)
+            ocupado -= item["bytes"]
+            self._apagar(item)
+
+
+@st.cache_resource(show_spinner=False)
+def get_memoria() -> Memoria:
+    return Memoria()
+
+
+@st.cache_resource(show_spinner=False)
+def get_disco() -> Disco:
+    # a URL sai com a senha mascarada
+    return Disco(PASTA / hashlib.sha256(str(db.get_engine().url).encode()).hexdigest()[:16])
+
+
+def _prefixo(funcao: Callable) -> str:
+    # pelo arquivo e não pelo módulo: as páginas rodam todas como __main__
+    return f"{Path(funcao.__code__.co_filename).stem}.{funcao.__qualname__}:"
+
+
+def _chave(prefixo: str, args: tuple, kwargs: dict[str, Any]) -> str:
+    # prefixo da função + hash dos argumentos; o prefixo é o que limpar() remove
+    argumentos: bytes = pickle.dumps((args, sorted(kwargs.items())))
+
+    return prefixo + hashlib.sha256(argumentos).hexdigest()
+
+
+def dados(ttl: int, disco: bool = False) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    # @cache.dados(ttl=60): só na memória do processo; @cache.dados(ttl=900, disco=True): memória e disco,
+    # compartilhado pelos processos da máquina (apenas DataFrame vai para o disco)
+    def decorar(funcao: Callable[..., Any]) -> Callable[..., Any]:
+        prefixo: str = _prefixo(funcao)
+
+        def niveis() -> list[Nivel]:
+            return [get_memoria(), get_disco()] if disco else [get_memoria()]
+
+        @wraps(funcao)
+        def guardada(*args: Any, **kwargs: Any) -> Any:
+            chave: str = _chave(prefixo, args, kwargs)
+            anteriores: list[Nivel] = []
+
+            for nivel in niveis():
+                entrada: Entrada | None = nivel.ler(chave)
+                metricas.registrar_cache(nivel.nome, entrada is not None)
+
+                if entrada is not None:
+                    # achada no disco: sobe para a memória do processo, com a validade que já tinha
+                    for anterior in anteriores:
+                        anterior.gravar(chave, entrada)
+
+                    return _copia(entrada.valor)
+
+                anteriores.append(nivel)
+
+            valor: Any = funcao(*args, **kwargs)
+            entrada = Entrada(valor, time.time() + ttl, _tamanho(valor))
+
+            for nivel in anteriores:
+                try:
+                    nivel.gravar(chave, entrada)
+
+                # o valor já foi calculado: falha do cache (disco, conversão para Arrow, attrs) não derruba a página
+                except (OSError, pa.ArrowException, TypeError, ValueError):
+                    logger.exception("Falha ao gravar no cache (%s), seguindo sem ele", nivel.nome)
+
+            return _copia(valor)
+
+        def limpar() -> None:
+            for nivel in niveis():
+                nivel.remover(prefixo)
+
+        guardada.limpar = limpar
+
+        return guardada
+
+    return decorar
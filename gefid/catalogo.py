@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+import streamlit as st
+
+from gefid import cache, db
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# intervalo, em segundos, entre as atualizações do catálogo em segundo plano
+TTL: int = 15 * 60
+
+
+@dataclass(frozen=True)
+class Emissor:
+    mci: int
+    nome: str
+    sigla: str
+    cnpj: str
+    ativo: bool
+
+
+SQL_EMISSORES: str = """
+    SELECT
+        t1.CD_CLI_EMT AS MCI,
+        STRIP(t2.NOM) AS NOM,
+        STRIP(t1.SG_EMP) AS SIGLA,
+        CASE
+            WHEN t2.COD_TIPO = 2 THEN LPAD(t2.COD_CPF_CGC, 14, '0')
+            ELSE LPAD(t2.COD_CPF_CGC, 11, '0')
+        END AS CNPJ,
+        CASE WHEN t1.DT_ECR_CTR IS NULL THEN 1 ELSE 0 END AS ATIVO
+    FROM
+        DB2AEB.PRM_EMP t1
+        INNER JOIN DB2MCI.CLIENTE t2
+            ON t2.COD = t1.CD_CLI_EMT
+"""
+
+
+def _emissores(load: pd.DataFrame) -> dict[int, Emissor]:
+    return {
+        int(mci): Emissor(mci=int(mci), nome=nom, sigla=sigla, cnpj=cnpj, ativo=bool(ativo))
+        for mci, nom, sigla, cnpj, ativo in zip(load["mci"], load["nom"], load["sigla"], load["cnpj"], load["ativo"])
+    }
+
+
+# a listagem vai também para o disco: os outros processos do servidor na máquina sobem sem ir ao DB2
+@cache.dados(ttl=TTL, disco=True)
+def load_tabela_emissores() -> pd.DataFrame:
+    return db.query(sql=SQL_EMISSORES + "ORDER BY STRIP(t2.NOM)", classe="leve")
+
+
+def load_emissores() -> dict[int, Emissor]:
+    return _emissores(load_tabela_emissores())
+
+
+def load_emissor(mci: int) -> Emissor | None:
+    load: pd.DataFrame = db.query(sql=SQL_EMISSORES + "WHERE t1.CD_CLI_EMT = :mci", params=dict(mci=mci), classe="leve")
+
+    return _emissores(load).get(mci)
+
+
+class Catalogo:
+    def __init__(self, ttl: int = TTL) -> None:
+        self.ttl: int = ttl
+        self.atualizado_em: float = 0.0
+        self._emissores: dict[int, Emissor] = load_emissores()
+        self._clientes: dict[bool, dict[str, int]] = self._indexar(self._emissores)
+        self.atualizado_em = time.time()
+
+        threading.Thread(target=self._atualizar_sempre, name="gefid-catalogo", daemon=True).start()
+
+    @staticmethod
+    def _indexar(emissores: dict[int, Emissor]) -> dict[bool, dict[str, int]]:
+        # os emissores já chegam ordenados pelo nome, igual às antigas listagens das páginas
+        return {
+            ativo: {emissor.nome: emissor.mci for emissor in emissores.values() if emissor.ativo is ativo}
+            for ativo in (True, False)
+        }
+
+    def atualizar(self) -> None:
+        emissores: dict[int, Emissor] = load_emissores()
+
+        # troca as referências de uma vez; quem está lendo continua com a versão anterior
+        self._emissores, self._clientes = emissores, self._indexar(emissores)
+        self.atualizado_em = time.time()
+
+    def _atualizar_sempre(self) -> None:
+        while True:
+            time.sleep(self.ttl)
+
+            try:
+                self.atualizar()
+
+            except Exception:
+                logger.exception("Falha ao atualizar o catálogo de emissores, mantendo a versão anterior")
+
+    def clientes(self, ativos: bool = True) -> dict[str, int]:
+        return self._clientes[ativos]
+
+    def emissores(self) -> dict[int, Emissor]:
+        return self._emissores
+
+    def emissor(self, mci: int) -> Emissor:
+        emissor: Emissor | None = self._emissores.get(mci)
+
+        # emissor cadastrado depois da última carga, ou invalidado: busca só ele no DB2
+        if emissor is None:
+            emissor = load_emissor(mci)
+
+            if emissor is None:
+                raise KeyError(mci)
+
+            self._emissores[mci] = emissor
+
+        return emissor
+
+    def invalidar(self, mci: int | None = None) -> None:
+        if mci is None:
+            load_tabela_emissores.limpar()
+            self.atualizar()
+
+        else:
+            self._emissores.pop(mci, None)
+
+
+@st.cache_resource(show_spinner="**:material/hourglass: Carregando a listagem de empresas, aguarde...**")
+def get_catalogo() -> Catalogo:
+    return Catalogo()
+
+
+def clientes(ativos: bool = True) -> dict[str, int]:
+    return get_catalogo().clientes(ativos)
+
+
+def emissor(mci: int) -> Emissor:
+    return get_catalogo().emissor(mci)
+
+
+def invalidar(mci: int | None = None) -> None:
+    get_catalogo().invalidar(mci)
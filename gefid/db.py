@@ -0,0 +1,584 @@
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import partial
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection, CursorResult, Engine
+from sqlalchemy.sql.elements import TextClause
+from streamlit.connections import SQLConnection
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import ScriptRunContext, add_script_run_ctx, get_script_run_ctx
+from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests, ScriptRequestType
+
+from gefid import metricas, tipos
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# parâmetros do pool de conexões com o DB2, compartilhado por todas as páginas do processo
+POOL: dict[str, Any] = dict(
+    pool_size=8,
+    max_overflow=4,
+    pool_timeout=30,
+    pool_recycle=1800,
+    pool_pre_ping=True,
+)
+
+# linhas lidas por vez do cursor do servidor nas consultas em partes
+CHUNKSIZE: int = 100_000
+
+# chaves por comando nas consultas em lote (db.buscar); o DB2 aceita bem mais marcadores, o limite é do plano
+LOTE: int = 1_000
+
+
+@dataclass(frozen=True)
+class Classe:
+    # tempo_limite: segundos que um comando da classe pode ficar no DB2 antes de ser cancelado;
+    # simultaneas: quantas da classe rodam ao mesmo tempo no processo (None = sem fila)
+    tempo_limite: float
+    simultaneas: int | None = None
+
+
+# classes de consulta (db.query(..., classe="posicao")); as pesadas ocupam no máximo 4 das 12 conexões do POOL,
+# então consultas leves e comuns nunca esperam atrás de uma exportação de fim de mês; as comuns ocupam no máximo
+# 6, então as leves (cadastro, tabelas de domínio) sempre acham conexão
+CLASSES: dict[str, Classe] = dict(
+    leve=Classe(tempo_limite=30),
+    padrao=Classe(tempo_limite=300, simultaneas=6),
+    posicao=Classe(tempo_limite=900, simultaneas=2),
+    mvt_ren=Classe(tempo_limite=900, simultaneas=2),
+)
+
+# de quanto em quanto tempo a vigia confere prazos e sessões das consultas em execução
+VIGIA_INTERVALO: float = 0.5
+
+_APPS: Path = Path(__file__).resolve().parent.parent / "apps"
+
+# o streamlit não expõe o estado dos pedidos ao script (ScriptRequests._state): conferido uma vez na importação,
+# para uma versão sem ele desligar só essa checagem, avisando no log, em vez de falhar a cada consulta
+_PEDIDOS: bool = hasattr(ScriptRequests(), "_state")
+
+if not _PEDIDOS:
+    logger.error("ScriptRequests._state não existe nesta versão do Streamlit: o botão Cancelar e a troca de página "
+                 "não cancelam mais as consultas no DB2, só o fechamento da sessão e o tempo limite")
+
+_semaforos: dict[str, threading.BoundedSemaphore] = {
+    nome: threading.BoundedSemaphore(classe.simultaneas) for nome, classe in CLASSES.items() if classe.simultaneas
+}
+
+
+class ConsultaCancelada(Exception):
+    MENSAGENS: dict[str, str] = dict(
+        tempo="A consulta passou do tempo limite de {limite:.0f} s e foi cancelada no DB2",
+        sessao="A consulta foi cancelada: a página foi fechada, trocada ou o cancelamento foi pedido",
+        fila="O DB2 está ocupado com outras consultas pesadas, tente de novo em alguns minutos",
+    )
+
+    def __init__(self, classe: str, motivo: str) -> None:
+        super().__init__(self.MENSAGENS[motivo].format(limite=CLASSES[classe].tempo_limite))
+        self.classe: str = classe
+        self.motivo: str = motivo
+
+
+@dataclass(eq=False)
+class _Execucao:
+    classe: str
+    # sessões que esperam o resultado: a de quem disparou e as que aguardam a mesma consulta
+    sessoes: list[ScriptRunContext] = field(default_factory=list)
+    # instante (perf_counter) em que o comando em andamento passa do tempo limite; None fora do DB2
+    prazo: float | None = None
+    conexao: Any = None
+    motivo: str | None = None
+    # sessões que chegaram depois e esperam o resultado de quem disparou
+    seguidoras: int = 0
+
+
+# consultas idênticas (mesmo SQL e parâmetros) em execução, aguardadas por quem chegar depois
+_em_andamento: dict[tuple, tuple[Future, _Execucao]] = {}
+_em_andamento_lock: threading.Lock = threading.Lock()
+
+# comandos no DB2 acompanhados pela vigia
+_execucoes: set[_Execucao] = set()
+_execucoes_lock: threading.Lock = threading.Lock()
+
+# página e função que chamaram o gather (ou o buscar), para as consultas rodando nas threads dele, onde a pilha
+# não passa por apps/ e o quadro mais próximo pode ser só o do pool
+_local: threading.local = threading.local()
+
+# módulos cujos quadros não contam como origem: este e o das threads do pool do gather
+_INTERNOS: frozenset[str] = frozenset({__name__, "concurrent.futures.thread", "threading"})
+
+
+@dataclass(frozen=True)
+class Periodo:
+    # intervalo semiaberto [inicio, fim): a coluna de data é comparada direto, sem YEAR()/MONTH(),
+    # para o DB2 poder usar o índice dela
+    inicio: date
+    fim: date
+
+    @classmethod
+    def mes(cls, ano: int, mes: int) -> "Periodo":
+        return cls(date(ano, mes, 1), date(ano + mes // 12, mes % 12 + 1, 1))
+
+    @classmethod
+    def ano(cls, ano: int) -> "Periodo":
+        return cls(date(ano, 1, 1), date(ano + 1, 1, 1))
+
+    @classmethod
+    def entre(cls, inicio: date, ultimo_dia: date) -> "Periodo":
+        # equivalente ao BETWEEN, com o último dia incluído
+        return cls(inicio, ultimo_dia + timedelta(days=1))
+
+    @staticmethod
+    def sql(coluna: str, nome: str = "periodo") -> str:
+        return f"{coluna} >= :{nome}_ini AND {coluna} < :{nome}_fim"
+
+    def params(self, nome: str = "periodo") -> dict[str, date]:
+        return {f"{nome}_ini": self.inicio, f"{nome}_fim": self.fim}
+
+
+@st.cache_resource(show_spinner=False)
+def get_engine() -> Engine:
+    return st.connection(name="DB2", type=SQLConnection, **POOL).engine
+
+
+@st.cache_resource(show_spinner=False)
+def warm() -> None:
+    # abre as conexões do pool em segundo plano na subida do servidor, para a primeira página não esperar
+    def abrir() -> None:
+        try:
+            engine: Engine = get_engine()
+
+            with ThreadPoolExecutor(max_workers=POOL["pool_size"]) as executor:
+                conexoes = list(executor.map(lambda _: engine.connect(), range(POOL["pool_size"])))
+
+            for conexao in conexoes:
+                conexao.close()
+
+        except Exception:
+            logger.exception("Falha ao aquecer o pool de conexões do DB2")
+
+    threading.Thread(target=abrir, name="gefid-db-warm", daemon=True).start()
+
+
+def _ativa(ctx: ScriptRunContext) -> bool:
+    # sessão ainda conectada e script sem pedido para parar ou rodar de novo (botão Cancelar, outra página, etc.)
+    if Runtime.exists() and not Runtime.instance().is_active_session(ctx.session_id):
+        return False
+
+    # enquanto a consulta prende o script, nada da página (nem o session_state do clique) roda até ela acabar:
+    # o pedido só se vê no ScriptRequests; sem ele nesta versão (_PEDIDOS), vale só a checagem da sessão
+    if not _PEDIDOS:
+        return True
+
+    return ctx.script_requests._state == ScriptRequestType.CONTINUE
+
+
+def _interessada(execucao: _Execucao) -> bool:
+    # fora do streamlit (scripts, benchmarks) não há sessão para acompanhar
+    return not execucao.sessoes or any(_ativa(ctx) for ctx in execucao.sessoes)
+
+
+def _interromper(conexao: Any) -> None:
+    # sqlite3 (base local) tem interrupt(), outros drivers DB-API têm cancel(); sem nenhum dos dois (ibm_db_dbi),
+    # fechar a conexão faz o DB2 encerrar o agente e desfazer o comando
+    for metodo in ("interrupt", "cancel"):
+        if callable(getattr(conexao, metodo, None)):
+            getattr(conexao, metodo)()
+            return
+
+    conexao.close()
+
+
+def _vigiar_execucoes() -> None:
+    while True:
+        time.sleep(VIGIA_INTERVALO)
+
+        with _execucoes_lock:
+            execucoes: list[_Execucao] = list(_execucoes)
+
+        for execucao in execucoes:
+            if execucao.motivo is not None:
+                continue
+
+            if execucao.prazo is not None and time.perf_counter() > execucao.prazo:
+                execucao.motivo = "tempo"
+
+            elif not _interessada(execucao):
+                execucao.motivo = "sessao"
+
+            else:
+                continue
+
+            try:
+                _interromper(execucao.conexao)
+
+            except Exception:
+                logger.exception("Falha ao cancelar a consulta no DB2")
+
+
+@st.cache_resource(show_spinner=False)
+def _vigia() -> threading.Thread:
+    # uma thread por processo acompanha todas as consultas em execução
+    thread: threading.Thread = threading.Thread(target=_vigiar_execucoes, name="gefid-db-vigia", daemon=True)
+    thread.start()
+
+    return thread
+
+
+def _cancelar(execucao: _Execucao, motivo: str) -> ConsultaCancelada:
+    metricas.registrar_cancelamento(execucao.classe, motivo)
+
+    return ConsultaCancelada(execucao.classe, motivo)
+
+
+@contextmanager
+def _admitir(execucao: _Execucao) -> Iterator[None]:
+    # classes pesadas esperam a vez na fila da classe, sem segurar conexão do pool enquanto esperam
+    semaforo: threading.BoundedSemaphore | None = _semaforos.get(execucao.classe)
+
+    if semaforo is None:
+        yield
+        return
+
+    relogio: float = time.perf_counter()
+    admitida: bool = False
+    metricas.iniciar_fila(execucao.classe)
+
+    try:
+        while not (admitida := semaforo.acquire(timeout=VIGIA_INTERVALO)):
+            if not _interessada(execucao):
+                raise _cancelar(execucao, "sessao")
+
+            if time.perf_counter() - relogio > CLASSES[execucao.classe].tempo_limite:
+                raise _cancelar(execucao, "fila")
+
+    finally:
+        metricas.registrar_fila(execucao.classe, time.perf_counter() - relogio, admitida)
+
+    try:
+        yield
+
+    finally:
+        semaforo.release()
+
+
+@contextmanager
+def _acompanhar(execucao: _Execucao, conexao: Connection) -> Iterator[None]:
+    # a vigia cancela o comando no DB2 quando passa do prazo ou quando ninguém mais espera o resultado
+    _vigia()
+    execucao.conexao = conexao.connection.dbapi_connection
+
+    with _execucoes_lock:
+        _execucoes.add(execucao)
+
+    try:
+        yield
+
+    except Exception as erro:
+        if execucao.motivo is None:
+            raise
+
+        raise _cancelar(execucao, execucao.motivo) from erro
+
+    finally:
+        with _execucoes_lock:
+            _execucoes.discard(execucao)
+
+        # a conexão interrompida (ou fechada) não volta para o pool
+        if execucao.motivo is not None:
+            conexao.invalidate()
+
+
+def _prazo(execucao: _Execucao) -> float:
+    return time.perf_counter() + CLASSES[execucao.classe].tempo_limite
+
+
+def _comando(sql: str, params: dict[str, Any] | None) -> TextClause:
+    # parâmetros em lista (IN :chaves) viram um marcador por valor
+    return text(sql).bindparams(
+        *(bindparam(nome, expanding=True) for nome, valor in (params or {}).items() if isinstance(valor, (list, tuple)))
+    )
+
+
+def _registrar_comando(sql: str, result: CursorResult) -> None:
+    # o SQLAlchemy informa se o texto já estava compilado; variantes fixas (gefid.buscas) sempre reaproveitam
+    metricas.registrar_comando(sql, result.context.cache_hit == result.context.dialect.CACHE_HIT)
+
+
+def _origem() -> tuple[str, str]:
+    # página (script em apps/) e função que originaram a consulta, ignorando os quadros deste módulo e do pool;
+    # numa thread do gather sem função de fora na pilha (partial(query, ...) do buscar) vale a do chamador dele
+    frame = sys._getframe(1)
+
+    while frame is not None and frame.f_globals.get("__name__") in _INTERNOS:
+        frame = frame.f_back
+
+    if frame is None:
+        return getattr(_local, "origem", ("-", "-"))
+
+    funcao: str = frame.f_code.co_name
+    pagina: str = frame.f_globals.get("__name__", "-")
+
+    while frame is not None:
+        arquivo: Path = Path(frame.f_code.co_filename)
+
+        if arquivo.parent == _APPS:
+            pagina = arquivo.stem
+            break
+
+        frame = frame.f_back
+
+    else:
+        pagina = getattr(_local, "origem", (pagina,))[0]
+
+    return pagina, funcao
+
+
+def _chave(sql: str, params: dict[str, Any] | None, schema: dict[str, str] | None) -> tuple:
+    # listas (IN) viram tuplas para a chave poder ser usada no dicionário
+    return sql, tuple(sorted(
+        (nome, tuple(valor) if isinstance(valor, (list, set)) else valor) for nome, valor in (params or {}).items()
+    )), tuple(sorted((schema or {}).items()))
+
+
+def _frame(columns: list[str], rows: list, schema: dict[str, str] | None) -> pd.DataFrame:
+    if schema:
+        return tipos.tabela(columns, rows, schema)
+
+    return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+
+def _registrar_cancelada(erro: ConsultaCancelada, sql: str, params: dict[str, Any] | None, pagina: str,
+                         funcao: str, inicio: float, relogio: float, tempo_db2: float) -> None:
+    # consulta cancelada não chega às métricas, mas passou do tempo: vai para o log de lentas com o motivo
+    metricas.registrar_lenta(
+        metricas.Consulta(pagina=pagina, funcao=funcao, inicio=inicio, tempo_total=time.perf_counter() - relogio,
+                          tempo_db2=tempo_db2, linhas=0, bytes=0),
+        erro.classe, sql, params, erro.motivo,
+    )
+
+
+def _executar(sql: str, params: dict[str, Any] | None, schema: dict[str, str] | None, pagina: str, funcao: str,
+              execucao: _Execucao) -> pd.DataFrame:
+    inicio: float = time.time()
+    relogio: float = time.perf_counter()
+    relogio_db2: float | None = None
+
+    try:
+        with _admitir(execucao), get_engine().connect() as conexao, _acompanhar(execucao, conexao):
+            relogio_db2 = time.perf_counter()
+            execucao.prazo = _prazo(execucao)
+            result = conexao.execute(_comando(sql, params), params or {})
+            _registrar_comando(sql, result)
+            columns: list[str] = list(result.keys())
+            rows: list = result.fetchall()
+            execucao.prazo = None
+            tempo_db2: float = time.perf_counter() - relogio_db2
+
+    except ConsultaCancelada as erro:
+        _registrar_cancelada(erro, sql, params, pagina, funcao, inicio, relogio,
+                             0.0 if relogio_db2 is None else time.perf_counter() - relogio_db2)
+        raise
+
+    load: pd.DataFrame = _frame(columns, rows, schema)
+
+    consulta: metricas.Consulta = metricas.Consulta(
+        pagina=pagina,
+        funcao=funcao,
+        inicio=inicio,
+        tempo_total=time.perf_counter() - relogio,
+        tempo_db2=tempo_db2,
+        linhas=len(load),
+        bytes=int(load.memory_usage(index=False, deep=True).sum()),
+    )
+    metricas.registrar(consulta)
+    metricas.registrar_lenta(consulta, execucao.classe, sql, params)
+
+    return load
+
+
+def query(sql: str, params: dict[str, Any] | None = None, schema: dict[str, str] | None = None,
+          classe: str = "padrao") -> pd.DataFrame:
+    # schema declara o tipo (gefid.tipos.TIPOS) das colunas que devem chegar em Arrow, ex.: dict(mci="id");
+    # classe (CLASSES) define o tempo limite e a fila da consulta
+    pagina, funcao = _origem()
+    chave: tuple = _chave(sql, params, schema)
+    ctx: ScriptRunContext | None = get_script_run_ctx()
+
+    with _em_andamento_lock:
+        andamento: tuple[Future, _Execucao] | None = _em_andamento.get(chave)
+        lider: bool = andamento is None
+
+        if lider:
+            andamento = _em_andamento[chave] = (Future(), _Execucao(classe))
+
+        futuro, execucao = andamento
+        execucao.seguidoras += not lider
+
+        if ctx is not None:
+            execucao.sessoes.append(ctx)
+
+    # a mesma consulta já está no DB2 para outra sessão: espera por ela e reaproveita o resultado
+    if not lider:
+        relogio: float = time.perf_counter()
+        metricas.iniciar_espera()
+
+        try:
+            load: pd.DataFrame = futuro.result()
+
+        finally:
+            metricas.registrar_espera(pagina, funcao, time.perf_counter() - relogio)
+
+        # cada sessão recebe a sua cópia, as páginas alteram os dataframes que recebem
+        return load.copy()
+
+    try:
+        load: pd.DataFrame = _executar(sql, params, schema, pagina, funcao, execucao)
+
+    except BaseException as erro:
+        with _em_andamento_lock:
+            del _em_andamento[chave]
+
+        futuro.set_exception(erro)
+        raise
+
+    # fora do dicionário ninguém mais se junta; com seguidoras, elas copiam de um quadro só delas, não do que a
+    # página de quem disparou já pode estar alterando
+    with _em_andamento_lock:
+        del _em_andamento[chave]
+        seguidoras: int = execucao.seguidoras
+
+    futuro.set_result(load.copy() if seguidoras else load)
+
+    return load
+
+
+def _partes(sql: str, params: dict[str, Any] | None, schema: dict[str, str] | None, chunksize: int, pagina: str,
+            funcao: str, execucao: _Execucao) -> Iterator[pd.DataFrame]:
+    inicio: float = time.time()
+    relogio: float = time.perf_counter()
+    tempo_db2: float = 0.0
+    linhas: int = 0
+    maior_parte: int = 0
+
+    relogio_db2: float | None = None
+
+    # stream_results mantém o cursor aberto no servidor; só uma parte por vez fica na memória
+    # o tempo limite vale para cada ida ao DB2, não para o tempo de quem consome as partes
+    try:
+        with _admitir(execucao), get_engine().connect().execution_options(stream_results=True) as conexao, \
+                _acompanhar(execucao, conexao):
+            relogio_db2 = time.perf_counter()
+            execucao.prazo = _prazo(execucao)
+            result = conexao.execute(_comando(sql, params), params or {})
+            _registrar_comando(sql, result)
+            columns: list[str] = list(result.keys())
+            tempo_db2 += time.perf_counter() - relogio_db2
+
+            while True:
+                relogio_db2 = time.perf_counter()
+                execucao.prazo = _prazo(execucao)
+                rows: list = result.fetchmany(chunksize)
+                execucao.prazo = None
+                tempo_db2 += time.perf_counter() - relogio_db2
+                relogio_db2 = None
+
+                # sem linhas, entrega uma parte vazia para quem consome conhecer as colunas
+                if not rows and linhas:
+                    break
+
+                parte: pd.DataFrame = _frame(columns, rows, schema)
+                linhas += len(parte)
+                maior_parte = max(maior_parte, int(parte.memory_usage(index=False, deep=True).sum()))
+
+                yield parte
+
+                if len(rows) < chunksize:
+                    break
+
+    except ConsultaCancelada as erro:
+        _registrar_cancelada(erro, sql, params, pagina, funcao, inicio, relogio,
+                             tempo_db2 + (0.0 if relogio_db2 is None else time.perf_counter() - relogio_db2))
+        raise
+
+    consulta: metricas.Consulta = metricas.Consulta(
+        pagina=pagina,
+        funcao=funcao,
+        inicio=inicio,
+        tempo_total=time.perf_counter() - relogio,
+        tempo_db2=tempo_db2,
+        linhas=linhas,
+        bytes=maior_parte,
+    )
+    metricas.registrar(consulta)
+    metricas.registrar_lenta(consulta, execucao.classe, sql, params)
+
+
+def stream(sql: str, params: dict[str, Any] | None = None, schema: dict[str, str] | None = None,
+           chunksize: int = CHUNKSIZE, classe: str = "padrao") -> Iterator[pd.DataFrame]:
+    # a origem e a sessão são guardadas aqui, antes de a primeira parte ser pedida por quem consome o gerador
+    pagina, funcao = _origem()
+    ctx: ScriptRunContext | None = get_script_run_ctx()
+
+    return _partes(sql, params, schema, chunksize, pagina, funcao, _Execucao(classe, [ctx] if ctx else []))
+
+
+def gather(*chamadas: Callable[[], Any]) -> list[Any]:
+    # consultas independentes de uma mesma ação rodam juntas no pool; a espera é a da mais lenta, não a soma
+    if not chamadas:
+        return []
+
+    origem: tuple[str, str] = _origem()
+    ctx = get_script_run_ctx()
+
+    def executar(chamada: Callable[[], Any]) -> Any:
+        # a thread herda a sessão do streamlit (session_state, cache) e a origem para as métricas
+        add_script_run_ctx(threading.current_thread(), ctx)
+        _local.origem = origem
+
+        return chamada()
+
+    trabalhadores: int = min(len(chamadas), POOL["pool_size"])
+
+    with ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="gefid-db") as executor:
+        futuros: list[Future] = [executor.submit(executar, chamada) for chamada in chamadas]
+
+    return [futuro.result() for futuro in futuros]
+
+
+def _lotes(valores: list, lote: int) -> Iterator[list]:
+    # cada lote é completado (repetindo a última chave) até a próxima potência de 2, limitada a `lote`:
+    # poucos tamanhos de lista, poucos textos de comando diferentes para o DB2 guardar
+    for inicio in range(0, len(valores), lote):
+        parte: list = valores[inicio:inicio + lote]
+        tamanho: int = min(lote, 1 << (len(parte) - 1).bit_length())
+
+        yield parte + parte[-1:] * (tamanho - len(parte))
+
+
+def buscar(sql: str, valores: Iterable, chave: str = "chaves", params: dict[str, Any] | None = None,
+           schema: dict[str, str] | None = None, lote: int = LOTE, classe: str = "padrao") -> pd.DataFrame:
+    # consulta as linhas de N chaves de uma vez: o sql filtra com "IN :chaves" e as chaves vão em lotes ligados de
+    # até `lote` valores, rodando juntos pelo gather; o custo cresce com o número de lotes, não com o de chaves
+    valores = list(dict.fromkeys(valores))
+
+    if not valores:
+        return pd.DataFrame()
+
+    partes: list[pd.DataFrame] = gather(*(
+        partial(query, sql=sql, params={**(params or {}), chave: parte}, schema=schema, classe=classe)
+        for parte in _lotes(valores, lote)
+    ))
+
+    return pd.concat(partes, ignore_index=True)
@@ -0,0 +1,143 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from gefid import cache, db
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# intervalo, em segundos, entre as atualizações das tabelas de domínio em segundo plano
+TTL: int = 60 * 60
+
+SQL_TIP_TIT: str = "SELECT CD_TIP_TIT, STRIP(SG_TIP_TIT) AS SG_TIP_TIT, STRIP(CD_CLS_TIP_TIT) AS CD_CLS_TIP_TIT " \
+                   "FROM DB2AEB.TIP_TIT"
+SQL_TIP_DRT: str = "SELECT CD_TIP_DRT, NM_TIP_DRT FROM DB2AEB.TIP_DRT"
+SQL_EST_DRT: str = "SELECT CD_EST_DRT, NM_EST_DRT FROM DB2AEB.EST_DRT"
+
+
+@dataclass(frozen=True)
+class Rotulos:
+    codigos: pd.Index
+    textos: pa.Array
+
+    def indices(self, codigos: pd.Series) -> np.ndarray:
+        # posição de cada código na tabela de domínio; -1 para código sem cadastro (ou nulo)
+        return self.codigos.get_indexer(pd.to_numeric(codigos).astype("Int64"))
+
+    def mapear(self, codigos: pd.Series) -> pd.Series:
+        # código -> rótulo como categoria (dictionary do Arrow): monta só os índices, os textos não se copiam;
+        # código sem cadastro (ou nulo) fica nulo, como no LEFT JOIN; rótulo nulo também, no índice
+        indices: np.ndarray = self.indices(codigos)
+        nulos: np.ndarray = np.flatnonzero(self.textos.is_null().to_numpy(zero_copy_only=False))
+        array: pa.DictionaryArray = pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=pa.int32(), mask=(indices < 0) | np.isin(indices, nulos)), self.textos
+        )
+
+        return pd.Series(array, index=codigos.index, name=codigos.name, dtype=pd.ArrowDtype(array.type))
+
+
+# rótulos disponíveis, montados a partir das três tabelas (tip_tit, tip_drt, est_drt)
+ROTULOS: dict[str, tuple[str, Callable[[pd.DataFrame], pd.Series]]] = dict(
+    # CONCAT(STRIP(SG_TIP_TIT), STRIP(CD_CLS_TIP_TIT))
+    sigla=("tip_tit", lambda load: load["sg_tip_tit"] + load["cd_cls_tip_tit"]),
+    # STRIP(SG_TIP_TIT) || ' ' || STRIP(CD_CLS_TIP_TIT)
+    sigla_classe=("tip_tit", lambda load: load["sg_tip_tit"] + " " + load["cd_cls_tip_tit"]),
+    tipo_titulo=("tip_tit", lambda load: load["sg_tip_tit"]),
+    direito=("tip_drt", lambda load: load["nm_tip_drt"]),
+    estado=("est_drt", lambda load: load["nm_est_drt"]),
+)
+
+
+@cache.dados(ttl=TTL, disco=True)
+def load_tabela(sql: str) -> pd.DataFrame:
+    return db.query(sql=sql, classe="leve")
+
+
+def load_tabelas() -> dict[str, pd.DataFrame]:
+    tip_tit, tip_drt, est_drt = db.gather(
+        partial(load_tabela, SQL_TIP_TIT), partial(load_tabela, SQL_TIP_DRT), partial(load_tabela, SQL_EST_DRT)
+    )
+
+    return dict(tip_tit=tip_tit, tip_drt=tip_drt, est_drt=est_drt)
+
+
+def _montar(tabelas: dict[str, pd.DataFrame]) -> dict[str, Rotulos]:
+    rotulos: dict[str, Rotulos] = {}
+
+    for nome, (tabela, texto) in ROTULOS.items():
+        load: pd.DataFrame = tabelas[tabela]
+
+        rotulos[nome] = Rotulos(
+            codigos=pd.Index(load.iloc[:, 0].astype("int64")),
+            # rótulo nulo (ex.: classe sem cadastro na concatenação) fica nulo, como o || do DB2
+            textos=pa.array(texto(load).astype("string"), type=pa.string(), from_pandas=True),
+        )
+
+    return rotulos
+
+
+class Dimensoes:
+    def __init__(self, ttl: int = TTL) -> None:
+        self.ttl: int = ttl
+        self._rotulos: dict[str, Rotulos] = _montar(load_tabelas())
+        self.atualizado_em: float = time.time()
+
+        threading.Thread(target=self._atualizar_sempre, name="gefid-dimensoes", daemon=True).start()
+
+    def atualizar(self) -> None:
+        # troca a referência de uma vez; quem está rotulando continua com a versão anterior
+        self._rotulos = _montar(load_tabelas())
+        self.atualizado_em = time.time()
+
+    def _atualizar_sempre(self) -> None:
+        while True:
+            time.sleep(self.ttl)
+
+            try:
+                self.atualizar()
+
+            except Exception:
+                logger.exception("Falha ao atualizar as tabelas de domínio, mantendo a versão anterior")
+
+    def rotulos(self, nome: str) -> Rotulos:
+        return self._rotulos[nome]
+
+
+@st.cache_resource(show_spinner=False)
+def get_dimensoes() -> Dimensoes:
+    return Dimensoes()
+
+
+def rotular(load: pd.DataFrame, juncao: str = "left", **colunas: str) -> pd.DataFrame:
+    # troca os códigos das colunas pelos rótulos, na mesma posição: rotular(load, direito="direito", sigla="sigla");
+    # o SQL traz só o código (t1.CD_TIP_DRT AS DIREITO) e dispensa o JOIN com a tabela de domínio;
+    # juncao="left" mantém a linha de código sem cadastro com rótulo nulo, "inner" a descarta, como cada JOIN fazia
+    dimensoes: Dimensoes = get_dimensoes()
+
+    if juncao == "inner":
+        existe: np.ndarray = np.logical_and.reduce(
+            [dimensoes.rotulos(nome).indices(load[coluna]) >= 0 for coluna, nome in colunas.items()]
+        )
+
+        if not existe.all():
+            load = load[existe].reset_index(drop=True)
+
+    load = load.assign(**{coluna: dimensoes.rotulos(nome).mapear(load[coluna]) for coluna, nome in colunas.items()})
+
+    if "schema" in load.attrs:
+        load.attrs["schema"] = {**load.attrs["schema"], **dict.fromkeys(colunas, "categoria")}
+
+    return load
+
+
+def invalidar() -> None:
+    load_tabela.limpar()
+    get_dimensoes().atualizar()
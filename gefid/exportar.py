@@ -0,0 +1,101 @@
+import io
+import time
+from collections.abc import Iterable, Sequence
+from itertools import zip_longest
+
+import pandas as pd
+import xlsxwriter
+
+from gefid import telemetria, tipos
+
+# o Excel aceita 1.048.576 linhas por aba, então cada aba recebe no máximo 1 milhão de registros
+LINHAS_POR_ABA: int = 1_000_000
+
+
+def _registrar(formato: str, relogio: float, saida: io.BytesIO) -> None:
+    # o tempo inclui a leitura das partes no DB2, que acontece enquanto o arquivo é escrito
+    telemetria.EXPORTACAO_SEGUNDOS.observar(time.perf_counter() - relogio, formato=formato)
+    telemetria.EXPORTACAO_BYTES.observar(saida.getbuffer().nbytes, formato=formato)
+
+
+def csv(partes: Iterable[pd.DataFrame]) -> tuple[bytes, int]:
+    saida: io.BytesIO = io.BytesIO()
+    linhas: int = 0
+    relogio: float = time.perf_counter()
+
+    for parte in partes:
+        saida.write(tipos.reais(parte).to_csv(index=False, header=saida.tell() == 0).encode("utf-8"))
+        linhas += len(parte)
+
+    _registrar("csv", relogio, saida)
+
+    return saida.getvalue(), linhas
+
+
+def xlsx(partes: Iterable[pd.DataFrame], linhas_por_aba: int = LINHAS_POR_ABA, cabecalho: Sequence[str] = (),
+         nomes: Sequence[str] | None = None, larguras: Sequence[float | None] = (),
+         formatos: Sequence[str | int | None] = ()) -> tuple[bytes, int]:
+    # cabecalho: linhas de título (emissor, CNPJ, data) acima da tabela na primeira aba, que deixam o cabeçalho das
+    # colunas fixo e com filtro; nomes: rótulos das colunas no lugar dos nomes do dataframe; larguras e formatos
+    # (num_format do xlsxwriter, ex.: "#,##0.00"): por coluna, None deixa o padrão
+    saida: io.BytesIO = io.BytesIO()
+    linhas: int = 0
+    relogio: float = time.perf_counter()
+
+    # constant_memory grava cada linha no disco assim que a próxima começa, a memória não cresce com o relatório
+    workbook = xlsxwriter.Workbook(saida, dict(
+        constant_memory=True,
+        default_date_format="yyyy-mm-dd",
+        remove_timezone=True,
+    ))
+    cabecalho_format = workbook.add_format(dict(bold=True, border=1, align="center", valign="top"))
+    titulo_format = workbook.add_format(dict(bold=True, align="left", bg_color="#025AA5", font_size=14,
+                                             font_color="white"))
+    colunas: list[tuple[float | None, object]] = [
+        (largura, None if formato is None else workbook.add_format(dict(num_format=formato)))
+        for largura, formato in zip_longest(larguras, formatos)
+    ]
+    worksheet = None
+    abas: int = 0
+    linha: int = 0
+    na_aba: int = 0
+
+    for parte in partes:
+        # valores em centavos voltam para reais e nulos vão em branco, como no to_excel
+        parte = tipos.reais(parte)
+        parte = parte.astype(object).where(parte.notna(), None)
+
+        for registro in parte.itertuples(index=False, name=None):
+            # abre a próxima aba (1, 2, 3...) quando a atual chega ao limite
+            if worksheet is None or na_aba == linhas_por_aba:
+                abas += 1
+                worksheet = workbook.add_worksheet(str(abas))
+                topo: int = len(cabecalho) + 1 if cabecalho and abas == 1 else 0
+
+                for posicao, texto in enumerate(cabecalho if topo else []):
+                    worksheet.merge_range(posicao, 0, posicao, max(1, min(2, len(parte.columns) - 1)), texto,
+                                          titulo_format)
+
+                for coluna, (largura, formato) in enumerate(colunas):
+                    worksheet.set_column(coluna, coluna, largura, formato)
+
+                worksheet.write_row(topo, 0, list(nomes or parte.columns), cabecalho_format)
+
+                if cabecalho:
+                    worksheet.freeze_panes(topo + 1, 0)
+                    worksheet.autofilter(topo, 0, topo, len(parte.columns) - 1)
+
+                linha, na_aba = topo + 1, 0
+
+            worksheet.write_row(linha, 0, registro)
+            linha += 1
+            na_aba += 1
+            linhas += 1
+
+    if worksheet is None:
+        workbook.add_worksheet("1")
+
+    workbook.close()
+    _registrar("xlsx", relogio, saida)
+
+    return saida.getvalue(), linhas
@@ -0,0 +1,223 @@
+import threading
+import time
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from gefid import db, tipos
+
+# tempo, em segundos, que a identidade de um MCI vale antes de ser lida de novo do DB2
+TTL: int = 6 * 60 * 60
+
+# MCIs guardados no processo; passando disso, saem os usados há mais tempo
+LIMITE: int = 1_000_000
+
+# MCIs a partir daqui são investidores da B3 (VCL_ACNT_BLS); abaixo, clientes do BB (CLIENTE)
+MCI_B3: int = 1_000_000_000
+
+SQL_CLIENTE: str = """
+    SELECT
+        COD AS MCI,
+        STRIP(NOM) AS NOM,
+        COD_TIPO,
+        CAST(COD_CPF_CGC AS BIGINT) AS COD_CPF_CGC,
+        COD_PAIS_ORIG
+    FROM
+        DB2MCI.CLIENTE
+    WHERE
+        COD IN :chaves
+"""
+
+SQL_VCL: str = """
+    SELECT
+        CD_CLI_ACNT AS MCI,
+        STRIP(NM_INVR) AS NM_INVR,
+        CAST(NR_CPF_CNPJ_INVR AS BIGINT) AS NR_CPF_CNPJ_INVR,
+        CD_TIP_PSS
+    FROM
+        DB2AEB.VCL_ACNT_BLS
+    WHERE
+        CD_CLI_ACNT IN :chaves
+"""
+
+# colunas guardadas por MCI: nome e documento já resolvidos pela faixa do MCI, e os códigos que as páginas usam
+# para PF/PJ/estrangeiro (cod_tipo e cod_pais_orig do CLIENTE, cd_tip_pss da VCL_ACNT_BLS)
+COLUNAS: list[str] = ["nome", "documento", "cod_tipo", "cod_pais_orig", "cd_tip_pss", "carregado_em"]
+
+
+def _indexar(load: pd.DataFrame, mcis: np.ndarray, colunas: list[str]) -> pd.DataFrame:
+    # uma linha por MCI pedido; quem não tem cadastro fica nulo, como no LEFT JOIN
+    if load.empty:
+        return pd.DataFrame(index=pd.Index(mcis, name="mci"), columns=colunas, dtype=object)
+
+    return load.drop_duplicates("mci").set_index("mci")[colunas].reindex(mcis)
+
+
+def _numero(serie: pd.Series) -> np.ndarray:
+    return serie.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def load_identidades(mcis: np.ndarray) -> pd.DataFrame:
+    cliente: pd.DataFrame = db.buscar(
+        sql=SQL_CLIENTE, valores=mcis.tolist(), classe="leve",
+        schema=dict(mci="id", nom="texto", cod_tipo="id", cod_cpf_cgc="id", cod_pais_orig="id"),
+    )
+    vcl: pd.DataFrame = db.buscar(
+        sql=SQL_VCL, valores=mcis[mcis >= MCI_B3 - 1].tolist(), classe="leve",
+        schema=dict(mci="id", nm_invr="texto", nr_cpf_cnpj_invr="id", cd_tip_pss="id"),
+    )
+
+    cliente = _indexar(cliente, mcis, ["nom", "cod_tipo", "cod_cpf_cgc", "cod_pais_orig"])
+    vcl = _indexar(vcl, mcis, ["nm_invr", "nr_cpf_cnpj_invr", "cd_tip_pss"])
+    bb: np.ndarray = mcis < MCI_B3
+
+    return pd.DataFrame(
+        dict(
+            nome=pd.array(np.where(bb, cliente["nom"].to_numpy(object), vcl["nm_invr"].to_numpy(object)), dtype="str"),
+            documento=np.where(bb, _numero(cliente["cod_cpf_cgc"]), _numero(vcl["nr_cpf_cnpj_invr"])),
+            cod_tipo=_numero(cliente["cod_tipo"]),
+            cod_pais_orig=_numero(cliente["cod_pais_orig"]),
+            cd_tip_pss=_numero(vcl["cd_tip_pss"]),
+            carregado_em=time.time(),
+        ),
+        index=pd.Index(mcis, name="mci"),
+    )
+
+
+class Identidades:
+    def __init__(self, ttl: int = TTL, limite: int = LIMITE) -> None:
+        self.ttl: int = ttl
+        self.limite: int = limite
+        # tabela e último uso de cada linha (na mesma ordem), trocados juntos
+        self._atual: tuple[pd.DataFrame, np.ndarray] = (
+            pd.DataFrame(columns=COLUNAS, index=pd.Index([], dtype="int64", name="mci")), np.empty(0)
+        )
+        self._lock: threading.Lock = threading.Lock()
+
+    def obter(self, mcis: np.ndarray) -> pd.DataFrame:
+        # só os MCIs novos ou vencidos vão ao DB2, em lote; os demais saem da tabela local
+        tabela, uso = self._atual
+        agora: float = time.time()
+        conhecidos: pd.DataFrame = tabela.reindex(mcis)
+        faltam: np.ndarray = mcis[~(conhecidos["carregado_em"] > agora - self.ttl).to_numpy(dtype=bool)]
+
+        # marca o uso no lugar, sem trocar a tabela; leituras juntas só disputam o mesmo instante
+        lidas: np.ndarray = tabela.index.get_indexer(mcis)
+        uso[lidas[lidas >= 0]] = agora
+
+        if faltam.size:
+            novos: pd.DataFrame = load_identidades(faltam)
+
+            with self._lock:
+                # troca a referência de uma vez; quem está lendo continua com a versão anterior;
+                # as identidades vencidas saem aqui e, passando do limite, as usadas há mais tempo
+                tabela, uso = self._atual
+                manter: np.ndarray = ((tabela["carregado_em"] > agora - self.ttl) & ~tabela.index.isin(faltam)) \
+                    .to_numpy(dtype=bool)
+                tabela = pd.concat([tabela[manter], novos]) if manter.any() else novos
+                uso = np.concatenate([uso[manter], np.full(len(novos), agora)])
+                conhecidos = tabela.reindex(mcis)
+
+                if len(tabela) > self.limite:
+                    ficam: np.ndarray = np.sort(np.argpartition(uso, len(uso) - self.limite)[-self.limite:])
+                    tabela, uso = tabela.iloc[ficam], uso[ficam]
+
+                self._atual = (tabela, uso)
+
+        return conhecidos
+
+    def tamanho(self) -> int:
+        return len(self._atual[0])
+
+    def invalidar(self, mcis: list[int] | None = None) -> None:
+        with self._lock:
+            tabela, uso = self._atual
+            manter: np.ndarray = np.zeros(len(tabela), dtype=bool) if mcis is None else ~tabela.index.isin(mcis)
+            self._atual = (tabela[manter], uso[manter])
+
+
+@st.cache_resource(show_spinner=False)
+def get_identidades() -> Identidades:
+    return Identidades()
+
+
+def _cpf_cnpj(ident: pd.DataFrame, mcis: np.ndarray, pf_11: str) -> pd.Series:
+    # LPAD(CAST(documento AS BIGINT), 14 ou 11, '0'): 11 dígitos quando COD_TIPO (do CLIENTE) não é 2, nos MCIs
+    # do BB (pf_11="bb"), em todos (pf_11="todos") ou em nenhum (pf_11="nenhum"), como em cada página
+    curto: np.ndarray = ident["cod_tipo"].to_numpy() != 2
+
+    if pf_11 == "bb":
+        curto &= mcis < MCI_B3
+
+    elif pf_11 == "nenhum":
+        curto[:] = False
+
+    texto: pd.Series = pd.Series(ident["documento"].to_numpy(), index=ident.index).astype("Int64").astype("str")
+
+    return texto.str.zfill(14).str[:14].where(~curto, texto.str.zfill(11).str[:11])
+
+
+def _documento(ident: pd.DataFrame) -> pd.Series:
+    # sem nulos o documento volta a int64, como o from_records deixava o CAST(... AS BIGINT)
+    documento: pd.Series = ident["documento"]
+
+    return documento.astype("int64") if documento.notna().all() else documento
+
+
+def _tipo(ident: pd.DataFrame, mcis: np.ndarray) -> np.ndarray:
+    cod_tipo: np.ndarray = ident["cod_tipo"].to_numpy()
+
+    return np.select(
+        [(mcis < MCI_B3) & (cod_tipo == 1), (mcis < MCI_B3) & (cod_tipo == 2),
+         (mcis >= MCI_B3 - 1) & (ident["cd_tip_pss"].to_numpy() == 1)],
+        ["PF", "PJ", "PF"],
+        "PJ",
+    )
+
+
+def _pss(ident: pd.DataFrame, mcis: np.ndarray) -> np.ndarray:
+    # F/J pelo cadastro de quem é do país (COD_PAIS_ORIG <= 1), E para estrangeiros; o resto sai J
+    cod_tipo: np.ndarray = ident["cod_tipo"].to_numpy()
+    pais: np.ndarray = ident["cod_pais_orig"].to_numpy()
+
+    return np.select(
+        [(pais <= 1) & (mcis < MCI_B3) & (cod_tipo == 1), (pais <= 1) & (mcis < MCI_B3) & (cod_tipo == 2),
+         (pais <= 1) & (mcis >= MCI_B3) & (ident["cd_tip_pss"].to_numpy() == 1), pais > 1],
+        ["F", "J", "F", "E"],
+        "J",
+    )
+
+
+def enriquecer(load: pd.DataFrame, *colunas: str, pf_11: str = "bb", schema: dict[str, str] | None = None
+               ) -> pd.DataFrame:
+    # a consulta de posição traz só o MCI; investidor, cpf_cnpj, documento, tipo (PF/PJ) e pss (F/J/E) entram logo
+    # depois dele, calculados uma vez por MCI distinto e espalhados pelas linhas
+    mcis: np.ndarray = load["mci"].to_numpy(dtype="int64")
+    unicos, posicoes = np.unique(mcis, return_inverse=True)
+    ident: pd.DataFrame = get_identidades().obter(unicos)
+
+    derivadas: dict[str, Callable[[], pd.Series]] = dict(
+        investidor=lambda: ident["nome"],
+        cpf_cnpj=lambda: _cpf_cnpj(ident, unicos, pf_11),
+        documento=lambda: _documento(ident),
+        tipo=lambda: pd.Series(_tipo(ident, unicos), index=ident.index),
+        pss=lambda: pd.Series(_pss(ident, unicos), index=ident.index),
+    )
+
+    load = load.copy()
+    posicao: int = load.columns.get_loc("mci")
+
+    for deslocamento, coluna in enumerate(colunas, start=1):
+        valores: pd.Series = derivadas[coluna]().iloc[posicoes].set_axis(load.index).rename(coluna)
+
+        if schema and coluna in schema:
+            valores = tipos.serie(valores, schema[coluna])
+
+        load.insert(posicao + deslocamento, coluna, valores)
+
+    if schema:
+        load.attrs["schema"] = {**load.attrs.get("schema", {}), **schema}
+
+    return load
@@ -0,0 +1,215 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from gefid import db, dimensoes, identidades, posicao, retratos, tipos
+
+# investidores que ficam fora da base: o próprio custodiante e a conta de tesouraria
+EXCLUIDOS_BASE: list[int] = [205007939, 211684707]
+
+# CNPJ do próprio banco, que não entra no arquivo da CVM 160
+CNPJ_CVM160: int = 60777661000150
+
+# ranking dos maiores investidores resolvido no DB2: posição de cada conta na data (a mais recente da história
+# inteira, como nas vigências), somada por CPF/CNPJ e sigla; só as :quantidade maiores voltam, e SIGLA_MIN/SIGLA_MAX
+# dizem se o emissor tem mais de uma sigla entre as posições
+SQL_MAIORES: str = f"""
+    SELECT
+        MIN(t9.INVESTIDOR) AS INVESTIDOR,
+        t9.CPF_CNPJ,
+        t9.SIGLA,
+        SUM(t9.QTD) AS QTD,
+        MIN(t9.SIGLA) OVER () AS SIGLA_MIN,
+        MAX(t9.SIGLA) OVER () AS SIGLA_MAX
+    FROM (
+        SELECT
+            STRIP(CASE
+                WHEN t5.CD_CLI_ACNT < {identidades.MCI_B3} THEN t6.NOM
+                ELSE t8.NM_INVR
+            END) AS INVESTIDOR,
+            LPAD(CAST(CASE
+                WHEN t5.CD_CLI_ACNT < {identidades.MCI_B3} THEN t6.COD_CPF_CGC
+                ELSE t8.NR_CPF_CNPJ_INVR
+            END AS BIGINT), 14, '0') AS CPF_CNPJ,
+            STRIP(t7.SG_TIP_TIT) || ' ' || STRIP(t7.CD_CLS_TIP_TIT) AS SIGLA,
+            CAST(t5.QUANTIDADE AS BIGINT) AS QTD
+        FROM ({posicao.sql()}) t5
+            LEFT JOIN DB2MCI.CLIENTE t6
+                ON t6.COD = t5.CD_CLI_ACNT
+            LEFT JOIN DB2AEB.TIP_TIT t7
+                ON t7.CD_TIP_TIT = t5.CD_TIP_TIT
+            LEFT JOIN DB2AEB.VCL_ACNT_BLS t8
+                ON t8.CD_CLI_ACNT = t5.CD_CLI_ACNT
+        WHERE
+            t5.CD_CLI_ACNT NOT IN (:mci, 205007939) AND
+            t5.QUANTIDADE <> 0
+    ) t9
+    GROUP BY
+        t9.CPF_CNPJ,
+        t9.SIGLA
+    ORDER BY
+        QTD DESC,
+        t9.CPF_CNPJ,
+        t9.SIGLA
+    FETCH FIRST :quantidade ROWS ONLY
+"""
+
+
+def load_base(mci: int, data: date) -> tuple[pd.DataFrame, list[str]]:
+    load: pd.DataFrame = retratos.colunas(
+        retratos.posicoes(mci, data), "mci", "data", "cod_titulo", "sigla", "quantidade", "custodiante",
+        schema=dict(
+            mci="id",
+            data="data",
+            cod_titulo="id",
+            sigla="id",
+            quantidade="quantidade",
+            custodiante="categoria",
+        ),
+    )
+    load = identidades.enriquecer(load, "investidor", "cpf_cnpj", schema=dict(investidor="texto", cpf_cnpj="texto"))
+    load = dimensoes.rotular(load, sigla="sigla")
+    load.columns = [str(columns).upper() for columns in load.columns]
+    load["COD_TITULO"] = load["COD_TITULO"].astype(str)
+    load = load[~load["MCI"].isin(EXCLUIDOS_BASE) & load["QUANTIDADE"].ne(0)]
+    load.reset_index(drop=True, inplace=True)
+
+    return pivotar_base(load)
+
+
+def pivotar_base(load: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]:
+    # layout largo numa passada só: cada linha soma na sua célula (título, BB/B3, investidor) de uma matriz;
+    # investidores e títulos na ordem em que aparecem, e cada título com as colunas BB_, B3_ e TOTAL_
+    contas, mcis = pd.factorize(load["MCI"])
+    titulos, codigos = pd.factorize(load["COD_TITULO"])
+
+    escritural: np.ndarray = load["CUSTODIANTE"].eq("ESCRITURAL").to_numpy(dtype=bool, na_value=False)
+    custodia: np.ndarray = load["CUSTODIANTE"].eq("CUSTÓDIA").to_numpy(dtype=bool, na_value=False)
+    validas: np.ndarray = escritural | custodia
+    quantidades: np.ndarray = load["QUANTIDADE"].to_numpy()
+
+    matriz: np.ndarray = np.zeros((len(codigos), 3, len(mcis)), dtype=quantidades.dtype)
+    np.add.at(matriz, (titulos[validas], custodia[validas].astype(int), contas[validas]), quantidades[validas])
+    matriz[:, 2] = matriz[:, 0] + matriz[:, 1]
+
+    rotulos: pd.DataFrame = load[["SIGLA", "COD_TITULO"]].drop_duplicates(subset=["COD_TITULO"])
+    lista_tit: list[str] = [f"{sigla} {codigo}" for sigla, codigo in rotulos.itertuples(index=False)]
+
+    dfixo: pd.DataFrame = load[["MCI", "INVESTIDOR", "CPF_CNPJ"]].drop_duplicates(subset=["MCI"]).fillna(0)
+    dfixo.reset_index(drop=True, inplace=True)
+
+    # as colunas saem da matriz direto para o Arrow, sem cópia, no mesmo tipo da QUANTIDADE
+    largas: pd.DataFrame = pa.table({
+        f"{lado}_{tit}": pa.array(matriz[posicao, coluna], type=tipos.TIPOS["quantidade"])
+        for posicao, tit in enumerate(lista_tit)
+        for coluna, lado in enumerate(["BB", "B3", "TOTAL"])
+    }).to_pandas(types_mapper=pd.ArrowDtype)
+
+    return pd.concat([dfixo, largas], axis=1), lista_tit
+
+
+def load_maiores(mci: int, data: date) -> pd.DataFrame:
+    load: pd.DataFrame = retratos.posicoes(mci, data)
+    load = retratos.colunas(load[~load["cd_cli_acnt"].isin([mci, 205007939])], "mci", "cod_titulo", "sigla", "qtd",
+                            "custodiante")
+
+    # CPF_CNPJ sempre com 14 dígitos, PF inclusive (pf_11="nenhum"): o LPAD(..., 14, '0') da página e do SQL_MAIORES
+    load = identidades.enriquecer(load, "investidor", "cpf_cnpj", pf_11="nenhum")
+
+    return dimensoes.rotular(load, sigla="sigla_classe").rename(
+        columns={"investidor": "INVESTIDOR", "cpf_cnpj": "CPF_CNPJ", "sigla": "SIGLA", "qtd": "QTD"}
+    )
+
+
+def ranking_maiores(base: pd.DataFrame, quantidade: int) -> pd.DataFrame:
+    # soma as contas de cada CPF/CNPJ (e sigla, quando a empresa tem mais de uma) e fica com os maiores
+    base = base[base["QTD"].ne(0)]
+
+    base = base.drop(["mci", "cod_titulo", "custodiante"], axis=1)
+
+    if len(base["SIGLA"].unique()) == 1:
+        base.pop("SIGLA")
+        base = base.groupby("CPF_CNPJ").agg({"INVESTIDOR": "first", "CPF_CNPJ": "first", "QTD": "sum"})
+
+    else:
+        base = base.groupby(["CPF_CNPJ", "SIGLA"]).agg({"INVESTIDOR": "first", "CPF_CNPJ": "first",
+                                                        "SIGLA": "first", "QTD": "sum"})
+
+    return base.iloc[_primeiros(base["QTD"].to_numpy(), quantidade)].reset_index(drop=True)
+
+
+def _primeiros(valores: np.ndarray, quantidade: int) -> np.ndarray:
+    # seleção parcial: o partition acha o corte em O(n) e só as linhas a partir dele são ordenadas, não a base
+    # inteira; empates ficam na ordem do groupby (CPF/CNPJ), como no ORDER BY do SQL_MAIORES
+    candidatas: np.ndarray = np.arange(len(valores))
+
+    if quantidade < len(valores):
+        corte = np.partition(valores, len(valores) - quantidade)[len(valores) - quantidade]
+        candidatas = np.flatnonzero(valores >= corte)
+
+    return candidatas[np.lexsort((candidatas, -valores[candidatas]))][:quantidade]
+
+
+def load_ranking(mci: int, data: date, quantidade: int) -> pd.DataFrame:
+    load: pd.DataFrame = db.query(
+        sql=SQL_MAIORES, params=posicao.params(mci, retratos.INICIO, data, quantidade=quantidade),
+        schema=dict(investidor="texto", cpf_cnpj="texto", sigla="categoria", qtd="quantidade"),
+        classe="posicao",
+    )
+
+    # uma sigla só no emissor: o ranking sai sem a coluna, como no groupby só por CPF/CNPJ
+    uma: bool = load.empty or load["sigla_min"].iloc[0] == load["sigla_max"].iloc[0]
+    load = load.drop(columns=["sigla_min", "sigla_max", *(["sigla"] if uma else [])])
+
+    return load.rename(columns={"investidor": "INVESTIDOR", "cpf_cnpj": "CPF_CNPJ", "sigla": "SIGLA", "qtd": "QTD"})
+
+
+def maiores(mci: int, data: date, quantidade: int) -> pd.DataFrame:
+    # com as vigências do emissor gravadas o ranking sai da base local; sem elas, em vez de carregar a história
+    # inteira do emissor só para a declaração, o DB2 soma as posições e devolve só os maiores
+    if retratos.get_retratos().ler(mci) is None:
+        return load_ranking(mci, data, quantidade)
+
+    return ranking_maiores(load_maiores(mci, data), quantidade)
+
+
+def load_cvm160(mci: int, data: date) -> pd.DataFrame:
+    load: pd.DataFrame = retratos.posicoes(mci, data)
+    load = retratos.colunas(load[load["cd_cli_cstd"].eq(retratos.ESCRITURAL)], "mci", "data", "cod_titulo",
+                            "quantidade")
+    load.insert(0, "tipo", 1)
+
+    # PSS (F/J/E) e CPF/CNPJ saem do cadastro em cache; a ordem (CPF/CNPJ, data desc) é a que o ORDER BY dava
+    load = identidades.enriquecer(load, "pss", "documento").rename(columns={"documento": "cpf_cnpj"})
+
+    return load.sort_values(
+        ["cpf_cnpj", "data"], ascending=[True, False], na_position="last", kind="stable", ignore_index=True
+    )
+
+
+def txt_cvm160(base: pd.DataFrame) -> dict[int, str]:
+    # conteúdo do TXT de cada tipo de título: uma linha por CPF/CNPJ e o trailer com a contagem e a soma
+    # um CPF/CNPJ pode ter mais de uma conta: fica a posição mais recente (o SQL ordena por data desc)
+    base = base.drop_duplicates(["cpf_cnpj", "cod_titulo"])
+    base = base[base["cpf_cnpj"].ne(CNPJ_CVM160) & base["cpf_cnpj"].gt(0) & base["quantidade"].ne(0)]
+
+    # o LEFT JOIN deixa a coluna em float quando falta cadastro; sem os nulos ela volta a ser inteira
+    base = base.astype({"cpf_cnpj": "int64", "quantidade": "int64"})
+    base = base.drop(["mci", "data"], axis=1)
+
+    arquivos: dict[int, str] = {}
+
+    for row in base["cod_titulo"].unique():
+        pega: pd.DataFrame = base[base["cod_titulo"].eq(row)]
+
+        linhas = pega[["tipo", "pss", "cpf_cnpj", "quantidade"]].itertuples(index=False)
+
+        listar: list[str] = [f"{tipo}{pss}{cpf_cnpj:0>19}{quantidade:0>17}            "
+                             for tipo, pss, cpf_cnpj, quantidade in linhas]
+        listar.append(f"9 {len(pega) + 1:0>19}{pega['quantidade'].sum():0>17}            ")
+
+        arquivos[int(row)] = "\n".join(listar)
+
+    return arquivos
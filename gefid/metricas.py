@@ -0,0 +1,296 @@
+import fcntl
+import json
+import logging
+import os
+import re
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from gefid import telemetria
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# consultas a partir deste tempo, em segundos, vão para o log de consultas lentas
+LENTA: float = 5.0
+
+# log de consultas lentas, uma linha JSON por consulta; passando do tamanho, roda mantendo os arquivos anteriores
+LOG_LENTAS: Path = Path(__file__).resolve().parent.parent / "logs" / "consultas-lentas.jsonl"
+LOG_TAMANHO: int = 10 * 1024 ** 2
+LOG_ARQUIVOS: int = 5
+
+# valores guardados de cada parâmetro em lista (IN :chaves pode ter milhares)
+LOG_VALORES: int = 20
+
+
+@dataclass(frozen=True)
+class Consulta:
+    pagina: str
+    funcao: str
+    inicio: float
+    tempo_total: float
+    tempo_db2: float
+    linhas: int
+    bytes: int
+
+
+_lock: threading.Lock = threading.Lock()
+
+# últimas consultas executadas no processo, para diagnóstico
+_historico: deque[Consulta] = deque(maxlen=5000)
+
+# acumulado por (página, função) desde o início do processo
+_acumulado: dict[tuple[str, str], dict[str, float]] = {}
+
+# consultas que aguardaram uma execução idêntica já em andamento, em vez de irem ao DB2
+_coalescencia: dict[str, float] = dict(coalescidas=0, aguardando=0, tempo_espera=0.0)
+
+# fila e cancelamentos por classe de consulta (db.CLASSES)
+_admissao: dict[str, dict[str, float]] = {}
+
+# comandos enviados ao DB2: reaproveitados = texto já compilado (cache de comandos do SQLAlchemy);
+# textos distintos são as variantes que o driver e o cache de pacotes do DB2 precisam guardar
+_comandos: dict[str, float] = dict(execucoes=0, reaproveitados=0)
+_textos: set[int] = set()
+
+# leituras do cache (gefid.cache) por nível: memória do processo ou disco compartilhado da máquina
+_cache: dict[str, dict[str, int]] = {}
+
+
+def _total(pagina: str, funcao: str) -> dict[str, float]:
+    return _acumulado.setdefault(
+        (pagina, funcao),
+        dict(consultas=0, tempo_total=0.0, tempo_db2=0.0, linhas=0, bytes=0, maior_tempo=0.0, coalescidas=0,
+             tempo_espera=0.0),
+    )
+
+
+def registrar(consulta: Consulta) -> None:
+    with _lock:
+        _historico.append(consulta)
+
+        total = _total(consulta.pagina, consulta.funcao)
+        total["consultas"] += 1
+        total["tempo_total"] += consulta.tempo_total
+        total["tempo_db2"] += consulta.tempo_db2
+        total["linhas"] += consulta.linhas
+        total["bytes"] += consulta.bytes
+        total["maior_tempo"] = max(total["maior_tempo"], consulta.tempo_total)
+
+    telemetria.CONSULTA_SEGUNDOS.observar(consulta.tempo_total, pagina=consulta.pagina, funcao=consulta.funcao)
+    telemetria.CONSULTA_DB2_SEGUNDOS.observar(consulta.tempo_db2, pagina=consulta.pagina, funcao=consulta.funcao)
+    telemetria.CONSULTA_LINHAS.somar(consulta.linhas, pagina=consulta.pagina, funcao=consulta.funcao)
+
+
+def iniciar_espera() -> None:
+    with _lock:
+        _coalescencia["aguardando"] += 1
+
+
+def registrar_espera(pagina: str, funcao: str, tempo_espera: float) -> None:
+    with _lock:
+        _coalescencia["aguardando"] -= 1
+        _coalescencia["coalescidas"] += 1
+        _coalescencia["tempo_espera"] += tempo_espera
+
+        total = _total(pagina, funcao)
+        total["coalescidas"] += 1
+        total["tempo_espera"] += tempo_espera
+
+    telemetria.CONSULTA_COALESCIDAS.somar(pagina=pagina, funcao=funcao)
+
+
+def _classe(classe: str) -> dict[str, float]:
+    return _admissao.setdefault(
+        classe, dict(na_fila=0, admitidas=0, tempo_fila=0.0, maior_fila=0.0, tempo=0, sessao=0, fila=0)
+    )
+
+
+def iniciar_fila(classe: str) -> None:
+    with _lock:
+        _classe(classe)["na_fila"] += 1
+
+
+def registrar_fila(classe: str, tempo_fila: float, admitida: bool) -> None:
+    with _lock:
+        total = _classe(classe)
+        total["na_fila"] -= 1
+        total["admitidas"] += admitida
+        total["tempo_fila"] += tempo_fila
+        total["maior_fila"] = max(total["maior_fila"], tempo_fila)
+
+    telemetria.FILA_SEGUNDOS.observar(tempo_fila, classe=classe)
+
+
+def registrar_cancelamento(classe: str, motivo: str) -> None:
+    # motivo: tempo (passou do limite), sessao (página fechada/trocada ou cancelada) ou fila (não foi admitida)
+    with _lock:
+        _classe(classe)[motivo] += 1
+
+    telemetria.CONSULTA_CANCELADAS.somar(classe=classe, motivo=motivo)
+
+
+def admissao() -> pd.DataFrame:
+    with _lock:
+        return pd.DataFrame([dict(classe=classe, **total) for classe, total in _admissao.items()])
+
+
+def registrar_comando(sql: str, reaproveitado: bool) -> None:
+    with _lock:
+        _comandos["execucoes"] += 1
+        _comandos["reaproveitados"] += reaproveitado
+        _textos.add(hash(sql))
+
+
+def comandos() -> dict[str, float]:
+    with _lock:
+        return dict(
+            **_comandos,
+            distintos=len(_textos),
+            taxa_acerto=_comandos["reaproveitados"] / _comandos["execucoes"] if _comandos["execucoes"] else 0.0,
+        )
+
+
+def registrar_cache(nivel: str, acerto: bool) -> None:
+    with _lock:
+        total = _cache.setdefault(nivel, dict(acertos=0, falhas=0))
+        total["acertos" if acerto else "falhas"] += 1
+
+    telemetria.CACHE.somar(nivel=nivel, resultado="acerto" if acerto else "falha")
+
+
+def cache() -> pd.DataFrame:
+    with _lock:
+        return pd.DataFrame([dict(nivel=nivel, **total) for nivel, total in _cache.items()])
+
+
+def _parametro(valor: Any) -> Any:
+    if isinstance(valor, (list, tuple, set)):
+        valores: list = list(valor)
+
+        return valores[:LOG_VALORES] + ([f"... +{len(valores) - LOG_VALORES}"] if len(valores) > LOG_VALORES else [])
+
+    return valor
+
+
+def _dicas(sql: str, consulta: Consulta) -> list[str]:
+    # pistas do que olhar no plano, tiradas do texto do comando e de onde o tempo foi gasto
+    dicas: list[str] = []
+
+    if consulta.tempo_db2 < consulta.tempo_total / 2:
+        dicas.append("mais da metade do tempo fora do DB2: fila da classe, montagem do DataFrame ou consumo das partes")
+
+    if re.search(r"\b(YEAR|MONTH)\s*\(", sql, re.IGNORECASE):
+        dicas.append("YEAR()/MONTH() na coluna de data impede o uso do índice: filtrar com db.Periodo")
+
+    if re.search(r"LIKE\s+'%", sql, re.IGNORECASE):
+        dicas.append("LIKE começando com % varre a tabela inteira")
+
+    if re.search(r"SELECT\s+(DISTINCT\s+)?\*", sql, re.IGNORECASE):
+        dicas.append("SELECT * traz colunas que a página pode não usar")
+
+    if consulta.linhas >= 100_000:
+        dicas.append("muitas linhas: agregar ou filtrar no DB2, ou ler em partes com db.stream")
+
+    return dicas
+
+
+def _rodar_lentas() -> None:
+    for numero in range(LOG_ARQUIVOS - 1, 0, -1):
+        anterior: Path = LOG_LENTAS.with_suffix(f".{numero}.jsonl")
+
+        if anterior.exists():
+            os.replace(anterior, LOG_LENTAS.with_suffix(f".{numero + 1}.jsonl"))
+
+    os.replace(LOG_LENTAS, LOG_LENTAS.with_suffix(".1.jsonl"))
+
+
+def _gravar_lenta(linha: str) -> None:
+    # os processos do servidor na máquina escrevem no mesmo arquivo: a trava evita linhas misturadas
+    # e dois processos rodando o log ao mesmo tempo
+    LOG_LENTAS.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(LOG_LENTAS.with_suffix(".trava"), "a") as trava:
+        fcntl.flock(trava, fcntl.LOCK_EX)
+
+        try:
+            if LOG_LENTAS.exists() and LOG_LENTAS.stat().st_size >= LOG_TAMANHO:
+                _rodar_lentas()
+
+            with open(LOG_LENTAS, "a", encoding="utf-8") as log:
+                log.write(linha)
+
+        finally:
+            fcntl.flock(trava, fcntl.LOCK_UN)
+
+
+def registrar_lenta(consulta: Consulta, classe: str, sql: str, params: dict[str, Any] | None,
+                    situacao: str = "concluida") -> None:
+    # situacao: concluida, ou o motivo do cancelamento (tempo, sessao, fila)
+    if consulta.tempo_total < LENTA:
+        return
+
+    registro: dict[str, Any] = dict(
+        momento=datetime.fromtimestamp(consulta.inicio).isoformat(timespec="milliseconds"),
+        pagina=consulta.pagina,
+        funcao=consulta.funcao,
+        classe=classe,
+        situacao=situacao,
+        tempo_total=round(consulta.tempo_total, 3),
+        tempo_db2=round(consulta.tempo_db2, 3),
+        linhas=consulta.linhas,
+        bytes=consulta.bytes,
+        sql=" ".join(sql.split()),
+        params={nome: _parametro(valor) for nome, valor in (params or {}).items()},
+        dicas=_dicas(sql, consulta),
+    )
+
+    try:
+        _gravar_lenta(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+
+    except OSError:
+        logger.exception("Falha ao gravar o log de consultas lentas")
+
+
+def lentas() -> pd.DataFrame:
+    # log atual e os rodados, da consulta mais recente para a mais antiga
+    arquivos: list[Path] = [LOG_LENTAS, *(LOG_LENTAS.with_suffix(f".{numero}.jsonl")
+                                         for numero in range(1, LOG_ARQUIVOS + 1))]
+    registros: list[dict[str, Any]] = []
+
+    for arquivo in arquivos:
+        if arquivo.exists():
+            with open(arquivo, encoding="utf-8") as log:
+                registros.extend(json.loads(linha) for linha in log if linha.strip())
+
+    if not registros:
+        return pd.DataFrame()
+
+    return pd.DataFrame(registros).sort_values("momento", ascending=False, kind="stable", ignore_index=True)
+
+
+def coalescencia() -> dict[str, float]:
+    with _lock:
+        return dict(_coalescencia)
+
+
+def historico() -> pd.DataFrame:
+    with _lock:
+        return pd.DataFrame([asdict(consulta) for consulta in _historico])
+
+
+def resumo() -> pd.DataFrame:
+    with _lock:
+        df = pd.DataFrame(
+            [dict(pagina=pagina, funcao=funcao, **total) for (pagina, funcao), total in _acumulado.items()]
+        )
+
+    if df.empty:
+        return df
+
+    return df.sort_values("tempo_total", ascending=False, ignore_index=True)
@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+from typing import Any
+
+from gefid.db import Periodo
+
+
+def movimentos(filtro: str = "") -> str:
+    # todas as observações de posição na janela de datas, sem resolver a mais recente: os movimentos do dia
+    # (MVTC_DIAR_PSC, QT_TIT_ATU já é a posição depois do movimento) e a posição mensal (PSC_TIT_MVTD)
+    filtro = f" AND\n            {filtro}" if filtro else ""
+
+    return f"""
+        SELECT
+            t1.CD_CLI_EMT,
+            t1.CD_TIP_TIT,
+            t1.CD_CLI_ACNT,
+            t1.CD_CLI_CSTD,
+            t1.DT_MVTC AS DATA,
+            t1.QT_TIT_ATU AS QUANTIDADE
+        FROM
+            DB2AEB.MVTC_DIAR_PSC t1
+        WHERE
+            t1.CD_CLI_EMT = :mci AND
+            {Periodo.sql("t1.DT_MVTC", "posicao")}{filtro}
+        UNION ALL
+        SELECT
+            t1.CD_CLI_EMT,
+            t1.CD_TIP_TIT,
+            t1.CD_CLI_ACNT,
+            t1.CD_CLI_CSTD,
+            t1.DT_PSC - 1 DAY AS DATA,
+            t1.QT_TIT_INC_MM AS QUANTIDADE
+        FROM
+            DB2AEB.PSC_TIT_MVTD t1
+        WHERE
+            t1.CD_CLI_EMT = :mci AND
+            {Periodo.sql("t1.DT_PSC", "posicao_psc")}{filtro}
+    """
+
+
+def sql(filtro: str = "", particao: str = "CD_CLI_ACNT, CD_TIP_TIT, CD_CLI_CSTD") -> str:
+    # posição mais recente de cada conta/título/custodiante na janela de datas, já resolvida no DB2:
+    # substitui o apply + groupby("pk").first() das páginas e traz uma linha por posição, não por dia
+    return f"""
+        SELECT
+            CD_CLI_EMT,
+            CD_TIP_TIT,
+            CD_CLI_ACNT,
+            CD_CLI_CSTD,
+            DATA,
+            QUANTIDADE
+        FROM (
+            SELECT
+                t0.*,
+                ROW_NUMBER() OVER (PARTITION BY {particao} ORDER BY DATA DESC) AS ORDEM
+            FROM ({movimentos(filtro)}) t0
+        ) t0
+        WHERE
+            ORDEM = 1
+    """
+
+
+def params(mci: int, data_ant: date, data: date, **extras: Any) -> dict[str, Any]:
+    # a data da PSC_TIT_MVTD é DT_PSC - 1 DAY, então o intervalo dela anda um dia para frente
+    periodo: Periodo = Periodo.entre(data_ant, data)
+    psc: Periodo = Periodo(periodo.inicio + timedelta(days=1), periodo.fim + timedelta(days=1))
+
+    return dict(mci=mci, **periodo.params("posicao"), **psc.params("posicao_psc"), **extras)
@@ -0,0 +1,240 @@
+import numpy as np
+import pandas as pd
+
+from gefid import db
+
+# classes de direito somadas como dividendos e como JCP na circular 3624
+CLASSES_DIVIDENDOS: list[int] = [1, 14]
+CLASSES_JCP: list[int] = [5, 10]
+
+# leiaute do arquivo AEBF543A (cálculo de rendimentos)
+COLSPECS_543: list[tuple[int, int]] = [
+    (29, 33), (34, 38), (43, 53), (54, 58), (117, 121), (123, 144), (145, 154), (155, 173), (174, 214), (220, 240),
+    (241, 245), (246, 250), (251, 253), (254, 260), (268, 274), (282, 301), (302, 322), (323, 341), (378, 400),
+    (401, 423),
+]
+NAMES_543: list[str] = [
+    "cod_emissor", "tipo_delib", "data_delib", "direito", "ativo", "valor_por_ativo", "mci_investidor",
+    "cpfcnpj_investidor", "nome_investidor", "forma_pagamento", "pais_bb", "pais_b3", "tipo_pessoa", "faixa_ir_bb",
+    "faixa_ir_b3", "qtd_ativos", "vlr_bruto_bb", "vlr_ir_bb", "vlr_bruto_b3", "vlr_ir_b3",
+]
+
+# linhas do resumo do 543, na ordem da planilha, com as formas de pagamento somadas em cada uma
+RESUMO_543: dict[str, list[str]] = {
+    "CAIXA": ["CAIXA"],
+    "CONTA-CORRENTE BB": ["CONTA-CORRENTE BB"],
+    "EMPRESA": ["EMPRESA"],
+    "POUPANÇA OURO BB": ["POUPANCA OURO BB"],
+    "CRED TESOURO NACIONAL": ["CRED TESOURO NAC"],
+    "STR/SISPAG": ["STR/SISPAG"],
+    "DOC/TED": ["DOC/TED CUSTO INVEST", "DOC/TED CUSTO EMPRES"],
+    "DEPÓSITO JUDICIAL": ["DEPOSITO JUDICIAL EF"],
+}
+VALORES_543: list[str] = ["vlr_bruto_final", "vlr_ir_final", "vlr_liquido_final"]
+
+# leiaute do arquivo 064B de rendimentos pagos (DIPJ)
+COLSPECS_DIPJ: list[tuple[int, int]] = [
+    (0, 4), (4, 6), (6, 15), (15, 18), (18, 19), (19, 59), (59, 76), (76, 93), (93, 110), (110, 133),
+]
+NAMES_DIPJ: list[str] = [
+    "Ano Ref", "Mês Ref", "MCI Emissor", "País", "Tipo Pessoa", "Tipo Direito", "Vlr Bruto", "Vlr IR", "Vlr Líquido",
+    "Controle",
+]
+
+
+def load_circular_3624(year: int, month: int) -> pd.DataFrame:
+    return db.query(
+        sql=f"""
+            SELECT
+                t2.CD_CLSC_TIP_DRT,
+                t1.DT_DLBC,
+                YEAR(t1.DT_DLBC) AS ANO_DELIB,
+                t1.VL_MVT_REN,
+                t1.VL_IR_CLCD_MVT_REN,
+                t1.VL_MVT_REN - t1.VL_IR_CLCD_MVT_REN AS LIQUIDO_PRINCIPAL,
+                t1.VL_CORR_MVT_REN,
+                t1.VL_IR_CORR_MVT_REN,
+                t1.VL_IR_CORR_MVT_REN - t1.VL_IR_CORR_MVT_REN AS LIQUIDO_CORR
+            FROM
+                DB2AEB.MVT_REN t1
+                    INNER JOIN DB2AEB.TIP_DRT t2
+                        ON t2.CD_TIP_DRT = t1.CD_TIP_DRT
+            WHERE
+                t1.CD_TIP_DRT IN (9) AND
+                {db.Periodo.sql("t1.DT_MVT_DRT")} AND
+                t1.CD_CLI_DLBC IN (903485186) AND
+                t2.CD_CLSC_TIP_DRT IN (1, 5, 10, 14)
+            ORDER BY
+                t1.DT_DLBC DESC,
+                t1.CD_TIP_DRT
+        """,
+        params=db.Periodo.mes(year, month).params(),
+        classe="mvt_ren",
+    )
+
+
+def resumo_circular_3624(load: pd.DataFrame, year: int) -> pd.DataFrame:
+    # bruto, IR e líquido de dividendos e de JCP (principal + atualização) por ano de deliberação
+    linhas: list[str] = [str(year), str(year - 1), f"Anteriores a {year - 1}"]
+    ano: np.ndarray = np.select([load["ano_delib"].eq(year), load["ano_delib"].eq(year - 1)], linhas[:2], linhas[2])
+
+    dividendos: pd.Series = load["cd_clsc_tip_drt"].isin(CLASSES_DIVIDENDOS)
+    jcp: pd.Series = load["cd_clsc_tip_drt"].isin(CLASSES_JCP)
+
+    def somar(classes: pd.Series, coluna: str) -> pd.Series:
+        return load[coluna].astype(float).where(classes, 0).groupby(ano).sum().reindex(linhas, fill_value=0)
+
+    # a atualização somada no JCP é a dos dividendos, como sempre foi na planilha enviada à COGER
+    return pd.DataFrame(dict(
+        bruto_div=somar(dividendos, "vl_mvt_ren") + somar(dividendos, "vl_corr_mvt_ren"),
+        ir_div=somar(dividendos, "vl_ir_clcd_mvt_ren") + somar(dividendos, "vl_ir_corr_mvt_ren"),
+        liquido_div=somar(dividendos, "liquido_principal") + somar(dividendos, "liquido_corr"),
+        bruto_jcp=somar(jcp, "vl_mvt_ren") + somar(dividendos, "vl_corr_mvt_ren"),
+        ir_jcp=somar(jcp, "vl_ir_clcd_mvt_ren") + somar(dividendos, "vl_ir_corr_mvt_ren"),
+        liquido_jcp=somar(jcp, "liquido_principal") + somar(dividendos, "liquido_corr"),
+    ))
+
+
+# função para retirar pontos e vírgulas dos números para poder trabalhar como float
+def _replace_comma_and_dot(_x: str) -> str:
+    return _x.replace(".", "").replace(",", "")
+
+
+# função para substituir vírgula por ponto para poder trabalhar como float
+def _replace_comma_for_dot(_x: str) -> str:
+    return _x.replace(",", ".")
+
+
+# função para eliminar vírgulas, traços e barras co CPF/CNPJ
+def _replace_comma_for_nothing(_x: str) -> str:
+    for char in [".", ",", "-", "/"]:
+        _x = _x.replace(char, "")
+    return _x
+
+
+def ler_543(arquivos: list[str]) -> pd.DataFrame:
+    li: list = []
+
+    # iterando a leitura do Pandas em todos os arquivos da pasta
+    for filename in arquivos:
+        df: pd.DataFrame = pd.read_fwf(
+            filepath_or_buffer=filename,
+            colspecs=COLSPECS_543,
+            names=NAMES_543,
+            converters={
+                "cpfcnpj_investidor": _replace_comma_for_nothing, "valor_por_ativo": _replace_comma_for_dot,
+                "faixa_ir_bb": _replace_comma_for_dot, "faixa_ir_b3": _replace_comma_for_dot,
+                "qtd_ativos": _replace_comma_and_dot, "vlr_bruto_bb": _replace_comma_and_dot,
+                "vlr_ir_bb": _replace_comma_and_dot, "vlr_bruto_b3": _replace_comma_and_dot,
+                "vlr_ir_b3": _replace_comma_and_dot
+            },
+            encoding="iso-8859-1"
+        )
+        li.append(df)
+
+    df = pd.concat(li, axis=0, ignore_index=True, verify_integrity=True)
+
+    return df.astype(dict(
+        cpfcnpj_investidor=float,
+        qtd_ativos=int,
+        valor_por_ativo=float,
+        faixa_ir_bb=float,
+        faixa_ir_b3=float,
+        vlr_bruto_bb=float,
+        vlr_ir_bb=float,
+        vlr_bruto_b3=float,
+        vlr_ir_b3=float,
+    ))
+
+
+def calcular_543(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+
+    # pegando o país, faixa e valores da bolsa para pagamento em bolsa e pais,
+    # faixa e valores do BB para os demais tipos de pagamento
+    bolsa: pd.Series = df["forma_pagamento"] == "STR/SISPAG"
+
+    # as colunas finais nascem já com os valores (em branco e preenchidas por partes, o pandas 3 as tipava como texto)
+    df.insert(12, "pais_final", df["pais_b3"].where(bolsa, df["pais_bb"]))
+    df.insert(16, "faixa_ir_final", df["faixa_ir_b3"].where(bolsa, df["faixa_ir_bb"]))
+    df.insert(22, "vlr_bruto_final", df["vlr_bruto_b3"].where(bolsa, df["vlr_bruto_bb"]))
+    df.insert(23, "vlr_ir_final", df["vlr_ir_b3"].where(bolsa, df["vlr_ir_bb"]))
+
+    # criando a coluna de valor líquido final
+    df["vlr_liquido_final"] = df["vlr_bruto_final"] - df["vlr_ir_final"]
+
+    # apagando as colunas desnecessárias
+    df.drop(["cod_emissor", "tipo_delib", "data_delib", "pais_bb", "pais_b3", "faixa_ir_bb",
+             "faixa_ir_b3", "vlr_bruto_bb", "vlr_bruto_b3", "vlr_ir_bb", "vlr_ir_b3"], axis=1, inplace=True)
+
+    df["vlr_bruto_final"] = df["vlr_bruto_final"] / 100
+    df["vlr_ir_final"] = df["vlr_ir_final"] / 100
+    df["vlr_liquido_final"] = df["vlr_liquido_final"] / 100
+
+    return df
+
+
+def totais_543(df: pd.DataFrame) -> pd.DataFrame:
+    # bruto, IR e líquido de cada linha do resumo; cada forma de pagamento é arredondada antes de somar
+    somas: pd.DataFrame = df.groupby("forma_pagamento")[VALORES_543].sum().astype(float).round(2)
+
+    return pd.DataFrame(
+        [somas.reindex(formas, fill_value=0).sum() for formas in RESUMO_543.values()],
+        index=list(RESUMO_543),
+    )
+
+
+def ir_pais_543(df: pd.DataFrame) -> tuple[float, float]:
+    # IR de investidores domésticos (país 105) e estrangeiros, que vai no resumo dos fundos
+    domestico: pd.Series = df["pais_final"] == 105
+
+    return (round(float(df.loc[domestico, "vlr_ir_final"].sum()), 2),
+            round(float(df.loc[~domestico, "vlr_ir_final"].sum()), 2))
+
+
+def ler_dipj(arquivos: list[str], mci_emissor: int) -> tuple[pd.DataFrame, str]:
+    li = []
+
+    # criando dict para modelar o dataframe com os 12 meses
+    mod: dict[str, list[int | str]] = {
+        "Ano Ref": ["9999"] * 12,
+        "MCI Emissor": ["999999999"] * 12,
+        "País": ["BRA"] * 12,
+        "Tipo Pessoa": ["99"] * 12,
+        "Mês Ref": list(range(1, 13)),
+        "Tipo Direito": ["DIVIDENDOS"] * 12,
+        "Vlr Bruto": [1] * 12,
+        "Vlr IR": [1] * 12,
+        "Vlr Líquido": [1] * 12,
+    }
+
+    li.append(pd.DataFrame.from_dict(mod))
+
+    ano: str = ""
+
+    for filename in arquivos:
+        df: pd.DataFrame = pd.read_fwf(filepath_or_buffer=filename, colspecs=COLSPECS_DIPJ, names=NAMES_DIPJ,
+                                       encoding="latin")
+
+        # guardando a informação do ano do último arquivo lido
+        ano = str(df.iat[0, 0])
+        dfs = df[pd.isnull(df["Controle"]) & df["Mês Ref"].ne(99) & df["MCI Emissor"].eq(mci_emissor)]
+
+        li.append(dfs)
+
+    return pd.concat(li, axis=0, ignore_index=True, verify_integrity=True), ano
+
+
+def pivot_dipj(dfs: pd.DataFrame) -> pd.DataFrame:
+    table = pd.pivot_table(dfs, values=["Vlr Bruto", "Vlr IR", "Vlr Líquido"],
+                           index=["País", "Tipo Pessoa", "Tipo Direito"],
+                           columns=["Mês Ref"], sort=False)
+
+    # substitui nan por zeros
+    table = table.fillna(0)
+
+    # resetando os index para eliminar a hierarquia
+    table = table.reset_index()
+
+    # eliminando a primeira linha que foi criada só para gerar o modelo com os 12 meses
+    return table.drop(labels=0, axis=0)
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterator
+from typing import Any, TypeVar
+
+import pandas as pd
+import streamlit as st
+
+from gefid import db
+
+T = TypeVar("T")
+
+# memória máxima, por sessão, ocupada pelos resultados guardados entre os botões de uma página
+LIMITE_BYTES: int = 512 * 1024 ** 2
+
+_CHAVE_SESSAO: str = "_gefid_resultados"
+
+
+def _tamanho(valor: Any) -> int:
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+
+    if isinstance(valor, (tuple, list)):
+        return sum(_tamanho(item) for item in valor)
+
+    return 0
+
+
+def _guardados() -> OrderedDict[Hashable, tuple[Any, int]]:
+    return st.session_state.setdefault(_CHAVE_SESSAO, OrderedDict())
+
+
+def obter(pagina: str, loader: Callable[..., T], *args: Hashable) -> T:
+    # o mesmo relatório (página, consulta e parâmetros) é lido do DB2 uma vez e reaproveitado
+    # pelos botões de visualizar, CSV e Excel até o usuário pedir para atualizar
+    guardados: OrderedDict[Hashable, tuple[Any, int]] = _guardados()
+    chave: tuple[Hashable, ...] = (pagina, loader.__name__, *args)
+
+    if chave in guardados:
+        guardados.move_to_end(chave)
+        return guardados[chave][0]
+
+    valor: T = loader(*args)
+    tamanho: int = _tamanho(valor)
+
+    if tamanho > LIMITE_BYTES:
+        return valor
+
+    guardados[chave] = (valor, tamanho)
+
+    # descarta os resultados usados há mais tempo até caber no limite da sessão
+    while sum(ocupado for _, ocupado in guardados.values()) > LIMITE_BYTES:
+        guardados.popitem(last=False)
+
+    return valor
+
+
+def descartar(pagina: str | None = None) -> None:
+    guardados: OrderedDict[Hashable, tuple[Any, int]] = _guardados()
+
+    for chave in [chave for chave in guardados if pagina is None or chave[0] == pagina]:
+        del guardados[chave]
+
+
+def partes(pagina: str, loader: Callable[..., pd.DataFrame], streamer: Callable[..., Iterator[pd.DataFrame]],
+           *args: Hashable) -> Iterator[pd.DataFrame]:
+    # relatório já lido na sessão (ex.: pelo visualizar) é fatiado; se não, vem em partes direto do DB2
+    guardado: tuple[Any, int] | None = _guardados().get((pagina, loader.__name__, *args))
+
+    if guardado is None:
+        yield from streamer(*args)
+        return
+
+    yield from fatiar(guardado[0])
+
+
+def fatiar(valor: pd.DataFrame) -> Iterator[pd.DataFrame]:
+    # relatório inteiro na memória entregue às exportações nas mesmas partes do db.stream
+    for inicio in range(0, max(len(valor), 1), db.CHUNKSIZE):
+        yield valor[inicio:inicio + db.CHUNKSIZE]
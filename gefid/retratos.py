@@ -0,0 +1,475 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import streamlit as st
+
+from gefid import catalogo, db, posicao, tipos
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# vigências das posições, uma pasta por emissor (emissor=<mci>/): cada linha é a quantidade de uma
+# conta/título/custodiante de `inicio` até a véspera de `fim`, e a posição em qualquer data sai de um filtro só;
+# vigencias.parquet é a base compactada e cada atualização diária acrescenta só as vigências dos seus dias num
+# arquivo próprio (ate=<data>.parquet); cada base (DB2, base local do benchmark) tem a sua subpasta, para vigências
+# de bases diferentes não se misturarem
+PASTA: Path = Path(__file__).resolve().parent.parent / "dados" / "posicoes"
+
+# dias até o movimento de uma data estar completo no DB2 (a carga do AEB roda de madrugada); até lá os dias
+# recentes não são gravados, vêm do DB2 a cada consulta
+DEFASAGEM: int = 1
+
+# custodiante das posições escriturais (o próprio banco); os demais são custódia na B3
+ESCRITURAL: int = 903485186
+
+# primeira data lida do DB2 na carga inicial de um emissor: a história inteira
+INICIO: date = date(1900, 1, 1)
+
+# fim das vigências ainda abertas (a posição atual da conta)
+ABERTA: date = date(9999, 12, 31)
+
+# arquivos diários acumulados até a atualização juntar tudo de novo na base compactada
+COMPACTAR: int = 30
+
+# posições devolvidas às páginas: uma linha por conta/título/custodiante, com a data da última observação
+SCHEMA: dict[str, str] = dict(
+    cd_tip_tit="id", cd_cli_acnt="id", cd_cli_cstd="id", data="data", quantidade="quantidade"
+)
+
+# conta, título e custodiante: a chave de uma posição
+CHAVE: list[str] = ["cd_cli_acnt", "cd_tip_tit", "cd_cli_cstd"]
+
+VIGENCIAS: pa.Schema = pa.schema([
+    ("cd_cli_acnt", pa.int64()),
+    ("cd_tip_tit", pa.int64()),
+    ("cd_cli_cstd", pa.int64()),
+    ("inicio", pa.date32()),
+    ("fim", pa.date32()),
+    ("quantidade", pa.int64()),
+])
+
+SQL_MOVIMENTOS: str = f"""
+    SELECT
+        t5.CD_TIP_TIT,
+        t5.CD_CLI_ACNT,
+        t5.CD_CLI_CSTD,
+        t5.DATA,
+        CAST(t5.QUANTIDADE AS BIGINT) AS QUANTIDADE
+    FROM ({posicao.movimentos()}) t5
+"""
+
+# posição na data de um emissor ainda sem vigências gravadas: a mais recente de cada conta/título/custodiante na
+# história inteira, resolvida no DB2, sem as contas zeradas e na ordem de consultar; só estas linhas voltam
+SQL_POSICOES: str = f"""
+    SELECT
+        t5.CD_TIP_TIT,
+        t5.CD_CLI_ACNT,
+        t5.CD_CLI_CSTD,
+        t5.DATA,
+        CAST(t5.QUANTIDADE AS BIGINT) AS QUANTIDADE
+    FROM ({posicao.sql()}) t5
+    WHERE
+        t5.QUANTIDADE <> 0
+    ORDER BY
+        t5.CD_CLI_ACNT,
+        t5.DATA DESC,
+        t5.CD_TIP_TIT,
+        t5.CD_CLI_CSTD
+"""
+
+# totais por título e custodiante da posição mais recente na história inteira até a data, calculados no DB2;
+# só estas linhas voltam
+SQL_TOTAIS: str = f"""
+    SELECT
+        t5.CD_TIP_TIT,
+        t5.CD_CLI_CSTD,
+        COUNT(*) AS POSICOES,
+        SUM(CAST(t5.QUANTIDADE AS BIGINT)) AS QUANTIDADE
+    FROM ({posicao.sql()}) t5
+    GROUP BY
+        t5.CD_TIP_TIT,
+        t5.CD_CLI_CSTD
+"""
+
+# uma atualização por emissor de cada vez no processo; emissores diferentes atualizam juntos
+_travas: dict[int, threading.Lock] = {}
+_travas_lock: threading.Lock = threading.Lock()
+
+
+def ultimo_fechado() -> date:
+    return date.today() - timedelta(days=DEFASAGEM + 1)
+
+
+def load_movimentos(mci: int, inicio: date, fim: date) -> Iterator[pd.DataFrame]:
+    # observações do emissor entre as datas, em partes: na carga inicial é a história inteira
+    return db.stream(sql=SQL_MOVIMENTOS, params=posicao.params(mci, inicio, fim), schema=SCHEMA, classe="posicao")
+
+
+def load_posicoes(mci: int, data: date) -> pd.DataFrame:
+    return db.query(sql=SQL_POSICOES, params=posicao.params(mci, INICIO, data), schema=SCHEMA, classe="posicao")
+
+
+def load_totais(mci: int, data: date) -> pd.DataFrame:
+    return db.query(
+        sql=SQL_TOTAIS, params=posicao.params(mci, INICIO, data),
+        schema=dict(cd_tip_tit="id", cd_cli_cstd="id", posicoes="quantidade", quantidade="quantidade"),
+        classe="posicao",
+    )
+
+
+def _observacoes(partes: Iterable[pd.DataFrame]) -> pa.Table:
+    schema: pa.Schema = pa.schema([(coluna, tipos.TIPOS[tipo]) for coluna, tipo in SCHEMA.items()])
+    tabelas: list[pa.Table] = [
+        pa.Table.from_pandas(parte[list(SCHEMA)], preserve_index=False).cast(schema) for parte in partes
+    ]
+
+    return pa.concat_tables(tabelas) if tabelas else schema.empty_table()
+
+
+def _ordenar(tabela: pa.Table) -> pa.Table:
+    # na ordem do antigo ORDER BY das páginas (conta, data desc): o filtro da consulta preserva a ordem
+    return tabela.sort_by([("cd_cli_acnt", "ascending"), ("inicio", "descending"), ("cd_tip_tit", "ascending"),
+                           ("cd_cli_cstd", "ascending")])
+
+
+def _mesma_chave(chaves: list[np.ndarray]) -> np.ndarray:
+    # posição i: a linha i + 1 é da mesma chave que a linha i
+    return np.logical_and.reduce([coluna[1:] == coluna[:-1] for coluna in chaves])
+
+
+def vigencias(observacoes: pa.Table) -> pa.Table:
+    # cada observação vale da sua data até a da próxima observação da mesma chave, ou fica aberta; duas na mesma
+    # chave e dia (movimento e posição mensal) ficam com a última, o ROW_NUMBER também escolhia uma delas
+    if not observacoes.num_rows:
+        return VIGENCIAS.empty_table()
+
+    ordenadas: pa.Table = observacoes.sort_by([(coluna, "ascending") for coluna in CHAVE] + [("data", "ascending")])
+    chaves: list[np.ndarray] = [ordenadas.column(coluna).to_numpy() for coluna in CHAVE]
+    dias: np.ndarray = pc.cast(ordenadas.column("data"), pa.int32()).to_numpy()
+
+    manter: np.ndarray = np.append(~(_mesma_chave(chaves) & (dias[1:] == dias[:-1])), True)
+    ordenadas = ordenadas.filter(pa.array(manter))
+    chaves = [coluna[manter] for coluna in chaves]
+    dias = dias[manter]
+
+    fim: np.ndarray = np.full(len(dias), (ABERTA - date(1970, 1, 1)).days, dtype=np.int32)
+    fim[:-1] = np.where(_mesma_chave(chaves), dias[1:], fim[:-1])
+
+    return pa.table(
+        [*(pa.array(coluna, type=pa.int64()) for coluna in chaves), ordenadas.column("data"),
+         pa.array(fim).cast(pa.date32()), ordenadas.column("quantidade")],
+        schema=VIGENCIAS,
+    )
+
+
+def estender(tabela: pa.Table, observacoes: pa.Table) -> pa.Table:
+    # observações posteriores a tudo o que está na tabela entram como vigências à parte, sem tocar nas gravadas:
+    # as abertas que elas substituem continuam abertas e perdem para as mais recentes em _vigentes
+    return pa.concat_tables([tabela, vigencias(observacoes)])
+
+
+def juntar(tabela: pa.Table) -> pa.Table:
+    # junta a base e os arquivos diários: refeitas como observações, cada vigência fecha na seguinte da mesma
+    # chave, como na carga da história inteira; a repetida (arquivo diário ainda não apagado) fica com uma
+    observacoes: pa.Table = tabela.select(["cd_tip_tit", "cd_cli_acnt", "cd_cli_cstd", "inicio", "quantidade"]) \
+        .rename_columns(list(SCHEMA))
+
+    return _ordenar(vigencias(observacoes))
+
+
+def _mais_recentes(tabela: pa.Table, chave: list[str]) -> pa.Table:
+    # uma linha por chave, a de início mais recente: a aberta de um arquivo antigo perde para a do mais novo
+    if not tabela.num_rows:
+        return tabela
+
+    ordenadas: pa.Table = tabela.sort_by([(coluna, "ascending") for coluna in chave] + [("inicio", "descending")])
+    chaves: list[np.ndarray] = [ordenadas.column(coluna).to_numpy() for coluna in chave]
+
+    return ordenadas.filter(pa.array(np.insert(~_mesma_chave(chaves), 0, True)))
+
+
+def _vigentes(tabela: pa.Table, data: date) -> pa.Table:
+    dia: pa.Scalar = pa.scalar(data, pa.date32())
+
+    return _mais_recentes(
+        tabela.filter(pc.and_(pc.less_equal(tabela["inicio"], dia), pc.greater(tabela["fim"], dia))), CHAVE
+    )
+
+
+def consultar(tabela: pa.Table, data: date) -> pd.DataFrame:
+    # posição na data: as vigências que a contêm, sem as contas zeradas; só as da data são ordenadas
+    vigentes: pa.Table = _vigentes(tabela, data)
+    vigentes = _ordenar(vigentes.filter(pc.not_equal(vigentes["quantidade"], 0)))
+    load: pd.DataFrame = vigentes.select(["cd_tip_tit", "cd_cli_acnt", "cd_cli_cstd", "inicio", "quantidade"]) \
+        .rename_columns(list(SCHEMA)).to_pandas(types_mapper=pd.ArrowDtype)
+    load.attrs["schema"] = dict(SCHEMA)
+
+    return load
+
+
+def divergencias(tabela: pa.Table, totais: pd.DataFrame, data: date) -> pd.DataFrame:
+    # todas as vigências da data contra os totais da história inteira no DB2 (contas zeradas incluídas dos dois
+    # lados); devolve os títulos/custodiantes em que a contagem ou a soma não batem
+    chave: list[str] = ["cd_tip_tit", "cd_cli_cstd"]
+    vigentes: pa.Table = _vigentes(tabela, data)
+
+    retrato: pd.DataFrame = vigentes.to_pandas(types_mapper=pd.ArrowDtype).groupby(chave).agg(
+        posicoes=("quantidade", "size"), quantidade=("quantidade", "sum")
+    )
+    comparados: pd.DataFrame = retrato.join(totais.set_index(chave), how="outer", lsuffix="_retrato",
+                                            rsuffix="_db2").fillna(0)
+    diferentes: pd.Series = comparados["posicoes_retrato"].ne(comparados["posicoes_db2"]) | \
+        comparados["quantidade_retrato"].ne(comparados["quantidade_db2"])
+
+    return comparados[diferentes].reset_index()
+
+
+class Retratos:
+    def __init__(self, pasta: Path = PASTA) -> None:
+        self.pasta: Path = pasta
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        # última versão lida de cada emissor: arquivos (nome e modificação), vigências e último dia contido
+        self._lidas: dict[int, tuple[tuple[tuple[str, int], ...], pa.Table, date]] = {}
+
+    def arquivo(self, mci: int) -> Path:
+        return self.pasta / f"emissor={mci}" / "vigencias.parquet"
+
+    def parcela(self, mci: int, ate: date) -> Path:
+        return self.arquivo(mci).with_name(f"ate={ate.isoformat()}.parquet")
+
+    def parcelas(self, mci: int) -> list[Path]:
+        # arquivos diários ainda não compactados, em ordem de data (o nome é ISO)
+        return sorted(self.arquivo(mci).parent.glob("ate=*.parquet"))
+
+    def _arquivos(self, mci: int) -> list[Path]:
+        return [arquivo for arquivo in [self.arquivo(mci)] if arquivo.exists()] + self.parcelas(mci)
+
+    def ate(self, mci: int) -> date | None:
+        # último dia fechado gravado, sem ler as vigências: o do último arquivo diário ou o da base
+        if parcelas := self.parcelas(mci):
+            return date.fromisoformat(parcelas[-1].stem.removeprefix("ate="))
+
+        try:
+            return date.fromisoformat(json.loads(pq.read_schema(self.arquivo(mci)).metadata[b"gefid"])["ate"])
+
+        except FileNotFoundError:
+            return None
+
+    def ler(self, mci: int) -> tuple[pa.Table, date] | None:
+        # os arquivos só são lidos de novo quando outro processo (ou o job diário) acrescenta ou troca algum
+        while True:
+            try:
+                versao: tuple[tuple[str, int], ...] = tuple(
+                    (arquivo.name, arquivo.stat().st_mtime_ns) for arquivo in self._arquivos(mci)
+                )
+
+                if not versao:
+                    return None
+
+                lida: tuple[tuple[tuple[str, int], ...], pa.Table, date] | None = self._lidas.get(mci)
+
+                if lida is None or lida[0] != versao:
+                    tabelas: list[pa.Table] = [
+                        pq.read_table(self.arquivo(mci).with_name(nome)) for nome, _ in versao
+                    ]
+                    ate: date = max(
+                        date.fromisoformat(json.loads(tabela.schema.metadata[b"gefid"])["ate"]) for tabela in tabelas
+                    )
+                    lida = self._lidas[mci] = (
+                        versao, pa.concat_tables([tabela.replace_schema_metadata() for tabela in tabelas]), ate
+                    )
+
+                return lida[1], lida[2]
+
+            # a compactação apagou um arquivo diário entre a listagem e a leitura: lista de novo
+            except FileNotFoundError:
+                continue
+
+    def _escrever(self, arquivo: Path, tabela: pa.Table, ate: date) -> None:
+        arquivo.parent.mkdir(parents=True, exist_ok=True)
+
+        # ate: último dia fechado que as vigências já contêm
+        tabela = tabela.cast(VIGENCIAS).replace_schema_metadata({b"gefid": json.dumps(dict(ate=ate.isoformat()))})
+
+        # grava ao lado e troca de uma vez: quem lê nunca vê o arquivo pela metade; o ponto no início deixa o
+        # temporário fora da leitura de todos os emissores (posicoes_todos)
+        temporario: Path = arquivo.with_name(f".{arquivo.name}.{os.getpid()}.{threading.get_ident()}")
+        pq.write_table(tabela, temporario, compression="zstd")
+        os.replace(temporario, arquivo)
+
+    def gravar(self, mci: int, tabela: pa.Table, ate: date) -> None:
+        # troca a base compactada pela tabela inteira até `ate`; os arquivos diários que ela já contém saem depois
+        # da troca, quem lê entre as duas coisas só vê vigências repetidas
+        self._escrever(self.arquivo(mci), tabela, ate)
+
+        for parcela in self.parcelas(mci):
+            if date.fromisoformat(parcela.stem.removeprefix("ate=")) <= ate:
+                parcela.unlink(missing_ok=True)
+
+    def acrescentar(self, mci: int, tabela: pa.Table, ate: date) -> None:
+        # só as vigências dos dias novos, num arquivo próprio: a base e os outros dias ficam como estão
+        self._escrever(self.parcela(mci, ate), tabela, ate)
+
+    def emissores(self) -> list[int]:
+        return sorted(int(pasta.name.removeprefix("emissor=")) for pasta in self.pasta.glob("emissor=*"))
+
+
+@st.cache_resource(show_spinner=False)
+def get_retratos() -> Retratos:
+    # a URL sai com a senha mascarada
+    return Retratos(PASTA / hashlib.sha256(str(db.get_engine().url).encode()).hexdigest()[:16])
+
+
+def _trava(mci: int) -> threading.Lock:
+    with _travas_lock:
+        return _travas.setdefault(mci, threading.Lock())
+
+
+def _carregar(mci: int, ate: date) -> pa.Table:
+    # a história inteira do DB2 até `ate`, já na ordem de consultar: vira a base compactada
+    return _ordenar(vigencias(_observacoes(load_movimentos(mci, INICIO, ate))))
+
+
+def atualizar(mci: int, ate: date, refazer: bool = False, conferir: bool = False, compactar: bool = False) -> int:
+    # leva as vigências do emissor até `ate` (um dia fechado) e devolve quantas gravou: a primeira carga lê a
+    # história inteira do DB2 e grava a base, as seguintes só os dias novos, num arquivo diário, sem ler nem
+    # reescrever a base; conferir compara as gravadas mais as novas com os totais do DB2 em `ate`; a cada
+    # COMPACTAR arquivos diários (ou com compactar) tudo volta para a base
+    retratos: Retratos = get_retratos()
+    gravadas: int = 0
+
+    with _trava(mci):
+        anterior: date | None = None if refazer else retratos.ate(mci)
+
+        if anterior is None:
+            tabela: pa.Table = _carregar(mci, ate)
+            retratos.gravar(mci, tabela, ate)
+            gravadas = tabela.num_rows
+
+        elif anterior < ate:
+            novas: pa.Table = vigencias(_observacoes(load_movimentos(mci, anterior + timedelta(days=1), ate)))
+
+            if conferir and not (diferencas := divergencias(
+                pa.concat_tables([retratos.ler(mci)[0], novas]), load_totais(mci, ate), ate
+            )).empty:
+                logger.warning("Vigências de %d em %s não batem com os totais do DB2 em %d título(s)/"
+                               "custodiante(s), carregando a história inteira", mci, ate, len(diferencas))
+                tabela = _carregar(mci, ate)
+                retratos.gravar(mci, tabela, ate)
+                gravadas = tabela.num_rows
+
+            else:
+                retratos.acrescentar(mci, novas, ate)
+                gravadas = novas.num_rows
+
+        if (parcelas := len(retratos.parcelas(mci))) and (compactar or parcelas >= COMPACTAR):
+            todas, ultimo = retratos.ler(mci)
+            retratos.gravar(mci, juntar(todas), ultimo)
+
+    return gravadas
+
+
+def posicoes(mci: int, data: date) -> pd.DataFrame:
+    # posição de cada conta/título/custodiante do emissor na data, qualquer que seja a data do último movimento;
+    # só a manutenção diária (main) grava vigências, conferidas com os totais do DB2: a página lê as gravadas e
+    # estende em memória os dias depois delas com o DB2; sem vigências, o DB2 resolve a posição
+    atual: tuple[pa.Table, date] | None = get_retratos().ler(mci)
+
+    if atual is None:
+        return load_posicoes(mci, data)
+
+    tabela, ate = atual
+
+    if data > ate:
+        tabela = estender(tabela, _observacoes(load_movimentos(mci, ate + timedelta(days=1), data)))
+
+    return consultar(tabela, data)
+
+
+def posicoes_todos(data: date) -> pd.DataFrame:
+    # posição na data de todos os emissores com vigências gravadas, numa leitura só, até o último dia que o job
+    # diário gravou; cd_cli_emt identifica o emissor
+    dia: pa.Scalar = pa.scalar(data, pa.date32())
+    conjunto: ds.Dataset = ds.dataset(
+        get_retratos().pasta, schema=VIGENCIAS.append(pa.field("emissor", pa.int64())), format="parquet",
+        partitioning=ds.partitioning(pa.schema([("emissor", pa.int64())]), flavor="hive"),
+    )
+    # a base e os arquivos diários juntos: a mais recente de cada chave e só depois as contas zeradas
+    vigentes: pa.Table = _mais_recentes(
+        conjunto.to_table(filter=(ds.field("inicio") <= dia) & (ds.field("fim") > dia)), ["emissor", *CHAVE]
+    )
+    vigentes = vigentes.filter(pc.not_equal(vigentes["quantidade"], 0))
+    load: pd.DataFrame = vigentes.select(["emissor", "cd_tip_tit", "cd_cli_acnt", "cd_cli_cstd", "inicio",
+                                          "quantidade"]) \
+        .rename_columns(["cd_cli_emt", *SCHEMA]).to_pandas(types_mapper=pd.ArrowDtype)
+    load.attrs["schema"] = dict(cd_cli_emt="id", **SCHEMA)
+
+    return load
+
+
+def colunas(load: pd.DataFrame, *nomes: str, schema: dict[str, str] | None = None) -> pd.DataFrame:
+    # colunas das páginas a partir das posições, como o SELECT de cada uma trazia do DB2: as do schema em Arrow
+    # (gefid.tipos), as demais no tipo do from_records; ex.: colunas(load, "mci", "cod_titulo", "sigla", "qtd")
+    derivadas: dict[str, Callable[[], np.ndarray]] = dict(
+        mci=lambda: load["cd_cli_acnt"].to_numpy(),
+        data=lambda: load["data"].to_numpy(),
+        cod_titulo=lambda: load["cd_tip_tit"].to_numpy(),
+        sigla=lambda: load["cd_tip_tit"].to_numpy(),
+        quantidade=lambda: load["quantidade"].to_numpy(),
+        qtd=lambda: load["quantidade"].to_numpy(),
+        # CASE WHEN CD_CLI_CSTD = 903485186 THEN 'ESCRITURAL' ELSE 'CUSTÓDIA' END
+        custodiante=lambda: np.where(load["cd_cli_cstd"].to_numpy() == ESCRITURAL, "ESCRITURAL", "CUSTÓDIA"),
+    )
+
+    quadro: pd.DataFrame = pd.DataFrame({nome: pd.Series(derivadas[nome]()) for nome in nomes})
+
+    if schema:
+        quadro = quadro.assign(**{coluna: tipos.serie(quadro[coluna], tipo) for coluna, tipo in schema.items()})
+        quadro.attrs["schema"] = dict(schema)
+
+    return quadro
+
+
+def main() -> None:
+    # manutenção diária: leva as vigências de cada emissor até o último dia fechado (ou --ate);
+    # python -m gefid.retratos [--ate 2026-09-30] [--emissores 903485186,...] [--compactar]
+    parser = argparse.ArgumentParser(description="Atualiza as vigências das posições por emissor")
+    parser.add_argument("--ate", type=date.fromisoformat, default=ultimo_fechado())
+    parser.add_argument("--emissores", type=lambda valor: [int(mci) for mci in valor.split(",")],
+                        help="padrão: os emissores ativos do catálogo")
+    parser.add_argument("--refazer", action="store_true", help="carrega de novo a história inteira")
+    parser.add_argument("--sem-conferencia", action="store_true",
+                        help="não compara as vigências atualizadas com os totais do DB2")
+    parser.add_argument("--compactar", action="store_true",
+                        help=f"junta os arquivos diários na base sem esperar {COMPACTAR}")
+    args = parser.parse_args()
+
+    if args.emissores is None:
+        args.emissores = [emissor.mci for emissor in catalogo.load_emissores().values() if emissor.ativo]
+
+    for mci in args.emissores:
+        try:
+            gravadas: int = atualizar(mci, args.ate, args.refazer, conferir=not args.sem_conferencia,
+                                      compactar=args.compactar)
+
+        except db.ConsultaCancelada:
+            logger.exception("Atualização de %d até %s cancelada", mci, args.ate)
+            continue
+
+        print(f"{mci:>10} {args.ate} {gravadas:>12_} vigências gravadas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+import argparse
+import re
+import sqlite3
+import time
+from collections.abc import Callable, Iterable
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.dialects.sqlite.pysqlite import SQLiteDialect_pysqlite
+from sqlalchemy.engine import URL
+
+# substituto local do DB2 para testes de carga: um arquivo SQLite por schema, anexados com o nome do schema,
+# para o SQL das páginas rodar sem alterações. Basta apontar a conexão em .streamlit/secrets.toml:
+#
+#     [connections.DB2]
+#     url = "sqlite+gefid:///standin/gefid.db"
+#
+# e gerar os dados com: python -m gefid.standin --destino standin --investidores 5000000 --movimentos 50000000
+
+ESQUEMAS: tuple[str, ...] = ("DB2AEB", "DB2MCI", "DB2I13E5")
+
+# emissores usados com MCI fixo pelas páginas: BB (também custodiante escritural) e o emissor das CEPAC
+EMISSORES_FIXOS: tuple[int, ...] = (903485186, 906535030)
+
+CUSTODIANTES: tuple[int, ...] = (903485186, 205007939)
+
+TIP_TIT: tuple[tuple[int, str, str], ...] = (
+    (1, "ON", ""), (2, "PN", ""), (3, "PN", "A"), (4, "PN", "B"), (11, "UNT", ""),
+    (55, "CPC", ""), (56, "CFL", ""), (123, "CAB", ""),
+)
+
+TIP_DRT: tuple[tuple[int, str, int], ...] = (
+    (1, "DIVIDENDO", 1), (2, "JUROS SOBRE CAPITAL PROPRIO", 5), (3, "RENDIMENTO", 10), (4, "BONIFICACAO", 14),
+    (5, "RESTITUICAO DE CAPITAL", 3), (9, "DIVIDENDO BB", 1), (10, "JCP BB", 5),
+)
+
+EST_DRT: tuple[tuple[int, str], ...] = (
+    (1, "DISTRIBUIDO"), (2, "PENDENTE"), (8, "PAGO EM CONTA"), (9, "PAGO EM CAIXA"), (22, "RETIDO"),
+    (23, "BLOQUEADO JUDICIALMENTE"),
+)
+
+TABELAS: dict[str, dict[str, str]] = dict(
+    DB2AEB=dict(
+        PRM_EMP="CD_CLI_EMT INTEGER PRIMARY KEY, SG_EMP CHAR(10), DT_ECR_CTR DATE",
+        TIP_TIT="CD_TIP_TIT INTEGER PRIMARY KEY, SG_TIP_TIT CHAR(6), CD_CLS_TIP_TIT CHAR(2)",
+        TIP_DRT="CD_TIP_DRT INTEGER PRIMARY KEY, NM_TIP_DRT CHAR(40), CD_CLSC_TIP_DRT INTEGER",
+        EST_DRT="CD_EST_DRT INTEGER PRIMARY KEY, NM_EST_DRT CHAR(40)",
+        VCL_ACNT_BLS="CD_CLI_ACNT INTEGER PRIMARY KEY, NM_INVR VARCHAR(60), NR_CPF_CNPJ_INVR BIGINT, "
+                     "CD_TIP_PSS INTEGER",
+        MVTC_DIAR_PSC="CD_CLI_EMT INTEGER, CD_TIP_TIT INTEGER, CD_CLI_ACNT INTEGER, CD_CLI_CSTD INTEGER, "
+                      "DT_MVTC DATE, QT_TIT_ATU DECIMAL(17), QT_TIT_MVTD DECIMAL(17)",
+        PSC_TIT_MVTD="CD_CLI_EMT INTEGER, CD_TIP_TIT INTEGER, CD_CLI_ACNT INTEGER, CD_CLI_CSTD INTEGER, "
+                     "DT_PSC DATE, QT_TIT_INC_MM DECIMAL(17)",
+        MVT_REN="CD_CLI_EMT INTEGER, CD_CLI_DLBC INTEGER, CD_CLI_TITR INTEGER, CD_TIP_TIT INTEGER, "
+                "CD_TIP_DRT INTEGER, CD_EST_DRT INTEGER, CD_FMA_PGTO_REN INTEGER, DT_DLBC DATE, DT_MVT_DRT DATE, "
+                "QT_MVT_REN DECIMAL(17), VL_MVT_REN DECIMAL(17, 2), VL_IR_CLCD_MVT_REN DECIMAL(17, 2), "
+                "VL_CORR_MVT_REN DECIMAL(17, 2), VL_IR_CORR_MVT_REN DECIMAL(17, 2)",
+    ),
+    DB2MCI=dict(
+        CLIENTE="COD INTEGER PRIMARY KEY, NOM VARCHAR(60), COD_TIPO INTEGER, COD_CPF_CGC BIGINT, "
+                "COD_PAIS_ORIG INTEGER",
+    ),
+    DB2I13E5=dict(
+        SISTEMA_ANTIGO_ACIONISTAS="INSCRICAO INTEGER PRIMARY KEY, NOME_ON VARCHAR(60), NOME_PN VARCHAR(60), "
+                                  "BDC INTEGER, CPF_CNPJ BIGINT, DATA_DE_NASCIMENTO DATE, AG INTEGER, CTA INTEGER, "
+                                  "DT_CADASTR DATE, CEP INTEGER, ENDERECO VARCHAR(80), CIDADE VARCHAR(40), "
+                                  "UF CHAR(2)",
+        SISTEMA_ANTIGO_CERTIFICADOS="INSCRICAO INTEGER, NUMERO_CERT INTEGER, NR_PRIM_ACAO INTEGER, "
+                                    "DATA_EMIS INTEGER, QT_ACOES INTEGER",
+    ),
+)
+
+# tabelas do informe de rendimentos, recriadas a cada ano no DB2 com o ano no nome
+TABELAS_IR: dict[str, str] = dict(
+    ENVIO_EMAILS="CD_CLI_ACNT INTEGER, CD_EST_PRCT INTEGER, TS_INC_PRCT_EMAI TIMESTAMP, TX_END_EMAI VARCHAR(100)",
+    CADASTRO_BB="MCI_INVESTIDOR INTEGER, INVESTIDOR VARCHAR(60), CPF_CNPJ BIGINT, EMAIL VARCHAR(100)",
+    CADASTRO_B3="MCI_INVESTIDOR INTEGER, INVESTIDOR VARCHAR(60), CPF_CNPJ BIGINT, EMAIL VARCHAR(100)",
+)
+
+INDICES: tuple[str, ...] = (
+    "CREATE INDEX DB2AEB.IX_MVTC_EMT_DT ON MVTC_DIAR_PSC (CD_CLI_EMT, DT_MVTC)",
+    "CREATE INDEX DB2AEB.IX_MVTC_ACNT ON MVTC_DIAR_PSC (CD_CLI_ACNT)",
+    "CREATE INDEX DB2AEB.IX_PSC_EMT_DT ON PSC_TIT_MVTD (CD_CLI_EMT, DT_PSC)",
+    "CREATE INDEX DB2AEB.IX_REN_DLBC_DT ON MVT_REN (CD_CLI_DLBC, DT_MVT_DRT)",
+    "CREATE INDEX DB2AEB.IX_REN_EMT_TITR ON MVT_REN (CD_CLI_EMT, CD_CLI_TITR)",
+    "CREATE INDEX DB2MCI.IX_CLIENTE_CPF ON CLIENTE (COD_CPF_CGC)",
+    "CREATE INDEX DB2I13E5.IX_ACIONISTAS_BDC ON SISTEMA_ANTIGO_ACIONISTAS (BDC)",
+    "CREATE INDEX DB2I13E5.IX_CERTIFICADOS_INSC ON SISTEMA_ANTIGO_CERTIFICADOS (INSCRICAO)",
+)
+
+# construções do DB2 usadas pelas páginas que o SQLite escreve de outro jeito
+TRADUCOES: tuple[tuple[re.Pattern, str], ...] = (
+    (re.compile(r"([\w.]+)\s*([+-])\s*(\d+)\s+DAYS?\b", re.IGNORECASE), r"date(\1, '\2\3 day')"),
+    (re.compile(r"CAST\(([^()]+?)\s+AS\s+DATE\)", re.IGNORECASE), r"date(\1)"),
+    (re.compile(r"FETCH\s+FIRST\s+(\d+|\?)\s+ROWS?\s+ONLY", re.IGNORECASE), r"LIMIT \1"),
+    (re.compile(r"FETCH\s+FIRST\s+ROWS?\s+ONLY", re.IGNORECASE), "LIMIT 1"),
+    (re.compile(r"\bCURRENT\s+(DATE|TIMESTAMP)\b", re.IGNORECASE), r"CURRENT_\1"),
+)
+
+
+def _strip(valor: Any) -> Any:
+    return valor.strip() if isinstance(valor, str) else valor
+
+
+def _lpad(valor: Any, tamanho: int, preenchimento: str = " ") -> str | None:
+    return None if valor is None else str(valor).rjust(tamanho, preenchimento)[:tamanho]
+
+
+def _concat(*valores: Any) -> str | None:
+    return None if None in valores else "".join(str(valor) for valor in valores)
+
+
+def _year(valor: Any) -> int | None:
+    return None if valor is None else int(str(valor)[:4])
+
+
+def _month(valor: Any) -> int | None:
+    return None if valor is None else int(str(valor)[5:7])
+
+
+FUNCOES: dict[str, tuple[int, Callable[..., Any]]] = dict(
+    STRIP=(1, _strip),
+    LPAD=(3, _lpad),
+    CONCAT=(-1, _concat),
+    YEAR=(1, _year),
+    MONTH=(1, _month),
+)
+
+
+@lru_cache(maxsize=1024)
+def traduzir(sql: str) -> str:
+    for padrao, troca in TRADUCOES:
+        sql = padrao.sub(troca, sql)
+
+    return sql
+
+
+def _registrar_tipos() -> None:
+    # datas e decimais voltam como date/datetime/Decimal, iguais aos do driver do DB2
+    sqlite3.register_adapter(date, date.isoformat)
+    sqlite3.register_adapter(datetime, lambda valor: valor.isoformat(" "))
+    sqlite3.register_converter("DATE", lambda valor: date.fromisoformat(valor.decode()))
+    sqlite3.register_converter("TIMESTAMP", lambda valor: datetime.fromisoformat(valor.decode()))
+    sqlite3.register_converter("DECIMAL", lambda valor: Decimal(valor.decode()))
+
+
+def conectar(conexao: sqlite3.Connection, pasta: Path) -> None:
+    for nome, (argumentos, funcao) in FUNCOES.items():
+        conexao.create_function(nome, argumentos, funcao, deterministic=True)
+
+    for esquema in ESQUEMAS:
+        conexao.execute(f"ATTACH DATABASE ? AS {esquema}", (str(pasta / f"{esquema}.db"),))
+
+
+class DialetoStandin(SQLiteDialect_pysqlite):
+    # registrado como "sqlite+gefid" em gefid/__init__.py
+    supports_statement_cache = True
+
+    # o driver do DB2 devolve os nomes das colunas em minúsculas, e as páginas dependem disso
+    requires_name_normalize = True
+
+    def normalize_name(self, name: str) -> str:
+        return name.lower() if name else name
+
+    def create_connect_args(self, url: URL) -> tuple[list, dict]:
+        _registrar_tipos()
+        args, kwargs = super().create_connect_args(url)
+        kwargs.setdefault("detect_types", sqlite3.PARSE_DECLTYPES)
+
+        return args, kwargs
+
+    def on_connect_url(self, url: URL) -> Callable[[sqlite3.Connection], None]:
+        anterior: Callable[[sqlite3.Connection], None] | None = super().on_connect_url(url)
+        pasta: Path = Path(url.database).resolve().parent
+
+        def _conectar(conexao: sqlite3.Connection) -> None:
+            if anterior is not None:
+                anterior(conexao)
+
+            conectar(conexao, pasta)
+
+        return _conectar
+
+    def do_execute(self, cursor, statement, parameters, context=None) -> None:
+        super().do_execute(cursor, traduzir(statement), parameters, context)
+
+    def do_execute_no_params(self, cursor, statement, context=None) -> None:
+        super().do_execute_no_params(cursor, traduzir(statement), context)
+
+    def do_executemany(self, cursor, statement, parameters, context=None) -> None:
+        super().do_executemany(cursor, traduzir(statement), parameters, context)
+
+
+def _aleatorio(expressao: str, semente: int) -> str:
+    # pseudoaleatório determinístico em SQL puro (hash com um passo quadrático módulo 2^31 - 1), para gerar
+    # milhões de linhas sem passar pelo Python e repetir os mesmos dados a cada geração
+    passo: str = f"((({expressao}) + {semente}) * 2654435761 % 2147483647)"
+
+    return f"(({passo} * {passo} + {semente}) % 2147483647 * 48271 % 2147483647)"
+
+
+def _escolha(expressao: str, valores: Iterable[Any]) -> str:
+    valores = list(valores)
+    casos: str = " ".join(f"WHEN {posicao} THEN {valor!r}" for posicao, valor in enumerate(valores))
+
+    return f"CASE ({expressao}) % {len(valores)} {casos} END"
+
+
+def _investidor(indice: str) -> str:
+    # 70% clientes do BB (MCI < 1000000000, em DB2MCI.CLIENTE), 30% contas da B3 (em DB2AEB.VCL_ACNT_BLS)
+    return f"CASE WHEN ({indice}) % 10 < 7 THEN 100000000 + ({indice}) ELSE 1000000000 + ({indice}) END"
+
+
+def _emissores(quantidade: int) -> list[int]:
+    return [*EMISSORES_FIXOS, *(910000000 + posicao for posicao in range(quantidade - len(EMISSORES_FIXOS)))]
+
+
+def _titulo(emissor: str, expressao: str) -> str:
+    # o emissor das CEPAC só tem os títulos das operações urbanas; os demais, ações e units
+    return (f"CASE WHEN ({emissor}) = 1 THEN {_escolha(expressao, (123, 55, 56))} "
+            f"ELSE {_escolha(expressao, (1, 2, 3, 4, 11))} END")
+
+
+def _dia(inicio: date, expressao: str, dias: int) -> str:
+    # data entre inicio e inicio + dias - 1, a partir do dia juliano (sem montar texto a cada linha)
+    return f"date({inicio.toordinal() + 1721424.5} + ({expressao}) % {dias})"
+
+
+def _sequencia(total: int) -> str:
+    return f"WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < {total - 1}) "
+
+
+def _gerar_tabela(conexao: sqlite3.Connection, tabela: str, total: int, select: str) -> None:
+    relogio: float = time.perf_counter()
+    antes: int = conexao.total_changes
+
+    if total > 0:
+        conexao.execute(f"{_sequencia(total)}INSERT INTO {tabela} {select}")
+        conexao.commit()
+
+    linhas: int = conexao.total_changes - antes
+
+    print(f"{tabela:<40} {linhas:>14_} linhas  {time.perf_counter() - relogio:8.1f} s")
+
+
+def gerar(destino: Path, investidores: int, movimentos: int, posicoes: int, rendimentos: int, emissores: int,
+          acionistas: int, dias: int, ate: date, anos: Iterable[int]) -> None:
+    _registrar_tipos()
+    destino.mkdir(parents=True, exist_ok=True)
+
+    for arquivo in [destino / "gefid.db", *(destino / f"{esquema}.db" for esquema in ESQUEMAS)]:
+        arquivo.unlink(missing_ok=True)
+
+    conexao: sqlite3.Connection = sqlite3.connect(destino / "gefid.db")
+    conectar(conexao, destino)
+
+    for esquema in ESQUEMAS:
+        conexao.execute(f"PRAGMA {esquema}.journal_mode = OFF")
+        conexao.execute(f"PRAGMA {esquema}.synchronous = OFF")
+
+    for esquema, tabelas in TABELAS.items():
+        for tabela, colunas in tabelas.items():
+            conexao.execute(f"CREATE TABLE {esquema}.{tabela} ({colunas})")
+
+    for ano in sorted(set(anos)):
+        for tabela, colunas in TABELAS_IR.items():
+            conexao.execute(f"CREATE TABLE DB2I13E5.IR{ano}_{tabela} ({colunas})")
+
+    # parâmetros da geração, para quem for medir saber a escala da base
+    conexao.execute("CREATE TABLE STANDIN (CHAVE TEXT PRIMARY KEY, VALOR TEXT)")
+    conexao.executemany("INSERT INTO STANDIN VALUES (?, ?)", [
+        ("investidores", investidores), ("movimentos", movimentos), ("posicoes", posicoes),
+        ("rendimentos", rendimentos), ("emissores", emissores), ("acionistas", acionistas), ("dias", dias),
+        ("ate", ate.isoformat()), ("gerado_em", datetime.now().isoformat(" ", "seconds")),
+    ])
+
+    # CHAR do DB2 vem completado com brancos, por isso as páginas usam STRIP
+    conexao.executemany("INSERT INTO DB2AEB.TIP_TIT VALUES (?, ?, ?)",
+                        [(codigo, sigla.ljust(6), classe.ljust(2)) for codigo, sigla, classe in TIP_TIT])
+    conexao.executemany("INSERT INTO DB2AEB.TIP_DRT VALUES (?, ?, ?)",
+                        [(codigo, nome.ljust(40), classe) for codigo, nome, classe in TIP_DRT])
+    conexao.executemany("INSERT INTO DB2AEB.EST_DRT VALUES (?, ?)",
+                        [(codigo, nome.ljust(40)) for codigo, nome in EST_DRT])
+
+    mcis: list[int] = _emissores(emissores)
+    inicio: date = ate - timedelta(days=dias - 1)
+
+    conexao.executemany("INSERT INTO DB2AEB.PRM_EMP VALUES (?, ?, ?)", [
+        (mci, f"EMP{posicao:04d}".ljust(10), None if posicao % 7 else ate - timedelta(days=posicao))
+        for posicao, mci in enumerate(mcis, start=1)
+    ])
+    conexao.executemany("INSERT INTO DB2MCI.CLIENTE VALUES (?, ?, 2, ?, 1)", [
+        (mci, f"EMPRESA {posicao:04d} S.A.", 10000000000000 + mci * 7919 % 89999999999999)
+        for posicao, mci in enumerate(mcis, start=1)
+    ])
+    conexao.commit()
+
+    _gerar_tabela(conexao, "DB2MCI.CLIENTE", investidores, f"""
+        SELECT
+            100000000 + i,
+            'INVESTIDOR ' || i,
+            CASE WHEN i % 20 = 0 THEN 2 ELSE 1 END,
+            CASE
+                WHEN i % 20 = 0 THEN 10000000000000 + {_aleatorio("i", 1)} % 89999999999999
+                ELSE 10000000000 + {_aleatorio("i", 1)} % 89999999999
+            END,
+            CASE WHEN i % 50 = 0 THEN 249 ELSE 1 END
+        FROM n
+        WHERE i % 10 < 7
+    """)
+
+    _gerar_tabela(conexao, "DB2AEB.VCL_ACNT_BLS", investidores, f"""
+        SELECT
+            1000000000 + i,
+            'INVESTIDOR B3 ' || i,
+            CASE
+                WHEN i % 20 = 0 THEN 10000000000000 + {_aleatorio("i", 2)} % 89999999999999
+                ELSE 10000000000 + {_aleatorio("i", 2)} % 89999999999
+            END,
+            CASE WHEN i % 20 = 0 THEN 2 ELSE 1 END
+        FROM n
+        WHERE i % 10 >= 7
+    """)
+
+    _gerar_tabela(conexao, "DB2AEB.MVTC_DIAR_PSC", movimentos, f"""
+        SELECT
+            {_escolha("e", mcis)},
+            {_titulo(f"e % {len(mcis)}", _aleatorio("i", 3))},
+            {_investidor(f"{_aleatorio('i', 4)} % {investidores}")},
+            {_escolha(f"{_aleatorio('i', 5)} % 5 / 4", CUSTODIANTES)},
+            {_dia(inicio, _aleatorio("i", 6), dias)},
+            {_aleatorio("i", 7)} % 100000,
+            {_aleatorio("i", 8)} % 2001 - 1000
+        FROM (SELECT i, {_aleatorio("i", 9)} AS e FROM n)
+    """)
+
+    _gerar_tabela(conexao, "DB2AEB.PSC_TIT_MVTD", posicoes, f"""
+        SELECT
+            {_escolha("e", mcis)},
+            {_titulo(f"e % {len(mcis)}", _aleatorio("i", 13))},
+            {_investidor(f"{_aleatorio('i', 14)} % {investidores}")},
+            {_escolha(f"{_aleatorio('i', 15)} % 5 / 4", CUSTODIANTES)},
+            date({_dia(inicio, _aleatorio("i", 16), dias)}, 'start of month'),
+            {_aleatorio("i", 17)} % 100000
+        FROM (SELECT i, {_aleatorio("i", 19)} AS e FROM n)
+    """)
+
+    _gerar_tabela(conexao, "DB2AEB.MVT_REN", rendimentos, f"""
+        SELECT
+            emt,
+            emt,
+            {_investidor(f"{_aleatorio('i', 24)} % {investidores}")},
+            {_titulo(f"e % {len(mcis)}", _aleatorio("i", 23))},
+            {_escolha(_aleatorio("i", 25), (codigo for codigo, _, _ in TIP_DRT))},
+            {_escolha(_aleatorio("i", 26), (codigo for codigo, _ in EST_DRT))},
+            1 + {_aleatorio("i", 27)} % 2,
+            dlbc,
+            date(dlbc, '+' || ({_aleatorio("i", 28)} % 60) || ' day'),
+            qt,
+            round(qt * valor, 2),
+            round(qt * valor * 0.15, 2),
+            round(qt * valor * 0.01, 2),
+            round(qt * valor * 0.0015, 2)
+        FROM (
+            SELECT
+                i,
+                e,
+                {_escolha("e", mcis)} AS emt,
+                {_dia(inicio, _aleatorio("i", 29), dias)} AS dlbc,
+                1 + {_aleatorio("i", 30)} % 10000 AS qt,
+                ({_aleatorio("i", 31)} % 500 + 1) / 100.0 AS valor
+            FROM (SELECT i, {_aleatorio("i", 22)} AS e FROM n)
+        )
+    """)
+
+    # um em cada dez investidores recebe o informe, e os mesmos aparecem no cadastro do BB ou da B3
+    amostra: str = "i * 10 + i % 10"
+
+    for ano in sorted(set(anos)):
+        _gerar_tabela(conexao, f"DB2I13E5.IR{ano}_ENVIO_EMAILS", investidores // 10, f"""
+            SELECT
+                {_investidor(amostra)},
+                CASE WHEN i % 4 = 0 THEN 12 ELSE 13 END,
+                datetime('{ano}-02-01', '+' || ({_aleatorio("i", ano)} % 2419200) || ' seconds'),
+                'investidor' || ({amostra}) || '@exemplo.com.br'
+            FROM n
+        """)
+
+        for tabela, resto in (("CADASTRO_BB", "< 7"), ("CADASTRO_B3", ">= 7")):
+            _gerar_tabela(conexao, f"DB2I13E5.IR{ano}_{tabela}", investidores // 10, f"""
+                SELECT
+                    {_investidor(amostra)},
+                    'INVESTIDOR ' || ({amostra}),
+                    10000000000 + {_aleatorio(amostra, 1)} % 89999999999,
+                    'investidor' || ({amostra}) || '@exemplo.com.br'
+                FROM n
+                WHERE ({amostra}) % 10 {resto}
+            """)
+
+    _gerar_tabela(conexao, "DB2I13E5.SISTEMA_ANTIGO_ACIONISTAS", acionistas, f"""
+        SELECT
+            1000000 + i,
+            'ACIONISTA ' || i,
+            CASE WHEN i % 3 = 0 THEN 'ACIONISTA ' || i ELSE NULL END,
+            100000000 + i * 10,
+            10000000000 + {_aleatorio("i * 10", 1)} % 89999999999,
+            {_dia(date(1930, 1, 1), _aleatorio("i", 41), 25000)},
+            1 + {_aleatorio("i", 42)} % 5000,
+            1 + {_aleatorio("i", 43)} % 99999,
+            {_dia(date(1990, 1, 1), _aleatorio("i", 44), 5000)},
+            1000000 + {_aleatorio("i", 45)} % 98999999,
+            'RUA ' || ({_aleatorio("i", 46)} % 900 + 1) || ', ' || ({_aleatorio("i", 47)} % 3000 + 1),
+            {_escolha(_aleatorio("i", 48), ("SAO PAULO", "RIO DE JANEIRO", "BRASILIA", "BELO HORIZONTE"))},
+            {_escolha(_aleatorio("i", 48), ("SP", "RJ", "DF", "MG"))}
+        FROM n
+    """)
+
+    _gerar_tabela(conexao, "DB2I13E5.SISTEMA_ANTIGO_CERTIFICADOS", acionistas * 3, f"""
+        SELECT
+            1000000 + i / 3,
+            100000 + i,
+            1 + {_aleatorio("i", 51)} % 10000000,
+            19700101 + ({_aleatorio("i", 52)} % 30) * 10000 + ({_aleatorio("i", 53)} % 12) * 100
+                + {_aleatorio("i", 54)} % 28,
+            1 + {_aleatorio("i", 55)} % 50000
+        FROM n
+    """)
+
+    relogio: float = time.perf_counter()
+
+    for indice in INDICES:
+        conexao.execute(indice)
+
+    for esquema in ESQUEMAS:
+        conexao.execute(f"ANALYZE {esquema}")
+
+    conexao.commit()
+    conexao.close()
+
+    print(f"{'índices e estatísticas':<40} {'':>21}  {time.perf_counter() - relogio:8.1f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gera a base SQLite que substitui o DB2 nos testes de carga")
+    parser.add_argument("--destino", type=Path, default=Path("standin"))
+    parser.add_argument("--investidores", type=int, default=50_000)
+    parser.add_argument("--movimentos", type=int, default=500_000)
+    parser.add_argument("--posicoes", type=int, help="padrão: 1/10 dos movimentos")
+    parser.add_argument("--rendimentos", type=int, help="padrão: 1/5 dos movimentos")
+    parser.add_argument("--emissores", type=int, default=20)
+    parser.add_argument("--acionistas", type=int, help="padrão: 1/20 dos investidores")
+    parser.add_argument("--dias", type=int, default=730)
+    parser.add_argument("--ate", type=date.fromisoformat, default=date.today())
+    args = parser.parse_args()
+
+    gerar(
+        destino=args.destino,
+        investidores=args.investidores,
+        movimentos=args.movimentos,
+        posicoes=args.movimentos // 10 if args.posicoes is None else args.posicoes,
+        rendimentos=args.movimentos // 5 if args.rendimentos is None else args.rendimentos,
+        emissores=max(args.emissores, len(EMISSORES_FIXOS)),
+        acionistas=args.investidores // 20 if args.acionistas is None else args.acionistas,
+        dias=args.dias,
+        ate=args.ate,
+        # o informe usa o ano corrente, e parte das consultas ainda aponta para IR2025
+        anos=(2025, args.ate.year, date.today().year),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+from streamlit.runtime import Runtime
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# porta das métricas no formato do Prometheus, fora do Streamlit; com vários processos do servidor na máquina,
+# cada um fica com a primeira livre a partir daqui (9464, 9465, ...); só na máquina local, sem autenticação:
+# GEFID_METRICAS_ENDERECO=0.0.0.0 abre para a rede quando o Prometheus coleta de fora
+ENDERECO: str = os.environ.get("GEFID_METRICAS_ENDERECO", "127.0.0.1")
+PORTA: int = int(os.environ.get("GEFID_METRICAS_PORTA", "9464"))
+PORTAS: int = 8
+
+# limites (segundos) dos histogramas de tempo: de consultas leves a exportações de fim de mês
+LIMITES: tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900)
+
+# limites (bytes) do histograma de tamanho das exportações
+LIMITES_BYTES: tuple[float, ...] = tuple(float(1024 ** 2 * mb) for mb in (1, 5, 10, 50, 100, 250, 500, 1000))
+
+_registro: list["_Metrica"] = []
+
+
+def _escapar(valor: object) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _rotulos(nomes: tuple[str, ...], valores: tuple[str, ...], le: str | None = None) -> str:
+    pares: list[str] = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+
+    # le: limite da faixa, nas amostras _bucket dos histogramas
+    if le is not None:
+        pares.append(f'le="{le}"')
+
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor: float) -> str:
+    return repr(float(valor)) if valor != int(valor) else str(int(valor))
+
+
+class _Metrica:
+    tipo: str = ""
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...] = ()) -> None:
+        self.nome: str = nome
+        self.ajuda: str = ajuda
+        self.rotulos: tuple[str, ...] = rotulos
+        self._lock: threading.Lock = threading.Lock()
+
+        _registro.append(self)
+
+    def _chave(self, rotulos: dict[str, object]) -> tuple[str, ...]:
+        return tuple(str(rotulos[nome]) for nome in self.rotulos)
+
+    def _amostras(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def expor(self) -> str:
+        with self._lock:
+            amostras: list[str] = list(self._amostras())
+
+        return "\n".join([f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}", *amostras])
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...] = ()) -> None:
+        super().__init__(nome, ajuda, rotulos)
+        self._valores: dict[tuple[str, ...], float] = {}
+
+    def somar(self, valor: float = 1, **rotulos: object) -> None:
+        chave: tuple[str, ...] = self._chave(rotulos)
+
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def _amostras(self) -> Iterator[str]:
+        for chave, valor in self._valores.items():
+            yield f"{self.nome}{_rotulos(self.rotulos, chave)} {_numero(valor)}"
+
+
+class Medidor(_Metrica):
+    # valor do momento; com `ler`, é calculado na hora da coleta (ex.: sessões ativas); None é valor desconhecido
+    # e fica sem amostra, para o Prometheus não confundir com zero
+    tipo = "gauge"
+
+    def __init__(self, nome: str, ajuda: str, ler: Callable[[], float | None]) -> None:
+        super().__init__(nome, ajuda)
+        self.ler: Callable[[], float | None] = ler
+
+    def _amostras(self) -> Iterator[str]:
+        try:
+            valor: float | None = self.ler()
+
+        except Exception:
+            logger.exception("Falha ao ler a métrica %s", self.nome)
+            return
+
+        if valor is not None:
+            yield f"{self.nome} {_numero(valor)}"
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...] = (),
+                 limites: tuple[float, ...] = LIMITES) -> None:
+        super().__init__(nome, ajuda, rotulos)
+        self.limites: tuple[float, ...] = limites
+        # por combinação de rótulos: contagem em cada faixa (não acumulada), soma e total
+        self._valores: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observar(self, valor: float, **rotulos: object) -> None:
+        chave: tuple[str, ...] = self._chave(rotulos)
+        faixa: int = next((posicao for posicao, limite in enumerate(self.limites) if valor <= limite),
+                          len(self.limites))
+
+        with self._lock:
+            contagens, soma = self._valores.setdefault(chave, ([0] * (len(self.limites) + 1), [0.0]))
+            contagens[faixa] += 1
+            soma[0] += valor
+
+    @contextmanager
+    def medir(self, **rotulos: object) -> Iterator[None]:
+        relogio: float = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.observar(time.perf_counter() - relogio, **rotulos)
+
+    def _amostras(self) -> Iterator[str]:
+        for chave, (contagens, soma) in self._valores.items():
+            acumulado: int = 0
+
+            for limite, contagem in zip((*self.limites, float("inf")), contagens):
+                acumulado += contagem
+                le: str = "+Inf" if limite == float("inf") else _numero(limite)
+                yield f"{self.nome}_bucket{_rotulos(self.rotulos, chave, le)} {acumulado}"
+
+            yield f"{self.nome}_sum{_rotulos(self.rotulos, chave)} {_numero(soma[0])}"
+            yield f"{self.nome}_count{_rotulos(self.rotulos, chave)} {acumulado}"
+
+
+def _sessoes_ativas() -> float | None:
+    # fora do servidor (scripts, benchmarks) não há sessões; o streamlit não expõe o gerenciador delas
+    # (Runtime._session_mgr): numa versão sem ele o número é desconhecido, não zero
+    if not Runtime.exists():
+        return 0
+
+    gerenciador = getattr(Runtime.instance(), "_session_mgr", None)
+    contar: Callable[[], int] | None = getattr(gerenciador, "num_active_sessions", None)
+
+    return contar() if callable(contar) else None
+
+
+# métricas do processo; gefid.metricas, gefid.exportar e as páginas atualizam
+CONSULTA_SEGUNDOS: Histograma = Histograma(
+    "gefid_consulta_segundos", "Tempo das consultas ao DB2, da fila ao DataFrame", ("pagina", "funcao")
+)
+CONSULTA_DB2_SEGUNDOS: Histograma = Histograma(
+    "gefid_consulta_db2_segundos", "Tempo das consultas dentro do DB2 (execução e leitura)", ("pagina", "funcao")
+)
+CONSULTA_LINHAS: Contador = Contador("gefid_consulta_linhas_total", "Linhas lidas do DB2", ("pagina", "funcao"))
+CONSULTA_COALESCIDAS: Contador = Contador(
+    "gefid_consulta_coalescidas_total", "Consultas que aguardaram uma idêntica já em andamento", ("pagina", "funcao")
+)
+CONSULTA_CANCELADAS: Contador = Contador(
+    "gefid_consulta_canceladas_total", "Consultas canceladas por tempo, sessão ou fila", ("classe", "motivo")
+)
+FILA_SEGUNDOS: Histograma = Histograma(
+    "gefid_fila_segundos", "Espera na fila das classes de consulta pesadas", ("classe",)
+)
+CACHE: Contador = Contador("gefid_cache_leituras_total", "Leituras do cache por nível e resultado",
+                           ("nivel", "resultado"))
+EXPORTACAO_SEGUNDOS: Histograma = Histograma(
+    "gefid_exportacao_segundos", "Tempo de geração das exportações CSV/XLSX", ("formato",)
+)
+EXPORTACAO_BYTES: Histograma = Histograma(
+    "gefid_exportacao_bytes", "Tamanho das exportações CSV/XLSX", ("formato",), LIMITES_BYTES
+)
+PDF_SEGUNDOS: Histograma = Histograma("gefid_pdf_segundos", "Tempo de montagem dos PDFs", ("pagina",))
+SMTP_SEGUNDOS: Histograma = Histograma("gefid_smtp_segundos", "Tempo de envio dos e-mails", ("pagina",))
+SESSOES: Medidor = Medidor("gefid_sessoes_ativas", "Sessões conectadas a este processo", _sessoes_ativas)
+
+
+def expor() -> str:
+    return "\n".join(metrica.expor() for metrica in _registro) + "\n"
+
+
+class _Coleta(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+
+        corpo: bytes = expor().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, format: str, *args: object) -> None:
+        # a coleta a cada poucos segundos não vai para o log do servidor
+        pass
+
+
+@st.cache_resource(show_spinner=False)
+def servir() -> ThreadingHTTPServer | None:
+    # uma porta por processo, aberta na primeira página; /metrics para o Prometheus
+    for porta in range(PORTA, PORTA + PORTAS):
+        try:
+            servidor: ThreadingHTTPServer = ThreadingHTTPServer((ENDERECO, porta), _Coleta)
+
+        except OSError:
+            continue
+
+        servidor.daemon_threads = True
+        threading.Thread(target=servidor.serve_forever, name="gefid-telemetria", daemon=True).start()
+        logger.info("Métricas do Prometheus em http://%s:%d/metrics", ENDERECO, porta)
+
+        return servidor
+
+    logger.warning("Nenhuma porta livre entre %d e %d para as métricas do Prometheus", PORTA, PORTA + PORTAS - 1)
+
+    return None
@@ -0,0 +1,91 @@
+from collections.abc import Sequence
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+
+# tipos que as consultas declaram para as colunas do resultado: db.query(..., schema=dict(mci="id", ...))
+TIPOS: dict[str, pa.DataType] = dict(
+    id=pa.int64(),
+    quantidade=pa.int64(),
+    centavos=pa.int64(),
+    numero=pa.float64(),
+    texto=pa.string(),
+    categoria=pa.dictionary(pa.int32(), pa.string()),
+    data=pa.date32(),
+)
+
+
+def _coluna(valores: Sequence[Any], tipo: str) -> pd.Series:
+    if tipo == "centavos":
+        # o DB2 devolve valores monetários como Decimal; em centavos as somas ficam exatas e em int64
+        valores = [None if valor is None else round(valor * 100) for valor in valores]
+
+    if tipo == "categoria":
+        array: pa.Array = pa.array(valores, type=pa.string()).dictionary_encode()
+
+    else:
+        try:
+            array = pa.array(valores, type=TIPOS[tipo])
+
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            # ex.: CPF/CNPJ de LPAD ('00012345678') ou datas em texto, convertidos pelo próprio Arrow
+            array = pa.array(valores).cast(TIPOS[tipo])
+
+    return pd.Series(array, dtype=pd.ArrowDtype(array.type))
+
+
+def serie(valores: pd.Series, tipo: str) -> pd.Series:
+    # coluna montada fora do SQL (ex.: gefid.identidades) no mesmo tipo que teria vindo do DB2
+    array: pa.Array = pa.array(valores, from_pandas=True)
+    array = array.cast(pa.string()).dictionary_encode() if tipo == "categoria" else array.cast(TIPOS[tipo])
+
+    return pd.Series(array, index=valores.index, name=valores.name, dtype=pd.ArrowDtype(array.type))
+
+
+def tabela(columns: list[str], rows: Sequence[Sequence[Any]], schema: dict[str, str]) -> pd.DataFrame:
+    # só as colunas sem tipo declarado passam pelo caminho antigo (object / float)
+    load: pd.DataFrame = pd.DataFrame.from_records(
+        rows, columns=columns, exclude=[coluna for coluna in columns if coluna in schema], coerce_float=True
+    )
+    valores: list[tuple] = list(zip(*rows)) if rows else [() for _ in columns]
+
+    for posicao, coluna in enumerate(columns):
+        if coluna in schema:
+            load.insert(posicao, coluna, _coluna(valores[posicao], schema[coluna]))
+
+    load.attrs["schema"] = {coluna: tipo for coluna, tipo in schema.items() if coluna in columns}
+
+    return load
+
+
+def reais(load: pd.DataFrame) -> pd.DataFrame:
+    # volta as colunas em centavos para reais, para exibir na tela ou exportar
+    schema: dict[str, str] = load.attrs.get("schema", {})
+    colunas: list[str] = [coluna for coluna, tipo in schema.items() if tipo == "centavos" and coluna in load.columns]
+
+    if not colunas:
+        return load
+
+    load = load.assign(**{coluna: load[coluna].astype("float64[pyarrow]") / 100 for coluna in colunas})
+    load.attrs["schema"] = {**schema, **dict.fromkeys(colunas, "numero")}
+
+    return load
+
+
+def exibir(load: pd.DataFrame) -> pd.DataFrame:
+    # categorias (dictionary do Arrow) voltam a texto para a tela: o st.data_editor vê o dictionary como tipo
+    # desconhecido e recusa o TextColumn nessas colunas
+    colunas: list[str] = [
+        coluna for coluna, tipo in load.dtypes.items()
+        if isinstance(tipo, pd.ArrowDtype) and pa.types.is_dictionary(tipo.pyarrow_dtype)
+    ]
+
+    if not colunas:
+        return load
+
+    texto: pd.ArrowDtype = pd.ArrowDtype(pa.string())
+    load = load.assign(**{coluna: load[coluna].astype(texto) for coluna in colunas})
+    load.attrs["schema"] = {**load.attrs.get("schema", {}), **dict.fromkeys(colunas, "texto")}
+
+    return load
@@ -1,5 +1,7 @@
 import streamlit as st
 
+from gefid import db, telemetria
+
 st.set_page_config(
     page_title="Intranet DIOPE GEFID",
     page_icon="img/bbfav.svg",
@@ -7,15 +9,24 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# aquece o pool de conexões com o DB2 uma vez por processo
+db.warm()
+
+# métricas no formato do Prometheus, numa porta própria por processo (gefid.telemetria)
+telemetria.servir()
+
 with open("styles/styles.css") as css:
     st.markdown(f"<style>{css.read()}</style>", unsafe_allow_html=True)
 
 st.logo(image="img/bb_png.png", size="large", link="https://gefid-aplic-1.intranet.bb.com.br/")
 
-st.navigation(
+pagina = st.navigation(
     pages={
         "Home": [
             st.Page(page="apps/home.py", title="BB Escrituração", icon=":material/home:", default=True),
+            # fora do menu, aberta só pelo endereço /admin
+            st.Page(page="apps/admin.py", title="Administração", icon=":material/admin_panel_settings:",
+                    url_path="admin", visibility="hidden"),
         ],
         "Atendimento aos Clientes": [
             st.Page(page="apps/base-investidores.py", title="Base de Investidores", icon=":material/account_balance:"),
@@ -49,4 +60,11 @@ st.navigation(
         ]
     },
     expanded=True,
-).run()
+)
+
+try:
+    pagina.run()
+
+except db.ConsultaCancelada as erro:
+    # tempo limite, fila cheia ou sessão que saiu da página: aviso em vez do traceback
+    st.toast(body=f"###### {erro}", icon=":material/timer_off:")
@@ -0,0 +1,48 @@
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from gefid import standin
+
+RAIZ: Path = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="session")
+def base(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    # base local pequena, gerada uma vez para todos os testes
+    destino: Path = tmp_path_factory.mktemp("standin")
+    standin.gerar(destino=destino, investidores=500, movimentos=5_000, posicoes=500, rendimentos=3_000, emissores=5,
+                  acionistas=25, dias=365, ate=date(2025, 12, 31), anos=(2025,))
+
+    # o secrets.toml aponta o DB2 para a base local, como no benchmark das páginas
+    (destino / ".streamlit").mkdir()
+    (destino / ".streamlit" / "secrets.toml").write_text(
+        f'[connections.DB2]\nurl = "sqlite+gefid:///{destino / "gefid.db"}"\n'
+    )
+
+    return destino
+
+
+@pytest.fixture
+def pagina(base: Path, monkeypatch: pytest.MonkeyPatch):
+    # roda uma página de apps/ contra a base local; o Streamlit lê o .streamlit/secrets.toml da pasta atual
+    monkeypatch.chdir(base)
+
+    def abrir(nome: str) -> AppTest:
+        return AppTest.from_file(str(RAIZ / "apps" / f"{nome}.py"), default_timeout=120).run()
+
+    return abrir
+
+
+def consultar(base: Path, sql: str) -> list[tuple]:
+    conexao: sqlite3.Connection = sqlite3.connect(base / "gefid.db")
+    standin.conectar(conexao, base)
+
+    try:
+        return conexao.execute(sql).fetchall()
+
+    finally:
+        conexao.close()
@@ -0,0 +1,35 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import consultar
+from gefid import retratos
+
+
+@pytest.mark.parametrize("botao", ["csv", "xlsx"])
+def test_baixar(pagina, base: Path, botao: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # as vigências da base de teste ficam fora da pasta dados/ do repositório
+    monkeypatch.setattr(retratos, "PASTA", tmp_path)
+    retratos.get_retratos.clear()
+
+    ((mci, nome),) = consultar(base, """
+        SELECT t1.CD_CLI_EMT, STRIP(t2.NOM)
+        FROM DB2AEB.MVTC_DIAR_PSC t1 JOIN DB2MCI.CLIENTE t2 ON t2.COD = t1.CD_CLI_EMT
+        GROUP BY 1, 2
+        ORDER BY COUNT(*) DESC
+        LIMIT 1
+    """)
+
+    app: AppTest = pagina("base-investidores")
+
+    if nome not in app.selectbox(key="empresa").options:
+        app.radio(key="option").set_value("inativos").run()
+
+    app.selectbox(key="empresa").set_value(nome)
+    app.date_input(key="data").set_value(date(2025, 12, 31))
+    app.button(key=botao).click().run()
+
+    assert not app.exception, app.exception
+    assert [toast.value for toast in app.toast] == [f"###### Arquivo {botao.upper()} pronto para baixar"]
@@ -0,0 +1,37 @@
+import logging
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from gefid import cache
+
+
+@pytest.fixture
+def niveis(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    memoria: cache.Memoria = cache.Memoria()
+    disco: cache.Disco = cache.Disco(tmp_path)
+    monkeypatch.setattr(cache, "get_memoria", lambda: memoria)
+    monkeypatch.setattr(cache, "get_disco", lambda: disco)
+
+
+def test_tamanho_conta_os_dataframes_guardados() -> None:
+    load: pd.DataFrame = pd.DataFrame(dict(nome=["x" * 100] * 1_000, valor=range(1_000)))
+    bytes_load: int = cache._tamanho(load)
+
+    assert cache._tamanho((load, load)) >= 2 * bytes_load
+    assert cache._tamanho(dict(a=[load], b=load["nome"])) >= bytes_load + int(load["nome"].memory_usage(deep=True))
+
+
+def test_falha_ao_gravar_no_disco_nao_derruba_a_chamada(niveis: None, caplog: pytest.LogCaptureFixture) -> None:
+    # coluna object com tipos misturados: o Arrow não converte, o valor calculado volta mesmo assim
+    @cache.dados(ttl=60, disco=True)
+    def load_misturado() -> pd.DataFrame:
+        return pd.DataFrame(dict(valor=[1, "a", 2.5]))
+
+    with caplog.at_level(logging.ERROR, logger=cache.__name__):
+        load: pd.DataFrame = load_misturado()
+
+    assert load["valor"].tolist() == [1, "a", 2.5]
+    assert "disco" in caplog.text
+    assert not list(cache.get_disco().pasta.glob("*.arrow*"))
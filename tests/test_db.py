@@ -0,0 +1,109 @@
+import threading
+import time
+from functools import partial
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData, ScriptRequests
+
+from gefid import db
+
+
+def _contexto(pedidos: object) -> SimpleNamespace:
+    # só o que _ativa lê do ScriptRunContext; fora do servidor não há Runtime e a checagem da sessão não entra
+    return SimpleNamespace(session_id="teste", script_requests=pedidos)
+
+
+def test_ativa_ate_o_pedido_de_rodar_de_novo() -> None:
+    # o botão Cancelar e a troca de página chegam como pedido de rodar de novo; fechar a sessão, de parar
+    pedidos: ScriptRequests = ScriptRequests()
+    assert db._ativa(_contexto(pedidos))
+
+    pedidos.request_rerun(RerunData())
+    assert not db._ativa(_contexto(pedidos))
+
+    pedidos = ScriptRequests()
+    pedidos.request_stop()
+    assert not db._ativa(_contexto(pedidos))
+
+
+def test_streamlit_guarda_o_estado_dos_pedidos() -> None:
+    # _ativa lê um atributo interno do Streamlit; este teste quebra na atualização que o tirar
+    assert db._PEDIDOS
+
+
+def test_sem_estado_dos_pedidos_vale_so_a_sessao(monkeypatch: pytest.MonkeyPatch) -> None:
+    pedidos: ScriptRequests = ScriptRequests()
+    pedidos.request_rerun(RerunData())
+    monkeypatch.setattr(db, "_PEDIDOS", False)
+
+    assert db._ativa(_contexto(pedidos))
+
+
+def test_seguidora_nao_copia_o_quadro_de_quem_disparou(monkeypatch: pytest.MonkeyPatch) -> None:
+    liberar: threading.Event = threading.Event()
+
+    def executar(*_: object) -> pd.DataFrame:
+        liberar.wait(5)
+        return pd.DataFrame(dict(valor=[1, 2, 3]))
+
+    monkeypatch.setattr(db, "_executar", executar)
+    resultados: dict[str, pd.DataFrame] = {}
+
+    def consultar(nome: str) -> None:
+        resultados[nome] = db.query("SELECT 1")
+
+        # a página de quem disparou altera o quadro assim que o recebe
+        if nome == "lider":
+            resultados[nome]["valor"] = 0
+
+    lider: threading.Thread = threading.Thread(target=consultar, args=("lider",))
+    lider.start()
+
+    while not db._em_andamento:
+        time.sleep(0.01)
+
+    _, execucao = next(iter(db._em_andamento.values()))
+    seguidora: threading.Thread = threading.Thread(target=consultar, args=("seguidora",))
+    seguidora.start()
+
+    while not execucao.seguidoras:
+        time.sleep(0.01)
+
+    liberar.set()
+    lider.join(5)
+    seguidora.join(5)
+
+    assert resultados["seguidora"]["valor"].tolist() == [1, 2, 3]
+    assert resultados["seguidora"] is not resultados["lider"]
+
+
+def test_buscar_e_gather_registram_a_funcao_que_chamou(monkeypatch: pytest.MonkeyPatch) -> None:
+    origens: list[tuple[str, str]] = []
+
+    def executar(sql: str, params: object, schema: object, pagina: str, funcao: str, execucao: object) -> pd.DataFrame:
+        origens.append((pagina, funcao))
+        return pd.DataFrame(dict(valor=[1]))
+
+    monkeypatch.setattr(db, "_executar", executar)
+
+    def load_lotes() -> pd.DataFrame:
+        return db.buscar("SELECT 1 WHERE 1 IN :chaves", range(5), lote=2)
+
+    def load_juntas() -> list[pd.DataFrame]:
+        return db.gather(partial(db.query, "SELECT 2"), partial(db.query, "SELECT 3"))
+
+    load_lotes()
+    load_juntas()
+
+    assert {funcao for _, funcao in origens} == {"load_lotes", "load_juntas"}
+    assert len(origens) == 5
+
+
+def test_classes_com_fila_deixam_conexoes_para_as_leves() -> None:
+    conexoes: int = db.POOL["pool_size"] + db.POOL["max_overflow"]
+
+    assert db.CLASSES["padrao"].simultaneas
+    assert db.CLASSES["leve"].simultaneas is None
+    assert sum(classe.simultaneas or 0 for classe in db.CLASSES.values()) < conexoes
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gefid import dimensoes
+
+
+@pytest.fixture
+def tabelas(monkeypatch: pytest.MonkeyPatch) -> None:
+    # tabelas de domínio pequenas no lugar das do DB2; a classe 3 não tem CD_CLS_TIP_TIT (rótulo nulo)
+    tip_tit: pd.DataFrame = pd.DataFrame(dict(cd_tip_tit=[1, 2, 3], sg_tip_tit=["ON", "PN", "PN"],
+                                              cd_cls_tip_tit=["", "A", np.nan]))
+    tip_drt: pd.DataFrame = pd.DataFrame(dict(cd_tip_drt=[10, 20], nm_tip_drt=["DIVIDENDO", "JUROS"]))
+    est_drt: pd.DataFrame = pd.DataFrame(dict(cd_est_drt=[1], nm_est_drt=["PAGO"]))
+
+    atual: dimensoes.Dimensoes = object.__new__(dimensoes.Dimensoes)
+    atual._rotulos = dimensoes._montar(dict(tip_tit=tip_tit, tip_drt=tip_drt, est_drt=est_drt))
+    monkeypatch.setattr(dimensoes, "get_dimensoes", lambda: atual)
+
+
+def test_montar_aceita_rotulo_nulo(tabelas: None) -> None:
+    load: pd.DataFrame = dimensoes.rotular(pd.DataFrame(dict(sigla=[1, 2, 3])), sigla="sigla")
+
+    assert load["sigla"].iloc[:2].tolist() == ["ON", "PNA"]
+    assert load["sigla"].isna().tolist() == [False, False, True]
+
+
+def test_left_mantem_codigo_sem_cadastro(tabelas: None) -> None:
+    load: pd.DataFrame = dimensoes.rotular(pd.DataFrame(dict(direito=[10, 99, None], valor=[1, 2, 3])),
+                                           direito="direito")
+
+    assert load["direito"].iloc[0] == "DIVIDENDO"
+    assert load["direito"].isna().tolist() == [False, True, True]
+    assert load["valor"].tolist() == [1, 2, 3]
+
+
+def test_inner_descarta_codigo_sem_cadastro(tabelas: None) -> None:
+    # como o INNER JOIN com TIP_TIT e TIP_DRT: código sem cadastro (ou nulo) em qualquer coluna tira a linha;
+    # a classe 3 existe, mesmo com rótulo nulo, e fica
+    load: pd.DataFrame = dimensoes.rotular(
+        pd.DataFrame(dict(direito=[10, 99, 20, None, 20], sigla=[1, 1, 7, 2, 3], valor=[1, 2, 3, 4, 5])),
+        juncao="inner", direito="direito", sigla="sigla",
+    )
+
+    assert load["valor"].tolist() == [1, 5]
+    assert load["direito"].tolist() == ["DIVIDENDO", "JUROS"]
+    assert load["sigla"].iloc[0] == "ON"
+    assert load["sigla"].isna().tolist() == [False, True]
+    assert load.index.tolist() == [0, 1]
@@ -0,0 +1,47 @@
+import io
+
+import openpyxl
+import pandas as pd
+
+from gefid import exportar, resultados
+
+
+def test_xlsx_abas_com_cabecalho() -> None:
+    # 25 linhas em abas de 10: a primeira com as linhas de título acima do cabeçalho, as demais só com o cabeçalho
+    load: pd.DataFrame = pd.DataFrame(dict(MCI=range(25), INVESTIDOR=[f"INVESTIDOR {mci}" for mci in range(25)]))
+
+    conteudo, linhas = exportar.xlsx(resultados.fatiar(load), linhas_por_aba=10, cabecalho=["Emissor: X", "CNPJ: 1"],
+                                     nomes=["MCI", "Nome"], larguras=[12, 40])
+    planilha = openpyxl.load_workbook(io.BytesIO(conteudo))
+
+    assert linhas == 25
+    assert planilha.sheetnames == ["1", "2", "3"]
+
+    primeira = list(planilha["1"].values)
+    assert primeira[0][0] == "Emissor: X" and primeira[1][0] == "CNPJ: 1"
+    assert primeira[3] == ("MCI", "Nome")
+    assert [registro[0] for registro in primeira[4:]] == list(range(10))
+    assert planilha["1"].freeze_panes == "A5"
+
+    assert list(planilha["2"].values)[0] == ("MCI", "Nome")
+    assert [registro[0] for registro in list(planilha["3"].values)[1:]] == list(range(20, 25))
+
+
+def test_xlsx_sem_cabecalho() -> None:
+    conteudo, linhas = exportar.xlsx([pd.DataFrame(dict(a=[1, 2]))])
+    planilha = openpyxl.load_workbook(io.BytesIO(conteudo))
+
+    assert linhas == 2
+    assert list(planilha["1"].values) == [("a",), (1,), (2,)]
+
+
+def test_xlsx_formatos_por_coluna_em_todas_as_abas() -> None:
+    load: pd.DataFrame = pd.DataFrame(dict(nome=["A", "B", "C"], valor=[1234.5, 2.25, 0.0], qtd=[1_000, 2, 3]))
+
+    conteudo, _ = exportar.xlsx(resultados.fatiar(load), linhas_por_aba=2, larguras=[20], formatos=[None, "#,##0.00"])
+    planilha = openpyxl.load_workbook(io.BytesIO(conteudo))
+
+    for aba in planilha.worksheets:
+        assert aba.column_dimensions["A"].width > 19
+        assert aba.column_dimensions["B"].number_format == "#,##0.00"
+        assert [celula.number_format for celula in aba["B"][1:]] == ["#,##0.00"] * (aba.max_row - 1)
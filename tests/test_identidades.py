@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gefid import identidades
+
+
+@pytest.fixture
+def relogio(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    # relógio que anda um segundo a cada leitura e identidades lidas sem DB2
+    agora: list[float] = [0.0]
+
+    def time() -> float:
+        agora[0] += 1
+        return agora[0]
+
+    def load_identidades(mcis: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(dict(nome=[f"MCI {mci}" for mci in mcis], carregado_em=agora[0]),
+                            index=pd.Index(mcis, name="mci")).reindex(columns=identidades.COLUNAS)
+
+    monkeypatch.setattr(identidades.time, "time", time)
+    monkeypatch.setattr(identidades, "load_identidades", load_identidades)
+
+    return agora
+
+
+def _guardados(cache: identidades.Identidades) -> list[int]:
+    return sorted(cache._atual[0].index.tolist())
+
+
+def test_limite_tira_os_usados_ha_mais_tempo(relogio: list[float]) -> None:
+    cache: identidades.Identidades = identidades.Identidades(limite=3)
+
+    for mcis in [[1], [2], [3], [1], [4]]:
+        assert cache.obter(np.array(mcis))["nome"].tolist() == [f"MCI {mci}" for mci in mcis]
+
+    assert _guardados(cache) == [1, 3, 4]
+
+
+def test_pedido_maior_que_o_limite_volta_inteiro(relogio: list[float]) -> None:
+    cache: identidades.Identidades = identidades.Identidades(limite=2)
+
+    assert cache.obter(np.array([1, 2, 3, 4]))["nome"].notna().all()
+    assert cache.tamanho() == 2
+
+
+def test_vencidas_saem_na_gravacao(relogio: list[float]) -> None:
+    cache: identidades.Identidades = identidades.Identidades(ttl=5)
+    cache.obter(np.array([1, 2]))
+    relogio[0] += 10
+    cache.obter(np.array([3]))
+
+    assert _guardados(cache) == [3]
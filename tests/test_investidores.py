@@ -0,0 +1,36 @@
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from conftest import consultar
+from gefid import investidores, retratos
+
+DATA: date = date(2025, 12, 31)
+
+
+@pytest.fixture
+def emissor(base: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> int:
+    monkeypatch.chdir(base)
+    monkeypatch.setattr(retratos, "PASTA", tmp_path)
+    retratos.get_retratos.clear()
+
+    return consultar(base, "SELECT CD_CLI_EMT FROM DB2AEB.MVTC_DIAR_PSC GROUP BY CD_CLI_EMT "
+                           "ORDER BY COUNT(*) DESC LIMIT 1")[0][0]
+
+
+def _digitos(ranking: pd.DataFrame) -> set[int]:
+    return set(ranking["CPF_CNPJ"].dropna().str.len())
+
+
+def test_maiores_com_cpf_cnpj_de_14_digitos(emissor: int) -> None:
+    # o arquivo dos maiores investidores sempre trouxe o CPF/CNPJ com 14 dígitos, PF inclusive, pelo DB2 (sem
+    # vigências gravadas) ou pela base local
+    pelo_db2: pd.DataFrame = investidores.maiores(emissor, DATA, 50)
+
+    retratos.atualizar(emissor, DATA)
+    pela_base: pd.DataFrame = investidores.maiores(emissor, DATA, 50)
+
+    assert not pelo_db2.empty and not pela_base.empty
+    assert _digitos(pelo_db2) == _digitos(pela_base) == {14}
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import consultar
+
+# página e estados do direito (CD_EST_DRT) que ela lista
+PAGINAS: dict[str, str] = {
+    "rendimentos-distribuidos": "1",
+    "rendimentos-pagos": "8, 9",
+    "rendimentos-pendentes": "2, 22, 23",
+}
+
+
+def _escolher_emissor(app: AppTest, base: Path, mci: int) -> None:
+    # o emissor pode estar entre os ativos ou os inativos do catálogo
+    ((nome,),) = consultar(base, f"SELECT STRIP(NOM) FROM DB2MCI.CLIENTE WHERE COD = {mci}")
+
+    if nome not in app.selectbox(key="empresa").options:
+        app.radio(key="option").set_value("inativos").run()
+
+    app.selectbox(key="empresa").set_value(nome).run()
+
+
+@pytest.mark.parametrize("nome", PAGINAS)
+def test_visualizar_na_tela(pagina, base: Path, nome: str) -> None:
+    # o st.data_editor recusa TextColumn em coluna de categoria (dictionary do Arrow): a tela tem de abrir
+    ((mci, ano, mes),) = consultar(base, f"""
+        SELECT CD_CLI_DLBC, CAST(substr(DT_MVT_DRT, 1, 4) AS INTEGER), CAST(substr(DT_MVT_DRT, 6, 2) AS INTEGER)
+        FROM DB2AEB.MVT_REN
+        WHERE CD_EST_DRT IN ({PAGINAS[nome]})
+        GROUP BY 1, 2, 3
+        ORDER BY COUNT(*) DESC
+        LIMIT 1
+    """)
+
+    app: AppTest = pagina(nome)
+    _escolher_emissor(app, base, mci)
+
+    # a de pendentes não filtra por mês
+    if any(slider.key == "mês" for slider in app.slider):
+        app.slider(key="mês").set_value(mes)
+        app.selectbox(key="ano").set_value(ano)
+
+    app.button(key="view").click().run()
+
+    assert not app.exception, app.exception
+    assert len(app.dataframe) == 1
+    assert not app.dataframe[0].value.empty
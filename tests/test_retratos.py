@@ -0,0 +1,113 @@
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from conftest import consultar
+from gefid import retratos
+
+DATA: date = date(2025, 12, 31)
+
+
+@pytest.fixture
+def emissor(base: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> int:
+    # vigências numa pasta do teste; o emissor com mais movimentos na base local
+    monkeypatch.chdir(base)
+    monkeypatch.setattr(retratos, "PASTA", tmp_path)
+    retratos.get_retratos.clear()
+
+    return consultar(base, "SELECT CD_CLI_EMT FROM DB2AEB.MVTC_DIAR_PSC GROUP BY CD_CLI_EMT "
+                           "ORDER BY COUNT(*) DESC LIMIT 1")[0][0]
+
+
+def _chaves(load: pd.DataFrame) -> set[tuple]:
+    # conta/título/custodiante e data da observação; a quantidade fica de fora porque, com duas observações na
+    # mesma chave e dia (movimento e posição mensal), o ROW_NUMBER do DB2 escolhe qualquer uma delas
+    return set(zip(*(load[coluna].tolist() for coluna in [*retratos.CHAVE, "data"])))
+
+
+def _atualizadas(emissor: int, ate: date) -> pa.Table:
+    retratos.atualizar(emissor, ate)
+
+    return retratos.get_retratos().ler(emissor)[0]
+
+
+def test_posicoes_sem_vigencias_vem_do_db2(emissor: int) -> None:
+    # sem vigências gravadas a página não carrega a história inteira: o DB2 resolve a posição e nada é gravado
+    load: pd.DataFrame = retratos.posicoes(emissor, DATA)
+
+    assert retratos.get_retratos().ler(emissor) is None
+    assert not load.empty
+    assert load.attrs["schema"] == retratos.SCHEMA
+
+    tabela: pa.Table = _atualizadas(emissor, DATA)
+    assert _chaves(load) == _chaves(retratos.consultar(tabela, DATA))
+
+
+def test_divergencias_confere_vigencias_antigas(emissor: int) -> None:
+    tabela: pa.Table = _atualizadas(emissor, DATA)
+    totais: pd.DataFrame = retratos.load_totais(emissor, DATA)
+
+    # a vigência em vigor na data que começou há mais tempo, com a quantidade errada
+    vigentes: pd.DataFrame = tabela.to_pandas()
+    vigentes = vigentes[(vigentes["inicio"] <= DATA) & (vigentes["fim"] > DATA)]
+    antiga: pd.Series = vigentes.loc[vigentes["inicio"].idxmin()]
+    assert antiga["inicio"] < date(2025, 11, 28)
+
+    errada: pa.Table = pa.Table.from_pandas(
+        tabela.to_pandas().assign(quantidade=lambda load: load["quantidade"].mask(
+            load[[*retratos.CHAVE, "inicio"]].eq(antiga[[*retratos.CHAVE, "inicio"]]).all(axis=1),
+            load["quantidade"] + 1,
+        )),
+        schema=retratos.VIGENCIAS, preserve_index=False,
+    )
+
+    diferencas: pd.DataFrame = retratos.divergencias(errada, totais, DATA)
+    certas: pd.DataFrame = retratos.divergencias(tabela, totais, DATA)
+
+    chave: tuple = (antiga["cd_tip_tit"], antiga["cd_cli_cstd"])
+    assert chave in set(zip(diferencas["cd_tip_tit"].tolist(), diferencas["cd_cli_cstd"].tolist()))
+    assert chave not in set(zip(certas["cd_tip_tit"].tolist(), certas["cd_cli_cstd"].tolist()))
+
+
+def test_posicoes_nao_gravam_vigencias(emissor: int) -> None:
+    # vigências atrasadas: a página completa em memória com o DB2, quem grava é a manutenção diária
+    retratos.atualizar(emissor, date(2025, 6, 30))
+    load: pd.DataFrame = retratos.posicoes(emissor, DATA)
+
+    assert retratos.get_retratos().ler(emissor)[1] == date(2025, 6, 30)
+
+    tabela: pa.Table = _atualizadas(emissor, DATA)
+    assert _chaves(load) == _chaves(retratos.consultar(tabela, DATA))
+
+
+def test_atualizacao_diaria_nao_reescreve_a_base(emissor: int) -> None:
+    # os dias novos vão para um arquivo próprio e a posição é a mesma da carga da história inteira
+    gravador: retratos.Retratos = retratos.get_retratos()
+    retratos.atualizar(emissor, date(2025, 6, 30))
+    versao: int = gravador.arquivo(emissor).stat().st_mtime_ns
+
+    tabela: pa.Table = _atualizadas(emissor, DATA)
+
+    assert gravador.arquivo(emissor).stat().st_mtime_ns == versao
+    assert gravador.parcelas(emissor) == [gravador.parcela(emissor, DATA)]
+    assert gravador.ate(emissor) == gravador.ler(emissor)[1] == DATA
+    pd.testing.assert_frame_equal(retratos.consultar(tabela, DATA),
+                                  retratos.consultar(retratos._carregar(emissor, DATA), DATA))
+
+
+def test_compactacao_junta_os_arquivos_diarios(emissor: int, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(retratos, "COMPACTAR", 2)
+    gravador: retratos.Retratos = retratos.get_retratos()
+
+    retratos.atualizar(emissor, date(2025, 6, 30))
+    retratos.atualizar(emissor, date(2025, 9, 30))
+    assert len(gravador.parcelas(emissor)) == 1
+
+    tabela: pa.Table = _atualizadas(emissor, DATA)
+
+    assert gravador.parcelas(emissor) == []
+    assert gravador.ate(emissor) == DATA
+    assert tabela.equals(retratos._carregar(emissor, DATA))
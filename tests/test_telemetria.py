@@ -0,0 +1,36 @@
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+from gefid import telemetria
+
+
+def test_endereco_local_por_padrao(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("GEFID_METRICAS_ENDERECO", raising=False)
+    monkeypatch.setenv("GEFID_METRICAS_PORTA", "9500")
+
+    try:
+        recarregada = importlib.reload(telemetria)
+        assert (recarregada.ENDERECO, recarregada.PORTA) == ("127.0.0.1", 9500)
+
+    finally:
+        monkeypatch.delenv("GEFID_METRICAS_PORTA")
+        importlib.reload(telemetria)
+
+
+def test_sessoes_desconhecidas_ficam_sem_amostra(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Runtime de uma versão sem o _session_mgr
+    monkeypatch.setattr(telemetria.Runtime, "exists", staticmethod(lambda: True))
+    monkeypatch.setattr(telemetria.Runtime, "instance", staticmethod(lambda: SimpleNamespace()))
+
+    assert telemetria._sessoes_ativas() is None
+    assert telemetria.SESSOES.expor().splitlines()[2:] == []
+
+
+def test_sessoes_pelo_gerenciador(monkeypatch: pytest.MonkeyPatch) -> None:
+    gerenciador: SimpleNamespace = SimpleNamespace(num_active_sessions=lambda: 3)
+    monkeypatch.setattr(telemetria.Runtime, "exists", staticmethod(lambda: True))
+    monkeypatch.setattr(telemetria.Runtime, "instance", staticmethod(lambda: SimpleNamespace(_session_mgr=gerenciador)))
+
+    assert telemetria.SESSOES.expor().splitlines()[2:] == ["gefid_sessoes_ativas 3"]